@@ -0,0 +1,82 @@
+"""
+Micro-benchmark of parsing.strip_html: the previous BeautifulSoup-per-call path
+versus rss_summary.text (tokenizer fast path + LRU memo).
+
+Summaries are the entries' summary markup as the feeds serve it, read from the
+bodies aggregate-rss keeps in .feed-cache/ (data/archive.jsonl only holds the
+already stripped text). With an empty cache, the feeds in data/rss_list.txt
+are downloaded once. Each summary is stripped four times per run, as in
+aggregate-rss (dedup encode, first paragraph, classification, sidecar).
+
+Usage:
+    pdm run python benchmarks/strip_html.py [--feed-cache .feed-cache]
+"""
+import argparse
+import time
+from pathlib import Path
+
+import feedparser
+import requests
+from bs4 import BeautifulSoup
+
+from rss_summary.feed_cache import FeedCache
+from rss_summary.text import _fast_text, cache_info, clear_cache, html_to_text
+
+STRIPS_PER_ARTICLE = 4
+
+
+def feed_bodies(cache_dir, rss_list):
+    urls = [line.strip() for line in Path(rss_list).read_text().splitlines() if line.strip()]
+    cache = FeedCache(cache_dir)
+    bodies = [body for body in map(cache.body, urls) if body]
+    if bodies:
+        return bodies
+    print(f"No cached feed bodies in {cache_dir}; downloading {len(urls)} feeds.")
+    return [r.content for r in (requests.get(url, timeout=20) for url in urls) if r.ok]
+
+
+def summaries(bodies):
+    return [
+        entry.summary_detail.value
+        for body in bodies
+        for entry in feedparser.parse(body).entries
+        if entry.get("summary_detail")
+    ]
+
+
+def timed(fn, texts):
+    t0 = time.perf_counter()
+    for _ in range(STRIPS_PER_ARTICLE):
+        for t in texts:
+            fn(t)
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--feed-cache", default=".feed-cache", help="aggregate-rss feed cache to read bodies from")
+    parser.add_argument("--rss-list", default="data/rss_list.txt")
+    args = parser.parse_args()
+
+    texts = summaries(feed_bodies(args.feed_cache, args.rss_list))
+    if not texts:
+        raise SystemExit("No feed summaries found.")
+    soup = lambda t: BeautifulSoup(t, features="html.parser").get_text()
+    mismatches = sum(html_to_text(t) != soup(t) for t in texts)
+    fast_share = sum(_fast_text(t) is not None for t in texts) / len(texts)
+    clear_cache()
+
+    soup_s = timed(soup, texts)
+    fast_s = timed(lambda t: _fast_text(t) or soup(t), texts)
+    memo_s = timed(html_to_text, texts)
+    hits, misses, _ = cache_info()
+
+    n = len(texts) * STRIPS_PER_ARTICLE
+    print(f"{len(texts)} summaries x {STRIPS_PER_ARTICLE} strips, fast path taken for {fast_share:.0%}, {mismatches} output mismatches")
+    print(f"BeautifulSoup       {soup_s * 1000:8.1f} ms  ({soup_s / n * 1e6:6.1f} us/call)")
+    print(f"tokenizer           {fast_s * 1000:8.1f} ms  ({fast_s / n * 1e6:6.1f} us/call)  x{soup_s / fast_s:.1f}")
+    print(f"tokenizer + memo    {memo_s * 1000:8.1f} ms  ({memo_s / n * 1e6:6.1f} us/call)  x{soup_s / memo_s:.1f}  ({hits} hits, {misses} misses)")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,49 +2,60 @@
 Run batch inference on a daily feed file using the trained classifier head.
 
 Usage:
+    pdm run python classifier/infer.py 2026-03-12
     pdm run python classifier/infer.py data/feed-2026-03-12.md
-    pdm run python classifier/infer.py data/feed-2026-03-12.md --head data/classifier_head.joblib
+    pdm run python classifier/infer.py data/feed-2026-03-12.md --head data/classifier_head.npz
 
 Prints a classified summary grouped by theme, useful for evaluating model quality
 on real articles before enabling --classify in the main pipeline.
 """
 import argparse
+import re
 import time
 from collections import defaultdict
-from sentence_transformers import SentenceTransformer
+from datetime import date
 
-from rss_summary.classification import BGE_MODEL_ID, CLASSIFICATION_THRESHOLD, UNCLASSIFIED, classify_article_scored, encode_for_classification, load_classifier_head, load_e5_model
+from rss_summary.archive import load_archive
+from rss_summary.classification import CLASSIFICATION_THRESHOLD, UNCLASSIFIED, classify_batch as classify_embeddings, encode_batch_for_classification, load_bge_model, load_classifier_head, load_e5_model
+from rss_summary.embedding_cache import CachedEncoder
 from rss_summary.parsing import format_article_text, parse_daily_feed_md
 
 
 def classify_batch(
-    model_bge: SentenceTransformer,
-    model_e5: SentenceTransformer,
+    model_bge: CachedEncoder,
+    model_e5: CachedEncoder,
     articles: list[dict],
     head: dict,
     threshold: float = CLASSIFICATION_THRESHOLD,
 ) -> list[dict]:
-    results = []
-    for article in articles:
-        embedding = encode_for_classification(format_article_text(article), model_bge, model_e5)
-        scored = classify_article_scored(embedding, head, threshold)
-        results.append({**article, "theme": scored["theme"], "score": scored["top_score"]})
-    return results
+    embeddings = encode_batch_for_classification(
+        [format_article_text(article) for article in articles], model_bge, model_e5
+    )
+    return [
+        {**article, "theme": scored["theme"], "score": scored["top_score"]}
+        for article, scored in zip(articles, classify_embeddings(embeddings, head, threshold))
+    ]
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Classify articles from a feed file")
-    parser.add_argument("feed", help="Path to a feed-YYYY-MM-DD.md file")
-    parser.add_argument("--head", default="data/classifier_head.joblib")
+    parser.add_argument("feed", help="A digest day (YYYY-MM-DD, read from the archive) or a feed-YYYY-MM-DD.md file")
+    parser.add_argument("--archive", default="data/archive.jsonl")
+    parser.add_argument("--head", default=None, help="Classifier head (default: data/classifier_head.npz, else the .joblib head)")
     parser.add_argument("--threshold", type=float, default=CLASSIFICATION_THRESHOLD)
     args = parser.parse_args()
 
     print(f"Loading articles from {args.feed}...")
-    articles = [{"title": a["title"], "summary": a["summary"]} for a in parse_daily_feed_md(args.feed)]
+    if re.fullmatch(r"\d{4}-\d{2}-\d{2}", args.feed):
+        day = date.fromisoformat(args.feed)
+        source = load_archive(args.archive, day, day)
+    else:
+        source = parse_daily_feed_md(args.feed)
+    articles = [{"title": a["title"], "summary": a["summary"]} for a in source]
     print(f"Found {len(articles)} articles")
 
     print("Loading models and head...")
-    model_bge = SentenceTransformer(BGE_MODEL_ID)
+    model_bge = load_bge_model()
     model_e5 = load_e5_model()
     try:
         head = load_classifier_head(args.head)
@@ -4,10 +4,14 @@ Train a LinearSVC classifier on concatenated BAAI/bge-m3 + e5-instruct embedding
 Usage:
     pdm run python classifier/train.py
     pdm run python classifier/train.py --themes data/themes.json --output data/classifier_head.joblib
+    pdm run python classifier/train.py --export-only   # re-export an existing joblib head to .npz
 
 The trained head is ~1MB and is loaded by classification.py at inference time.
+It is also exported as a compact .npz (stacked fold weights, sigmoid calibration
+parameters and label table) so inference needs neither scikit-learn nor joblib.
 Both bge-m3 (already loaded for deduplication) and e5-instruct are used as frozen encoders.
 Their 1024-dim embeddings are concatenated into a 2048-dim vector before classification.
+Embeddings go through the shared on-disk cache, so retraining only encodes new examples.
 """
 import argparse
 import json
@@ -18,14 +22,13 @@ from pathlib import Path
 import joblib
 import numpy as np
 import sklearn
-from sentence_transformers import SentenceTransformer
 from sklearn.calibration import CalibratedClassifierCV
 from sklearn.metrics import classification_report
 from sklearn.model_selection import StratifiedKFold, cross_val_predict
 from sklearn.preprocessing import LabelEncoder
 from sklearn.svm import LinearSVC
 
-from rss_summary.classification import BGE_MODEL_ID, E5_MODEL_ID, E5_PROMPT
+from rss_summary.classification import BGE_MODEL_ID, E5_MODEL_ID, E5_PROMPT, load_bge_model, load_e5_model
 
 
 CV_REPEATS = 5
@@ -35,6 +38,35 @@ def _make_clf():
     return CalibratedClassifierCV(LinearSVC(max_iter=2000, C=1.0, class_weight="balanced"), cv=5)
 
 
+def export_numpy_head(head: dict, path: str) -> None:
+    """Export a calibrated LinearSVC head to the .npz format read by load_numpy_head."""
+    clf = head["clf"]
+    le = head["label_encoder"]
+    n_classes = len(le.classes_)
+    if clf.method != "sigmoid" or n_classes < 3:
+        raise ValueError("NumPy export supports sigmoid calibration with 3+ classes only.")
+    coef, intercept, sigmoid_a, sigmoid_b = [], [], [], []
+    for fold in clf.calibrated_classifiers_:
+        svc = fold.estimator
+        if len(svc.classes_) != n_classes:
+            raise ValueError("A calibration fold is missing classes; cannot export.")
+        coef.append(svc.coef_)
+        intercept.append(svc.intercept_)
+        sigmoid_a.append([cal.a_ for cal in fold.calibrators])
+        sigmoid_b.append([cal.b_ for cal in fold.calibrators])
+    labels = list(le.classes_)
+    np.savez_compressed(
+        path,
+        coef=np.array(coef, dtype=np.float32),
+        intercept=np.array(intercept, dtype=np.float32),
+        sigmoid_a=np.array(sigmoid_a, dtype=np.float32),
+        sigmoid_b=np.array(sigmoid_b, dtype=np.float32),
+        labels=np.array(labels),
+        themes=np.array([head["label_to_theme"][label] for label in labels]),
+        meta=np.array(json.dumps(head.get("meta", {}))),
+    )
+
+
 def load_themes(path: str) -> list[dict]:
     with open(path) as f:
         return json.load(f)
@@ -53,12 +85,12 @@ def build_dataset(themes: list[dict]) -> tuple[list[str], list[str]]:
 def encode_concat(texts: list[str]) -> np.ndarray:
     """Encode texts with bge-m3 + e5-instruct, concatenate, and L2-normalize each row."""
     print(f"\nLoading {BGE_MODEL_ID}...")
-    model_bge = SentenceTransformer(BGE_MODEL_ID)
+    model_bge = load_bge_model()
     print(f"Encoding {len(texts)} examples with bge-m3...")
     X_bge = model_bge.encode(texts, show_progress_bar=True, normalize_embeddings=True)
 
     print(f"\nLoading {E5_MODEL_ID}...")
-    model_e5 = SentenceTransformer(E5_MODEL_ID)
+    model_e5 = load_e5_model()
     prefixed = [E5_PROMPT + t for t in texts]
     print(f"Encoding {len(texts)} examples with e5-instruct...")
     X_e5 = model_e5.encode(prefixed, show_progress_bar=True, normalize_embeddings=True)
@@ -68,7 +100,7 @@ def encode_concat(texts: list[str]) -> np.ndarray:
     return X / np.where(norms > 0, norms, 1)
 
 
-def train(themes_path: str, output_path: str, eval_path: str) -> None:
+def train(themes_path: str, output_path: str, eval_path: str, numpy_output_path: str) -> None:
     themes = load_themes(themes_path)
     texts, raw_labels = build_dataset(themes)
 
@@ -145,6 +177,8 @@ def train(themes_path: str, output_path: str, eval_path: str) -> None:
     Path(output_path).parent.mkdir(parents=True, exist_ok=True)
     joblib.dump(head, output_path)
     print(f"\nHead saved to {output_path}")
+    export_numpy_head(head, numpy_output_path)
+    print(f"NumPy head saved to {numpy_output_path}")
 
     eval_data = {
         "timestamp": datetime.now().isoformat(),
@@ -171,5 +205,11 @@ if __name__ == "__main__":
     parser.add_argument("--themes", default="data/themes.json")
     parser.add_argument("--output", default="data/classifier_head.joblib")
     parser.add_argument("--eval", default="data/classifier_eval.json")
+    parser.add_argument("--numpy-output", default="data/classifier_head.npz")
+    parser.add_argument("--export-only", action="store_true", help="Export the existing --output head to --numpy-output without retraining")
     args = parser.parse_args()
-    train(args.themes, args.output, args.eval)
+    if args.export_only:
+        export_numpy_head(joblib.load(args.output), args.numpy_output)
+        print(f"NumPy head saved to {args.numpy_output}")
+    else:
+        train(args.themes, args.output, args.eval, args.numpy_output)
@@ -1,17 +1,27 @@
+import functools
 import logging
 import os
-from datetime import datetime
+from collections import Counter
+from datetime import date, datetime
 from pathlib import Path
 
 import click
-import feedparser
-from sentence_transformers import SentenceTransformer
 
-from rss_summary.classification import BGE_MODEL_ID, MISTRAL_MODEL, classify_article, encode_for_classification, geo_theme, load_classifier_head, load_e5_model, load_taxonomy, mistral_chat_with_retry
+from rss_summary.archive import archive_path, archive_records, write_archive_day
+from rss_summary.classification import MISTRAL_MODEL, batch_encode_e5, classify_batch, encode_batch_for_classification, geo_theme, load_bge_model, load_classifier_head, load_e5_model, load_geo_gate, load_taxonomy, mistral_chat_with_retry
+from rss_summary.feed_cache import FeedCache
+from rss_summary.feed_state import FeedState, restore_feed_state
+from rss_summary.fetching import FETCH_TIMEOUT, MAX_PER_HOST, iter_feeds
 from rss_summary.formatting import format_feed_entries, format_feed_entries_classified, render_table
+from rss_summary.history import HISTORY_DAYS, DedupHistory, restore_dedup_history
+from rss_summary.images import ImageCache, resolve_images
 from rss_summary.last_run import get_last_run_date, restore_last_run_date, set_last_run_date
-from rss_summary.parsing import extract_first_paragraph, format_article_text, get_default_image_link
-from rss_summary.similarity import encode_text, is_duplicate, title_is_duplicate
+from rss_summary.parsing import extract_first_paragraph, format_article_text
+from rss_summary.pipeline import MICRO_BATCH_SIZE, Stage, micro_batches
+from rss_summary.search import SearchIndex, search_index_path
+from rss_summary.sidecar import sidecar_path, write_sidecar
+from rss_summary.similarity import EmbeddingIndex, TitleIndex, encode_texts
+from rss_summary.urls import canonical_url
 
 
 def generate_daily_summary(articles, client):
@@ -42,17 +52,117 @@ def generate_daily_summary(articles, client):
     return response.choices[0].message.content.strip()
 
 
+def _new_entries(urls, feeds, feed_state, since, until, dedup_hits):
+    """Filter stage: yield (entry, date, summary HTML) for entries not processed by a previous run.
+
+    Feeds are taken in rss_list order. The per-feed state check and the
+    exact canonical-URL dedup happen here, before any text work.
+    """
+    seen_urls = set()
+    for url, feed in zip(urls, feeds):
+        if feed is None:
+            continue
+        dates = []
+        for entry in feed.entries:
+            if not entry.get("published_parsed"):
+                continue
+            feed_date = datetime(*entry.published_parsed[:6])
+            dates.append(feed_date)
+            guid = entry.get("id") or entry.get("link")
+            if not feed_state.is_new(url, guid, feed_date, since):
+                continue
+            if until is not None and feed_date > until:
+                continue
+            feed_state.mark(url, guid, feed_date)
+            canonical = canonical_url(entry.link)
+            if canonical in seen_urls:
+                dedup_hits["url"] += 1
+                continue
+            seen_urls.add(canonical)
+            summary_detail = getattr(entry, "summary_detail", None)
+            yield entry, feed_date, summary_detail.value if summary_detail else ""
+        feed_state.record_order(url, dates)
+
+
+def _encoded(model, candidates, batch_size=MICRO_BATCH_SIZE):
+    """Encode stage: yield micro-batches of (candidate, bge-m3 embedding) pairs."""
+    for batch in micro_batches(candidates, batch_size):
+        yield list(zip(batch, encode_texts(model, [summary_text for _, _, summary_text in batch])))
+
+
+def _deduplicated(batches, seen_titles, seen_embeddings, history, dedup_hits):
+    """Dedup stage: greedy first-seen-wins, in candidate order; yields the kept items of each batch.
+
+    Title checks stay in this loop so they only compare against kept entries.
+    """
+    for batch in batches:
+        kept = []
+        for (entry, feed_date, summary_text), embedding in batch:
+            title = entry.title
+            if seen_titles.is_duplicate(title):
+                dedup_hits["title"] += 1
+                continue
+            if seen_embeddings.is_duplicate(embedding):
+                dedup_hits["embedding"] += 1
+                continue
+            seen_titles.add(title)
+            seen_embeddings.add(embedding)
+            history.add(title, embedding)
+            kept.append({
+                "published_date": feed_date,
+                "title": title,
+                "summary": extract_first_paragraph(summary_text),
+                "link": entry.link,
+                "media_content": entry.get("media_content") or [{"url": ""}],
+            })
+        if kept:
+            yield kept
+
+
+def _with_images(batches, image_cache, max_per_host):
+    """Image stage: fetch preview images for kept items the feeds gave none."""
+    for batch in batches:
+        resolve_images(batch, image_cache, max_per_host=max_per_host)
+        yield batch
+
+
+def _classified(batches, model, e5, head, geo_gate):
+    """Classify stage: geo gate first, then one classifier batch per micro-batch of kept items."""
+    for batch in batches:
+        to_classify = []
+        for item in batch:
+            geo = geo_theme(item["title"], geo_gate)
+            if geo:
+                item["theme"] = geo
+                item["classification"] = {"theme": geo, "top_score": 1.0, "runner_up": None, "runner_up_score": None}
+            else:
+                to_classify.append(item)
+        if to_classify:
+            cls_embeddings = encode_batch_for_classification(
+                [format_article_text(item) for item in to_classify], model, e5()
+            )
+            for item, scored in zip(to_classify, classify_batch(cls_embeddings, head)):
+                item["theme"] = scored["theme"]
+                item["classification"] = scored
+        yield batch
+
+
 @click.command()
 @click.argument("rss_links", default="data/rss_list.txt")
 @click.argument("feed_output", default="data/feed.md")
-@click.option("--with-images", is_flag=True)
+@click.option("--with-images", is_flag=True, help="Add an image preview column, fetching article pages without a feed image")
 @click.option("--dry-run", is_flag=True, help="Run without updating .last-run")
-@click.option("--restore", is_flag=True, help="Restore .last-run from backup and exit")
+@click.option("--restore", is_flag=True, help="Restore .last-run, the feed state and the dedup history from backup and exit")
 @click.option("--until", default=None, help="Upper date bound for articles (ISO format: YYYY-MM-DD HH:MM:SS)")
 @click.option("--classify", is_flag=True, help="Group output by thematic taxonomy")
 @click.option("--taxonomy", default="data/taxonomy.toml", show_default=True, help="Path to taxonomy TOML config")
 @click.option("--summarize", is_flag=True, help="Prepend a Mistral-generated prose summary to the digest (requires MISTRAL_API_KEY)")
-def main(rss_links, feed_output, with_images, dry_run, restore, until, classify, taxonomy, summarize):
+@click.option("--fetch-timeout", default=FETCH_TIMEOUT, show_default=True, type=float, help="Per-feed download timeout in seconds")
+@click.option("--max-per-host", default=MAX_PER_HOST, show_default=True, help="Max concurrent feed downloads per host")
+@click.option("--sidecar", is_flag=True, help="Also write article vectors and scores to a .npz next to FEED_OUTPUT for weekly-digest")
+@click.option("--history-days", default=HISTORY_DAYS, show_default=True, type=click.IntRange(min=0), help="Also drop entries duplicating an article kept in the last N days (0 to disable)")
+@click.option("--stream-parse", is_flag=True, help="Pull-parse RSS/Atom feeds, stopping early on feeds known to be newest-first")
+def main(rss_links, feed_output, with_images, dry_run, restore, until, classify, taxonomy, summarize, fetch_timeout, max_per_host, sidecar, history_days, stream_parse):
     logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 
     mistral_client = None
@@ -65,6 +175,8 @@ def main(rss_links, feed_output, with_images, dry_run, restore, until, classify,
 
     if restore:
         restore_last_run_date()
+        restore_feed_state()
+        restore_dedup_history()
         return
 
     date_midnight = get_last_run_date()
@@ -73,69 +185,63 @@ def main(rss_links, feed_output, with_images, dry_run, restore, until, classify,
     except ValueError:
         raise click.ClickException(f"Invalid --until value '{until}'. Expected ISO format: YYYY-MM-DD or YYYY-MM-DD HH:MM:SS")
 
-    feed_list = []
-    seen_titles = []
-    seen_embeddings = []
+    seen_titles = TitleIndex()
+    seen_embeddings = EmbeddingIndex()
+    history = DedupHistory(days=history_days)
+    history.seed(seen_embeddings, seen_titles)
 
-    model = SentenceTransformer(BGE_MODEL_ID)
+    model = load_bge_model()
+    # The e5 model is only loaded once something needs it.
+    e5 = functools.cache(load_e5_model)
 
     try:
         rss_list_file = open(rss_links)
     except FileNotFoundError:
         raise click.ClickException(f"RSS links file not found: {rss_links}")
     with rss_list_file as rss_list:
-        for line in rss_list:
-            feed = feedparser.parse(line)
-            for entry in feed.entries:
-                if not entry.get("published_parsed"):
-                    continue
-                feed_date = datetime(*entry.published_parsed[:6])
-                if feed_date <= date_midnight:
-                    continue
-                if date_until is not None and feed_date > date_until:
-                    continue
-                title = entry.title
-                if title_is_duplicate(title, seen_titles):
-                    continue
-                summary_detail = getattr(entry, "summary_detail", None)
-                summary_text = summary_detail.value if summary_detail else ""
-                embedding = encode_text(model, summary_text)
-                if not is_duplicate(model, embedding, seen_embeddings):
-                    seen_titles.append(title)
-                    seen_embeddings.append(embedding)
-                    feed_list.append(
-                        {
-                            "published_date": feed_date,
-                            "title": title,
-                            "summary": extract_first_paragraph(summary_text),
-                            "link": entry.link,
-                            "media_content": get_default_image_link(
-                                entry, entry.link
-                            ),
-                        }
-                    )
+        urls = [line.strip() for line in rss_list if line.strip()]
+
+    if classify:
+        try:
+            theme_names = load_taxonomy(taxonomy)
+            geo_gate = load_geo_gate(taxonomy)
+            head = load_classifier_head()
+        except FileNotFoundError as e:
+            raise click.ClickException(str(e))
+
+    feed_cache = FeedCache()
+    feed_state = FeedState(last_run=date_midnight)
+    image_cache = ImageCache() if with_images else None
+    stop_before = {url: feed_state.stop_before(url, date_midnight) for url in urls} if stream_parse else None
+
+    # Bounded-queue pipeline, one thread per stage: feeds are filtered in
+    # rss_list order as they arrive, so encoding starts while later feeds
+    # still download, and dedup sees candidates in the same order as a
+    # sequential run.
+    dedup_hits = Counter()
+    feeds = Stage("fetch", iter_feeds(
+        urls, timeout=fetch_timeout, max_per_host=max_per_host, cache=feed_cache, since=date_midnight,
+        streaming=stream_parse, stop_before=stop_before,
+    ))
+    candidates = Stage("filter", _new_entries(urls, feeds, feed_state, date_midnight, date_until, dedup_hits))
+    encoded = Stage("encode", _encoded(model, candidates), count=len)
+    kept = Stage("dedup", _deduplicated(encoded, seen_titles, seen_embeddings, history, dedup_hits), count=len)
+    if with_images:
+        kept = Stage("images", _with_images(kept, image_cache, max_per_host), count=len)
+    if classify:
+        kept = Stage("classify", _classified(kept, model, e5, head, geo_gate), count=len)
+    feed_list = [item for batch in kept for item in batch]
 
+    logging.info(
+        "Dropped duplicates: %d by URL, %d by title, %d by embedding; kept %d.",
+        dedup_hits["url"], dedup_hits["title"], dedup_hits["embedding"], len(feed_list),
+    )
     sorted_list = sorted(feed_list, key=lambda item: item["published_date"], reverse=True)
 
     if not sorted_list:
         logging.info("No new entries.")
     else:
         if classify:
-            try:
-                theme_names = load_taxonomy(taxonomy)
-                head = load_classifier_head()
-            except FileNotFoundError as e:
-                raise click.ClickException(str(e))
-            model_e5 = load_e5_model()
-            for item in sorted_list:
-                geo = geo_theme(item["title"])
-                if geo:
-                    item["theme"] = geo
-                    continue
-                cls_embedding = encode_for_classification(
-                    format_article_text(item), model, model_e5
-                )
-                item["theme"] = classify_article(cls_embedding, head)
             markdown = format_feed_entries_classified(sorted_list, theme_names, with_images)
         else:
             rows = format_feed_entries(sorted_list, with_images)
@@ -156,8 +262,30 @@ def main(rss_links, feed_output, with_images, dry_run, restore, until, classify,
         except OSError as e:
             raise click.ClickException(f"Could not write feed to '{feed_output}': {e}") from e
 
+        if not dry_run:
+            today = date.today()
+            archive = archive_path(Path(feed_output).parent)
+            write_archive_day(archive, today, archive_records(sorted_list, today))
+            # Keep a local search-archive index current once it has been built.
+            index_dir = search_index_path(Path(feed_output).parent)
+            if index_dir.exists():
+                SearchIndex(index_dir).sync(archive, model)
+
+        if sidecar:
+            # Same texts weekly-digest clusters and classifies; with the
+            # embedding cache the --classify encodes above are not repeated.
+            texts = [format_article_text(item) for item in sorted_list]
+            try:
+                write_sidecar(sidecar_path(feed_output), sorted_list, encode_texts(model, texts), batch_encode_e5(texts, e5()))
+            except OSError as e:
+                raise click.ClickException(f"Could not write sidecar next to '{feed_output}': {e}") from e
+
     if not dry_run:
-        set_last_run_date()
+        feed_state.save(set_last_run_date())
+        feed_cache.save()
+        history.save()
+        if image_cache is not None:
+            image_cache.save()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,157 @@
+import json
+import logging
+import os
+import re
+from datetime import date, datetime
+from pathlib import Path
+
+import click
+
+ARCHIVE_NAME = "archive.jsonl"
+_FEED_FILE_RE = re.compile(r"feed-(\d{4}-\d{2}-\d{2})\.md$")
+_IMAGE_RE = re.compile(r"!\[[^\]]*\]\((.*?)\)")
+_NON_THEME_HEADINGS = {"En bref", "Plus en détails"}
+_DAY_SLICE = slice(len('{"day": "'), len('{"day": "YYYY-MM-DD'))
+
+
+def archive_path(data_dir):
+    """Return the archive path for a data directory (data/ → data/archive.jsonl)."""
+    return Path(data_dir) / ARCHIVE_NAME
+
+
+def archive_records(items, day):
+    """Turn aggregate feed entries into archive records for the digest of `day`."""
+    records = []
+    for item in items:
+        media = item.get("media_content") or [{}]
+        image = media[0].get("url") if isinstance(media[0], dict) else None
+        records.append({
+            "day": day.isoformat(),
+            "date": item["published_date"].isoformat(),
+            "title": item["title"],
+            "url": item["link"],
+            "summary": item["summary"],
+            "image": image or "",
+            "theme": item.get("theme"),
+        })
+    return records
+
+
+def _read_lines(path):
+    try:
+        return Path(path).read_text().splitlines()
+    except FileNotFoundError:
+        return []
+
+
+def write_archive_day(path, day, records):
+    """Store the records of one digest day, replacing any earlier records for that day.
+
+    The common case (a new day) is a plain append. Re-running a day (e.g.
+    after --restore) rewrites the file without that day's previous records,
+    matching how the dated markdown copy is overwritten.
+    """
+    path = Path(path)
+    key = f'"day": "{day.isoformat()}"'
+    lines = _read_lines(path)
+    new_lines = [json.dumps(r, ensure_ascii=False) for r in records]
+    if any(key in line for line in lines):
+        kept = [line for line in lines if json.loads(line)["day"] != day.isoformat()]
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text("".join(f"{line}\n" for line in kept + new_lines))
+        os.replace(tmp, path)
+    else:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a") as f:
+            f.write("".join(f"{line}\n" for line in new_lines))
+    logging.info("Archived %d articles for %s in %s", len(records), day.isoformat(), path)
+
+
+def load_archive(path, start=None, end=None):
+    """Load archived articles whose digest day lies in [start, end] (dates, both optional).
+
+    Every record is written with "day" as its first key, so lines outside
+    the range are skipped on a string slice and the selected ones decoded
+    with a single json.loads call. Articles come back in the shape
+    parse_daily_feed_md returns (title, url, summary and date as a datetime),
+    plus day, image and theme.
+    """
+    lo = start.isoformat() if start else ""
+    hi = end.isoformat() if end else "9999"
+    lines = [line for line in _read_lines(path) if lo <= line[_DAY_SLICE] <= hi]
+    if not lines:
+        return []
+    articles = json.loads("[" + ",".join(lines) + "]")
+    for a in articles:
+        a["date"] = datetime.fromisoformat(a["date"])
+    return articles
+
+
+def parse_feed_md_records(path):
+    """Recover archive records from a dated feed-YYYY-MM-DD.md file (best effort, for migration).
+
+    Unlike parse_daily_feed_md, this keeps the image column and the theme of
+    the enclosing "## Theme" section of --classify digests.
+    """
+    day = _FEED_FILE_RE.search(Path(path).name).group(1)
+    theme = None
+    records = []
+    for line in Path(path).read_text().splitlines():
+        line = line.strip()
+        if line.startswith("## "):
+            heading = line[3:].strip()
+            theme = None if heading in _NON_THEME_HEADINGS else heading
+            continue
+        if not line.startswith("|") or re.match(r"^\|[-| ]+\|$", line):
+            continue
+        cols = [c.strip() for c in line.strip("|").split("|")]
+        if len(cols) < 3:
+            continue
+        m = re.match(r"\[(.+?)\]\((.+?)\)", cols[0])
+        if not m:
+            continue
+        try:
+            published = datetime.fromisoformat(cols[2])
+        except ValueError:
+            continue
+        image = _IMAGE_RE.search(cols[3]) if len(cols) > 3 else None
+        records.append({
+            "day": day,
+            "date": published.isoformat(),
+            "title": m.group(1),
+            "url": m.group(2),
+            "summary": cols[1],
+            "image": image.group(1) if image else "",
+            "theme": theme,
+        })
+    return records
+
+
+def migrate_feed_files(data_dir, path=None):
+    """Archive every dated feed file in data_dir whose day is not archived yet. Returns (days, articles) added."""
+    path = Path(path) if path else archive_path(data_dir)
+    archived = {json.loads(line)["day"] for line in _read_lines(path)}
+    days = articles = 0
+    for feed_file in sorted(Path(data_dir).glob("feed-*.md")):
+        m = _FEED_FILE_RE.search(feed_file.name)
+        if not m or m.group(1) in archived:
+            continue
+        records = parse_feed_md_records(feed_file)
+        write_archive_day(path, date.fromisoformat(m.group(1)), records)
+        days += 1
+        articles += len(records)
+    return days, articles
+
+
+@click.command()
+@click.option("--data-dir", default="data", show_default=True, help="Directory containing daily feed files")
+@click.option("--archive", default=None, help="Archive file (default: DATA_DIR/archive.jsonl)")
+def main(data_dir, archive):
+    """One-shot migration of dated feed-YYYY-MM-DD.md files into the JSONL archive."""
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s: %(message)s")
+    days, articles = migrate_feed_files(data_dir, archive)
+    click.echo(f"Archived {articles} articles from {days} daily files.")
+
+
+if __name__ == "__main__":
+    main()
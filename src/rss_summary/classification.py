@@ -1,3 +1,4 @@
+import json
 import logging
 import re
 import time
@@ -7,17 +8,21 @@ from pathlib import Path
 import numpy as np
 from mistralai.client.errors.sdkerror import SDKError
 
+from rss_summary.embedding_cache import CachedEncoder
+from rss_summary.encoder_daemon import connect_encoder
 from rss_summary.parsing import strip_html
 
 DEFAULT_TAXONOMY_PATH = Path("data/taxonomy.toml")
 DEFAULT_HEAD_PATH = Path("data/classifier_head.joblib")
+DEFAULT_NUMPY_HEAD_PATH = Path("data/classifier_head.npz")
 UNCLASSIFIED = "Autres"
 THEME_INTERNATIONAL = "International"
 THEME_OUTREMER = "Outre-mer & Caraïbes"
 
 # Geography gate: sovereign Caribbean states route to International, French and
 # other non-sovereign territories to Outre-mer & Caraïbes (matches the priority
-# geographic rule used in the weekly Mistral enrichment prompt).
+# geographic rule used in the weekly Mistral enrichment prompt). These are the
+# defaults; a [geography] table in data/taxonomy.toml replaces them.
 _GEO_SOVEREIGN = (
     "haïti", "haiti", "cuba", "jamaïque", "république dominicaine",
     "guyana", "sainte-lucie", "dominique", "trinidad", "barbade", "bahamas",
@@ -29,7 +34,44 @@ _GEO_TERRITORIES = (
 )
 
 
-def geo_theme(title: str):
+_GEO_ARTICLE = r"(?:à|en|au|aux|la|le)\s+(?:la\s+|le\s+)?"
+
+
+def compile_geo_gate(sovereign=_GEO_SOVEREIGN, territories=_GEO_TERRITORIES):
+    """Compile the place lists into one anchored alternation.
+
+    Returns (pattern, routes) where routes maps each lower-cased place name to
+    its theme. Sovereign places come first so they win any overlap, as they
+    did when each place was tried in turn.
+    """
+    routes = {}
+    for places, theme in ((sovereign, THEME_INTERNATIONAL), (territories, THEME_OUTREMER)):
+        for place in places:
+            routes.setdefault(place.lower(), theme)
+    if not routes:
+        return re.compile(r"(?!)"), routes
+    alternation = "|".join(re.escape(place) for place in routes)
+    pattern = re.compile(rf"(?P<bare>{alternation})\s*[.:]|{_GEO_ARTICLE}(?P<prefixed>{alternation})\b")
+    return pattern, routes
+
+
+_GEO_GATE = compile_geo_gate()
+
+
+def load_geo_gate(path=None):
+    """Compile the geography gate from the [geography] table of the taxonomy TOML.
+
+    Falls back to the built-in place lists when the table is absent.
+    """
+    p = Path(path) if path else DEFAULT_TAXONOMY_PATH
+    with open(p, "rb") as f:
+        geography = tomllib.load(f).get("geography")
+    if not geography:
+        return _GEO_GATE
+    return compile_geo_gate(geography.get("sovereign", ()), geography.get("territories", ()))
+
+
+def geo_theme(title: str, gate=None):
     """Deterministic geography gate on explicit place-name title prefixes.
 
     Matches the source convention 'Place. Rest of title' (also 'Place : …')
@@ -38,14 +80,14 @@ def geo_theme(title: str):
     (mid-title mentions, person names like 'Dominique Théophile', and common
     nouns like 'La réunion publique' must not match, hence the punctuation
     and article requirements).
+
+    gate is a compile_geo_gate() result; defaults to the built-in place lists.
     """
-    t = title.strip().lower()
-    for places, theme in ((_GEO_SOVEREIGN, THEME_INTERNATIONAL), (_GEO_TERRITORIES, THEME_OUTREMER)):
-        for place in places:
-            p = re.escape(place)
-            if re.match(rf"{p}\s*[.:]", t) or re.match(rf"(?:à|en|au|aux|la|le)\s+(?:la\s+|le\s+)?{p}\b", t):
-                return theme
-    return None
+    pattern, routes = gate or _GEO_GATE
+    m = pattern.match(title.strip().lower())
+    if not m:
+        return None
+    return routes[m.group("bare") or m.group("prefixed")]
 
 BGE_MODEL_ID = "BAAI/bge-m3"
 E5_MODEL_ID = "intfloat/multilingual-e5-large-instruct"
@@ -75,10 +117,27 @@ def load_taxonomy(path=None):
     return data["themes"]
 
 
-def load_e5_model():
-    """Load the e5-instruct model used for the second half of the classification embedding."""
+def _load_local_model(model_id):
     from sentence_transformers import SentenceTransformer
-    return SentenceTransformer(E5_MODEL_ID)
+    return SentenceTransformer(model_id)
+
+
+def _load_encoder(model_id, cache_dir=None):
+    """Embedding-cached encoder; on the first cache miss it connects to a running encoder-daemon, else loads the model."""
+    def load():
+        local = lambda: _load_local_model(model_id)
+        return connect_encoder(model_id, fallback=local) or local()
+    return CachedEncoder(model_id, load, cache_dir)
+
+
+def load_bge_model(cache_dir=None):
+    """Load bge-m3 (dedup, clustering and first half of the classification embedding)."""
+    return _load_encoder(BGE_MODEL_ID, cache_dir)
+
+
+def load_e5_model(cache_dir=None):
+    """Load the e5-instruct model used for the second half of the classification embedding."""
+    return _load_encoder(E5_MODEL_ID, cache_dir)
 
 
 def _l2_normalize(v: np.ndarray) -> np.ndarray:
@@ -116,10 +175,87 @@ def build_cls_embedding(bge_embedding: np.ndarray, e5_embedding: np.ndarray) ->
     return _l2_normalize(np.concatenate([_l2_normalize(bge_embedding), e5_embedding]))
 
 
+def build_cls_embeddings(bge_embeddings: np.ndarray, e5_embeddings: np.ndarray) -> np.ndarray:
+    """Row-wise build_cls_embedding over (N, 1024) matrices. Returns an (N, 2048) array."""
+    bge = np.asarray(bge_embeddings, dtype=np.float32)
+    bge_norms = np.linalg.norm(bge, axis=1, keepdims=True)
+    bge = bge / np.where(bge_norms > 0, bge_norms, 1)
+    X = np.concatenate([bge, np.asarray(e5_embeddings, dtype=np.float32)], axis=1)
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    return X / np.where(norms > 0, norms, 1)
+
+
+def encode_batch_for_classification(texts: list, model_bge, model_e5) -> np.ndarray:
+    """Batched encode_for_classification: one call per model. Returns an (N, 2048) array."""
+    if not texts:
+        return np.empty((0, 0), dtype=np.float32)
+    clean = [strip_html(t) for t in texts]
+    emb_bge = model_bge.encode(clean, normalize_embeddings=True)
+    emb_e5 = model_e5.encode([E5_PROMPT + c for c in clean], normalize_embeddings=True)
+    return build_cls_embeddings(emb_bge, emb_e5)
+
+
+class NumpyHead:
+    """Pure-NumPy replacement for the calibrated LinearSVC head's predict_proba.
+
+    Reproduces CalibratedClassifierCV(method="sigmoid") over K one-vs-rest
+    LinearSVC folds: one GEMM for all K×C decision functions, the per-class
+    sigmoid calibration, per-fold normalization, then the mean over folds.
+    """
+
+    def __init__(self, coef, intercept, sigmoid_a, sigmoid_b):
+        k, c, d = coef.shape
+        self.n_folds, self.n_classes = k, c
+        self._weights = np.ascontiguousarray(coef.reshape(k * c, d).T)
+        self._bias = intercept.reshape(k * c)
+        self._a = sigmoid_a.reshape(k * c)
+        self._b = sigmoid_b.reshape(k * c)
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=self._weights.dtype)
+        decision = X @ self._weights + self._bias
+        proba = (1.0 / (1.0 + np.exp(self._a * decision + self._b))).reshape(len(X), self.n_folds, self.n_classes)
+        denominator = proba.sum(axis=2, keepdims=True)
+        proba = np.divide(
+            proba, denominator,
+            out=np.full_like(proba, 1 / self.n_classes), where=denominator != 0,
+        )
+        proba[(1.0 < proba) & (proba <= 1.0 + 1e-5)] = 1.0
+        return proba.mean(axis=1)
+
+
+def load_numpy_head(path=None):
+    """Load a head exported by classifier/train.py as .npz. Raises FileNotFoundError if not found."""
+    p = Path(path) if path else DEFAULT_NUMPY_HEAD_PATH
+    try:
+        data = np.load(p, allow_pickle=False)
+    except FileNotFoundError:
+        raise FileNotFoundError(
+            f"Classifier head not found at '{p}'. Run: pdm run python classifier/train.py"
+        )
+    with data:
+        labels = [str(label) for label in data["labels"]]
+        themes = [str(theme) for theme in data["themes"]]
+        return {
+            "clf": NumpyHead(data["coef"], data["intercept"], data["sigmoid_a"], data["sigmoid_b"]),
+            "themes": themes,
+            "label_to_theme": dict(zip(labels, themes)),
+            "meta": json.loads(str(data["meta"])),
+        }
+
+
 def load_classifier_head(path=None):
-    """Load the trained classifier head. Raises FileNotFoundError if not found."""
+    """Load the trained classifier head. Raises FileNotFoundError if not found.
+
+    Defaults to the NumPy export (no scikit-learn import) when present and
+    falls back to the joblib head; an explicit path picks the loader by suffix.
+    """
+    if path is None:
+        path = DEFAULT_NUMPY_HEAD_PATH if DEFAULT_NUMPY_HEAD_PATH.exists() else DEFAULT_HEAD_PATH
+    p = Path(path)
+    if p.suffix == ".npz":
+        return load_numpy_head(p)
     import joblib
-    p = Path(path) if path else DEFAULT_HEAD_PATH
     try:
         return joblib.load(p)
     except FileNotFoundError:
@@ -128,6 +264,14 @@ def load_classifier_head(path=None):
         )
 
 
+def _head_themes(head):
+    """Return the index → theme name table matching the head's predict_proba columns."""
+    if "themes" in head:
+        return head["themes"]
+    label_to_theme = head["label_to_theme"]
+    return [label_to_theme[label] for label in head["label_encoder"].classes_]
+
+
 def classify_article(embedding, head, threshold=CLASSIFICATION_THRESHOLD):
     """Return the theme name for the given article embedding."""
     return classify_article_scored(embedding, head, threshold)["theme"]
@@ -142,32 +286,40 @@ def classify_article_scored(embedding, head, threshold=CLASSIFICATION_THRESHOLD)
       runner_up    — name of the second-best theme (or None)
       runner_up_score — score of the second-best theme (or None)
     """
-    clf = head["clf"]
-    le = head["label_encoder"]
-    label_to_theme = head["label_to_theme"]
+    return classify_batch([embedding], head, threshold)[0]
 
+
+def classify_batch(embeddings, head, threshold=CLASSIFICATION_THRESHOLD):
+    """Classify an (N, 2048) matrix of embeddings with a single predict_proba call.
+
+    Returns one dict per row, with the same keys as classify_article_scored.
+    """
+    X = np.asarray(embeddings)
+    if len(X) == 0:
+        return []
     # Normalize to match training distribution (train.py uses normalize_embeddings=True)
-    embedding = _l2_normalize(embedding)
-
-    proba = clf.predict_proba([embedding])[0]
-    sorted_idx = np.argsort(proba)[::-1]
-
-    top_idx = int(sorted_idx[0])
-    top_score = float(proba[top_idx])
-    top_label = le.inverse_transform([top_idx])[0]
-    top_theme = label_to_theme[top_label] if top_score >= threshold else UNCLASSIFIED
-
-    runner_up = None
-    runner_up_score = None
-    if len(sorted_idx) > 1:
-        ru_idx = int(sorted_idx[1])
-        runner_up_score = float(proba[ru_idx])
-        runner_up_label = le.inverse_transform([ru_idx])[0]
-        runner_up = label_to_theme[runner_up_label]
-
-    return {
-        "theme": top_theme,
-        "top_score": top_score,
-        "runner_up": runner_up,
-        "runner_up_score": runner_up_score,
-    }
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    X = X / np.where(norms > 0, norms, 1)
+
+    proba = np.asarray(head["clf"].predict_proba(X))
+    themes = _head_themes(head)
+    rows = np.arange(len(proba))
+
+    # Stable sort: tied themes keep the head's column order
+    top2 = np.argsort(-proba, axis=1, kind="stable")[:, :2]
+    top_scores = proba[rows, top2[:, 0]]
+
+    results = []
+    for i, top_score in enumerate(top_scores):
+        top_idx = top2[i, 0]
+        result = {
+            "theme": themes[top_idx] if top_score >= threshold else UNCLASSIFIED,
+            "top_score": float(top_score),
+            "runner_up": None,
+            "runner_up_score": None,
+        }
+        if top2.shape[1] > 1:
+            result["runner_up"] = themes[top2[i, 1]]
+            result["runner_up_score"] = float(proba[i, top2[i, 1]])
+        results.append(result)
+    return results
@@ -0,0 +1,191 @@
+import fcntl
+import hashlib
+import json
+import re
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+EMBEDDING_CACHE_DIR = Path(".embedding-cache")
+_VECTORS_NAME = "vectors.f32"
+_KEYS_NAME = "keys.txt"
+_META_NAME = "meta.json"
+_LOCK_NAME = ".lock"
+
+
+def _text_key(model_id, text):
+    return hashlib.sha256(f"{model_id}\0{text}".encode()).hexdigest()[:32]
+
+
+class EmbeddingStore:
+    """Append-only on-disk embedding store for one model.
+
+    Vectors are raw float32 rows in vectors.f32 (read through a memory map);
+    keys.txt holds one text hash per line, the line number being the row.
+    Loads and appends hold an exclusive flock on the store, so processes
+    sharing it (aggregate-rss and search-archive, say) append one at a time
+    and each picks up the rows the others added. Only rows with both a
+    complete key line and a complete vector count: a crash mid-append leaves
+    an orphan tail in one of the files, which the next load or append cuts.
+    """
+
+    def __init__(self, directory, model_id):
+        self.model_id = model_id
+        self.path = Path(directory) / re.sub(r"[^\w.-]+", "--", model_id)
+        self._lock = threading.Lock()
+        self._rows = {}
+        self._dim = None
+        self._matrix = None
+        # Rows read so far and the byte length of their key lines.
+        self._size = 0
+        self._keys_size = 0
+        if self.path.exists():
+            with self._locked():
+                self._sync()
+
+    @contextmanager
+    def _locked(self):
+        """Hold the thread lock and an exclusive flock shared with other processes."""
+        with self._lock:
+            self.path.mkdir(parents=True, exist_ok=True)
+            with open(self.path / _LOCK_NAME, "a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _sync(self):
+        """With the flock held: read rows appended since the last sync, then cut any orphan tail."""
+        if self._dim is None:
+            try:
+                self._dim = json.loads((self.path / _META_NAME).read_text())["dim"]
+            except (FileNotFoundError, ValueError, KeyError):
+                self._dim = None
+        if self._dim is not None:
+            try:
+                with open(self.path / _KEYS_NAME, "rb") as f:
+                    f.seek(self._keys_size)
+                    lines = f.read().split(b"\n")[:-1]
+                vector_rows = (self.path / _VECTORS_NAME).stat().st_size // (4 * self._dim)
+            except FileNotFoundError:
+                lines, vector_rows = [], 0
+            lines = lines[: max(0, vector_rows - self._size)]
+            for row, line in enumerate(lines, self._size):
+                self._rows.setdefault(line.decode(), row)
+            self._size += len(lines)
+            self._keys_size += sum(len(line) + 1 for line in lines)
+        vectors_size = self._size * 4 * self._dim if self._dim else 0
+        for name, size in ((_VECTORS_NAME, vectors_size), (_KEYS_NAME, self._keys_size)):
+            path = self.path / name
+            if path.exists() and path.stat().st_size > size:
+                with open(path, "r+b") as f:
+                    f.truncate(size)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _vectors(self):
+        if self._matrix is None or len(self._matrix) < self._size:
+            self._matrix = np.memmap(
+                self.path / _VECTORS_NAME, dtype=np.float32, mode="r",
+                shape=(self._size, self._dim),
+            )
+        return self._matrix
+
+    def lookup(self, keys):
+        """Return stored vectors for keys as a dict {key: vector}; missing keys are absent."""
+        with self._lock:
+            hits = [(k, self._rows[k]) for k in keys if k in self._rows]
+            if not hits:
+                return {}
+            matrix = self._vectors()
+            return {k: np.array(matrix[row]) for k, row in hits}
+
+    def append(self, keys, vectors):
+        """Append (key, vector) rows for the keys not stored yet."""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._locked():
+            self._sync()
+            # Other callers may have encoded the same text; the first row wins.
+            fresh = {}
+            for i, k in enumerate(keys):
+                if k not in self._rows:
+                    fresh.setdefault(k, i)
+            if not fresh:
+                return
+            vectors = vectors[list(fresh.values())]
+            if self._dim is None:
+                self._dim = vectors.shape[1]
+                (self.path / _META_NAME).write_text(json.dumps({"model_id": self.model_id, "dim": self._dim}))
+            key_lines = "".join(f"{k}\n" for k in fresh).encode()
+            with open(self.path / _VECTORS_NAME, "ab") as f:
+                f.write(vectors.tobytes())
+            with open(self.path / _KEYS_NAME, "ab") as f:
+                f.write(key_lines)
+            for row, k in enumerate(fresh, self._size):
+                self._rows[k] = row
+            self._size += len(fresh)
+            self._keys_size += len(key_lines)
+
+
+class CachedEncoder:
+    """Drop-in stand-in for a SentenceTransformer that consults an EmbeddingStore first.
+
+    Texts are keyed by (model id, exact input text) — prompt prefixes such as
+    E5_PROMPT are part of the input text, so they are part of the key. Only
+    unseen texts reach the model, and the model itself is loaded lazily on
+    the first miss: a fully cached run never loads it at all.
+    """
+
+    def __init__(self, model_id, loader, cache_dir=None):
+        self.model_id = model_id
+        self._loader = loader
+        self._model = None
+        self._load_lock = threading.Lock()
+        self._store = EmbeddingStore(cache_dir or EMBEDDING_CACHE_DIR, model_id)
+
+    @property
+    def model(self):
+        # aggregate-rss pipeline stages may hit their first miss concurrently.
+        with self._load_lock:
+            if self._model is None:
+                self._model = self._loader()
+        return self._model
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+    def encode(self, sentences, normalize_embeddings=False, batch_size=32, store=True, **kwargs):
+        """Encode like SentenceTransformer.encode, serving cached rows without running the model.
+
+        With store=False, texts the model encodes are not added to the cache
+        (one-off inputs such as search queries).
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        keys = [_text_key(self.model_id, t) for t in texts]
+        found = self._store.lookup(keys)
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+        if missing:
+            fresh = np.asarray(
+                self.model.encode(list(missing.values()), batch_size=batch_size, normalize_embeddings=False, **kwargs),
+                dtype=np.float32,
+            )
+            if store:
+                self._store.append(list(missing), fresh)
+            found.update(zip(missing, fresh))
+
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        out = np.stack([found[k] for k in keys])
+        if normalize_embeddings:
+            norms = np.linalg.norm(out, axis=1, keepdims=True)
+            out = out / np.where(norms > 0, norms, 1)
+        return out[0] if single else out
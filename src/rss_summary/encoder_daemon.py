@@ -0,0 +1,249 @@
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+from pathlib import Path
+
+import click
+import numpy as np
+
+ENCODER_SOCKET = Path(".encoder.sock")
+BATCH_WAIT_MS = 10
+MAX_BATCH_TEXTS = 256
+_PROBE_TIMEOUT = 1.0
+_FRAME = struct.Struct(">II")
+
+
+def _recv_exact(sock, n):
+    chunks = []
+    while n:
+        chunk = sock.recv(min(n, 1 << 20))
+        if not chunk:
+            raise ConnectionError("encoder socket closed mid-message")
+        chunks.append(chunk)
+        n -= len(chunk)
+    return b"".join(chunks)
+
+
+def _send(sock, header, payload=b""):
+    """Send one message: a JSON header and a raw payload, both length-prefixed."""
+    head = json.dumps(header).encode()
+    sock.sendall(_FRAME.pack(len(head), len(payload)) + head + payload)
+
+
+def _recv(sock):
+    """Receive one message as (header, payload), or None if the peer closed the connection."""
+    first = sock.recv(_FRAME.size)
+    if not first:
+        return None
+    head_len, payload_len = _FRAME.unpack(first + _recv_exact(sock, _FRAME.size - len(first)))
+    header = json.loads(_recv_exact(sock, head_len))
+    return header, _recv_exact(sock, payload_len)
+
+
+def _request(path, header, timeout=None):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(str(path))
+        _send(sock, header)
+        reply = _recv(sock)
+    if reply is None:
+        raise ConnectionError("encoder daemon closed the connection")
+    header, payload = reply
+    if "error" in header:
+        raise RuntimeError(f"encoder daemon: {header['error']}")
+    return header, payload
+
+
+class RemoteEncoder:
+    """encode()-only stand-in for a SentenceTransformer served by a running encoder-daemon.
+
+    Returns float32 arrays like SentenceTransformer.encode. If the daemon
+    goes away mid-run, the model is loaded in-process with `fallback` and
+    used from then on.
+    """
+
+    def __init__(self, model_id, path=None, fallback=None):
+        self.model_id = model_id
+        self.path = Path(path) if path else ENCODER_SOCKET
+        self._fallback = fallback
+        self._local = None
+
+    def encode(self, sentences, batch_size=32, normalize_embeddings=False, **kwargs):
+        if self._local is not None:
+            return self._local.encode(sentences, batch_size=batch_size, normalize_embeddings=normalize_embeddings, **kwargs)
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        try:
+            header, payload = _request(self.path, {"op": "encode", "model": self.model_id, "texts": texts, "batch_size": batch_size})
+        except OSError as e:
+            if self._fallback is None:
+                raise
+            logging.warning("Encoder daemon unavailable (%s); loading %s in-process.", e, self.model_id)
+            self._local = self._fallback()
+            return self.encode(sentences, batch_size=batch_size, normalize_embeddings=normalize_embeddings, **kwargs)
+        out = np.frombuffer(payload, dtype=np.float32).reshape(header["shape"]).copy()
+        if normalize_embeddings:
+            norms = np.linalg.norm(out, axis=1, keepdims=True)
+            out = out / np.where(norms > 0, norms, 1)
+        return out[0] if single else out
+
+
+def served_models(path=None):
+    """Return the model ids a running encoder-daemon serves, or None when none answers on the socket."""
+    path = Path(path) if path else ENCODER_SOCKET
+    if not path.exists():
+        return None
+    try:
+        header, _ = _request(path, {"op": "models"}, timeout=_PROBE_TIMEOUT)
+    except (OSError, RuntimeError, ValueError):
+        return None
+    return header["models"]
+
+
+def connect_encoder(model_id, path=None, fallback=None):
+    """Return a RemoteEncoder for model_id if a running encoder-daemon serves it, else None."""
+    path = Path(path) if path else ENCODER_SOCKET
+    if model_id not in (served_models(path) or ()):
+        return None
+    logging.info("Encoding with %s through the encoder daemon at %s.", model_id, path)
+    return RemoteEncoder(model_id, path, fallback)
+
+
+class _Pending:
+    __slots__ = ("texts", "batch_size", "done", "result", "error")
+
+    def __init__(self, texts, batch_size):
+        self.texts = texts
+        self.batch_size = batch_size
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    """Serialize encode requests for one model, merging those that arrive within max_wait seconds.
+
+    A single worker thread owns the model: it takes the first waiting
+    request, keeps collecting until max_wait has passed or max_texts are
+    queued, runs one model.encode over the concatenation and hands each
+    caller its slice.
+    """
+
+    def __init__(self, model, max_wait=BATCH_WAIT_MS / 1000, max_texts=MAX_BATCH_TEXTS):
+        self.model = model
+        self.max_wait = max_wait
+        self.max_texts = max_texts
+        self._queue = queue.Queue()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def encode(self, texts, batch_size=32):
+        pending = _Pending(texts, batch_size)
+        self._queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        size = len(batch[0].texts)
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_texts:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+            size += len(batch[-1].texts)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            texts = [t for pending in batch for t in pending.texts]
+            try:
+                out = np.asarray(
+                    self.model.encode(texts, batch_size=max(p.batch_size for p in batch), normalize_embeddings=False),
+                    dtype=np.float32,
+                )
+                bounds = np.cumsum([len(p.texts) for p in batch])[:-1]
+                for pending, rows in zip(batch, np.split(out, bounds)):
+                    pending.result = rows
+            except Exception as e:
+                for pending in batch:
+                    pending.error = e
+            logging.debug("Encoded %d texts for %d requests.", len(texts), len(batch))
+            for pending in batch:
+                pending.done.set()
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        while (message := _recv(self.request)) is not None:
+            header, _ = message
+            try:
+                if header.get("op") == "models":
+                    _send(self.request, {"models": sorted(self.server.batchers)})
+                    continue
+                batcher = self.server.batchers.get(header.get("model"))
+                if batcher is None:
+                    raise ValueError(f"model {header.get('model')!r} is not served")
+                out = batcher.encode(header["texts"], header.get("batch_size", 32))
+            except Exception as e:
+                _send(self.request, {"error": str(e)})
+                continue
+            _send(self.request, {"shape": list(out.shape)}, np.ascontiguousarray(out, dtype=np.float32).tobytes())
+
+
+class EncoderServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix-socket server answering encode requests for a set of resident models."""
+
+    daemon_threads = True
+
+    def __init__(self, path, models, max_wait=BATCH_WAIT_MS / 1000, max_texts=MAX_BATCH_TEXTS):
+        self.batchers = {model_id: MicroBatcher(model, max_wait, max_texts) for model_id, model in models.items()}
+        super().__init__(str(path), _Handler)
+
+
+@click.command()
+@click.option("--socket", "socket_path", default=str(ENCODER_SOCKET), show_default=True, help="Unix socket to listen on")
+@click.option("--batch-wait-ms", default=BATCH_WAIT_MS, show_default=True, help="How long to wait for more requests before encoding a batch")
+@click.option("--max-batch", default=MAX_BATCH_TEXTS, show_default=True, help="Max texts merged into one encode call")
+def main(socket_path, batch_wait_ms, max_batch):
+    """Keep bge-m3 and e5-instruct loaded and serve encode requests to the other commands."""
+    from sentence_transformers import SentenceTransformer
+
+    from rss_summary.classification import BGE_MODEL_ID, E5_MODEL_ID
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    path = Path(socket_path)
+    if served_models(path) is not None:
+        raise click.ClickException(f"An encoder daemon is already listening on {path}.")
+    path.unlink(missing_ok=True)
+
+    models = {}
+    for model_id in (BGE_MODEL_ID, E5_MODEL_ID):
+        logging.info("Loading %s…", model_id)
+        models[model_id] = SentenceTransformer(model_id)
+    server = EncoderServer(path, models, batch_wait_ms / 1000, max_batch)
+    os.chmod(path, 0o600)
+    logging.info("Encoder daemon listening on %s.", path)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        path.unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import hashlib
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+
+FEED_CACHE_DIR = Path(".feed-cache")
+_INDEX_NAME = "index.json"
+
+
+def _body_name(url):
+    return hashlib.sha1(url.encode()).hexdigest() + ".xml"
+
+
+class FeedCache:
+    """On-disk conditional-GET cache: ETag/Last-Modified validators plus the last body per feed URL.
+
+    Lives next to .last-run. Updates are kept in memory until save(), so a
+    --dry-run leaves the cache exactly as the last committed run left it.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory) if directory else FEED_CACHE_DIR
+        self._entries = {}
+        self._pending = {}
+        try:
+            self._entries = json.loads((self.directory / _INDEX_NAME).read_text())
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logging.warning("Ignoring unreadable feed cache index: %s", e)
+
+    def request_headers(self, url):
+        """Return the conditional-GET headers for url (empty when the feed was never cached)."""
+        entry = self._entries.get(url)
+        if not entry:
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def fetched_at(self, url):
+        """Return when the cached body for url was downloaded, or None."""
+        entry = self._entries.get(url)
+        return datetime.fromisoformat(entry["fetched_at"]) if entry else None
+
+    def body(self, url):
+        """Return the cached body for url, or None if it is missing on disk."""
+        if url in self._pending:
+            return self._pending[url]
+        entry = self._entries.get(url)
+        if not entry:
+            return None
+        try:
+            return (self.directory / entry["file"]).read_bytes()
+        except OSError:
+            return None
+
+    def store(self, url, headers, body):
+        """Record a fresh 200 response for url."""
+        self._entries[url] = {
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "fetched_at": datetime.today().isoformat(),
+            "file": _body_name(url),
+        }
+        self._pending[url] = body
+
+    def save(self):
+        """Write pending bodies and the validator index to disk."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for url, body in self._pending.items():
+            (self.directory / self._entries[url]["file"]).write_bytes(body)
+        (self.directory / _INDEX_NAME).write_text(json.dumps(self._entries, indent=2))
+        self._pending.clear()
@@ -0,0 +1,151 @@
+import logging
+import shutil
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+FEED_STATE_DB = Path(".feed-state.db")
+MAX_SEEN_PER_FEED = 500
+LATE_GRACE = timedelta(days=2)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS feeds (url TEXT PRIMARY KEY, watermark TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS seen (
+    feed TEXT NOT NULL,
+    guid TEXT NOT NULL,
+    published TEXT NOT NULL,
+    PRIMARY KEY (feed, guid)
+);
+CREATE TABLE IF NOT EXISTS feed_order (url TEXT PRIMARY KEY, newest_first INTEGER NOT NULL);
+"""
+
+
+class FeedState:
+    """Per-feed watermark and seen-entry store, kept in SQLite next to .last-run.
+
+    For a feed with state, an entry is new when its GUID (or link) was never
+    seen and it was published after the feed's newest date minus LATE_GRACE,
+    so late-published items and feeds with skewed clocks are neither missed
+    nor listed twice. Feeds without state fall back to the global .last-run
+    date. The store records which .last-run it was saved with; if that does
+    not match the current one (lost cache, .last-run from another machine),
+    it is ignored and every feed falls back, like before.
+
+    It also remembers whether each feed lists its entries newest-first, as
+    seen on its last fetch; that is a property of the feed rather than of a
+    run, so it survives a stale store.
+
+    Updates stay in memory until save(), so --dry-run leaves it untouched.
+    """
+
+    def __init__(self, path=None, last_run=None, grace=LATE_GRACE, max_seen=MAX_SEEN_PER_FEED):
+        self.path = Path(path) if path else FEED_STATE_DB
+        self.grace = grace
+        self.max_seen = max_seen
+        self._watermarks = {}
+        self._seen = {}
+        self._marked = {}
+        self._order = {}
+        self._new_order = {}
+        self._stale = True
+        if not self.path.exists():
+            return
+        try:
+            with self._transaction() as db:
+                self._order = {url: bool(flag) for url, flag in db.execute("SELECT url, newest_first FROM feed_order")}
+                stored = db.execute("SELECT value FROM meta WHERE key = 'last_run'").fetchone()
+                if last_run is not None and stored and stored[0] == last_run.isoformat():
+                    self._stale = False
+                    self._watermarks = {url: datetime.fromisoformat(w) for url, w in db.execute("SELECT url, watermark FROM feeds")}
+                    for feed, guid in db.execute("SELECT feed, guid FROM seen"):
+                        self._seen.setdefault(feed, set()).add(guid)
+                elif stored:
+                    logging.info("Feed state does not match .last-run; using the global watermark for every feed.")
+        except sqlite3.Error as e:
+            logging.warning("Ignoring unreadable feed state %s: %s", self.path, e)
+
+    @contextmanager
+    def _transaction(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            with db:
+                db.executescript(_SCHEMA)
+                yield db
+        finally:
+            db.close()
+
+    def is_new(self, feed, guid, published, fallback):
+        """Return True if the entry has not been processed by a previous run."""
+        watermark = self._watermarks.get(feed)
+        if watermark is None:
+            return published > fallback
+        return guid not in self._seen.get(feed, ()) and published > watermark - self.grace
+
+    def mark(self, feed, guid, published):
+        """Record an entry as processed by this run."""
+        self._marked.setdefault(feed, {})[guid] = published
+
+    def newest_first(self, feed):
+        """Return True if the feed listed its entries newest-first when last fetched."""
+        return self._order.get(feed, False)
+
+    def record_order(self, feed, dates):
+        """Record whether a fetch listed the feed's dated entries newest-first (ties allowed)."""
+        if len(dates) > 1:
+            self._new_order[feed] = all(a >= b for a, b in zip(dates, dates[1:]))
+
+    def stop_before(self, feed, fallback):
+        """Date at or before which a newest-first feed can no longer hold a new entry, or None."""
+        if not self.newest_first(feed):
+            return None
+        watermark = self._watermarks.get(feed)
+        return fallback if watermark is None else watermark - self.grace
+
+    def save(self, last_run):
+        """Back up the store, then write this run's entries and watermarks in one transaction."""
+        if self.path.exists():
+            shutil.copy2(self.path, _backup_path(self.path))
+        with self._transaction() as db:
+            if self._stale:
+                db.execute("DELETE FROM feeds")
+                db.execute("DELETE FROM seen")
+            for feed, entries in self._marked.items():
+                newest = max(entries.values())
+                old = self._watermarks.get(feed)
+                watermark = max(newest, old) if old else newest
+                db.execute("INSERT OR REPLACE INTO feeds (url, watermark) VALUES (?, ?)", (feed, watermark.isoformat()))
+                db.executemany(
+                    "INSERT OR REPLACE INTO seen (feed, guid, published) VALUES (?, ?, ?)",
+                    [(feed, guid, published.isoformat()) for guid, published in entries.items()],
+                )
+                db.execute(
+                    "DELETE FROM seen WHERE feed = ? AND (published <= ? OR guid NOT IN "
+                    "(SELECT guid FROM seen WHERE feed = ? ORDER BY published DESC LIMIT ?))",
+                    (feed, (watermark - self.grace).isoformat(), feed, self.max_seen),
+                )
+            db.executemany(
+                "INSERT OR REPLACE INTO feed_order (url, newest_first) VALUES (?, ?)",
+                [(feed, int(flag)) for feed, flag in self._new_order.items()],
+            )
+            db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_run', ?)", (last_run.isoformat(),))
+        self._order.update(self._new_order)
+        self._new_order.clear()
+        self._marked.clear()
+        self._stale = False
+
+
+def _backup_path(path):
+    return path.with_name(path.name + ".bak")
+
+
+def restore_feed_state(path=None):
+    """Restore .feed-state.db from .feed-state.db.bak."""
+    path = Path(path) if path else FEED_STATE_DB
+    backup = _backup_path(path)
+    if backup.exists():
+        shutil.copy2(backup, path)
+        logging.info("Restored feed state from %s", backup)
+    else:
+        logging.warning("No feed state backup found (%s does not exist).", backup)
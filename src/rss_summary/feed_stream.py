@@ -0,0 +1,132 @@
+import calendar
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import feedparser
+
+_FEED_ROOTS = {"rss", "feed"}
+_ENTRY_TAGS = {"item", "entry"}
+_MEDIA_NS = "{http://search.yahoo.com/mrss/}"
+
+
+class StreamParseError(Exception):
+    """The body is not a plain RSS 2.0 / Atom document; use feedparser instead."""
+
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _parse_date(text):
+    """RFC 822 (RSS) or ISO 8601 (Atom) date → UTC struct_time like feedparser's *_parsed, or None."""
+    text = (text or "").strip()
+    if not text:
+        return None
+    try:
+        dt = parsedate_to_datetime(text)
+    except (TypeError, ValueError):
+        try:
+            dt = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc)
+    return time.gmtime(calendar.timegm(dt.timetuple()))
+
+
+def _entry(elem):
+    """Map an <item>/<entry> element to the feedparser fields aggregate-rss reads."""
+    entry = feedparser.FeedParserDict()
+    summary = None
+    for child in elem:
+        name = _local(child.tag)
+        text = (child.text or "").strip()
+        if child.tag.startswith(_MEDIA_NS):
+            if name == "content" and child.get("url"):
+                entry.setdefault("media_content", []).append(dict(child.attrib))
+        elif name == "title":
+            entry["title"] = text
+        elif name == "link":
+            href = child.get("href")
+            if href is None:
+                entry["link"] = text
+            elif child.get("rel", "alternate") == "alternate":
+                entry["link"] = href
+        elif name in ("guid", "id"):
+            entry["id"] = text
+        elif name in ("pubDate", "published"):
+            entry["published"] = text
+            entry["published_parsed"] = _parse_date(text)
+        elif name in ("description", "summary") or (name == "content" and summary is None):
+            summary = "".join(child.itertext()).strip() if len(child) else text
+    if summary is not None:
+        entry["summary"] = summary
+        entry["summary_detail"] = feedparser.FeedParserDict(value=summary, type="text/html")
+    if "link" not in entry and entry.get("id", "").startswith("http"):
+        entry["link"] = entry["id"]
+    return entry
+
+
+def iter_entries(chunks):
+    """Pull-parse an RSS 2.0 or Atom body from byte chunks, yielding entries as they close.
+
+    Each finished item is detached from the tree, so memory stays bounded by
+    one entry whatever the feed length. Raises StreamParseError for malformed
+    XML or any other document type (RSS 1.0/RDF, HTML error pages, …).
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    stack = []
+    try:
+        for chunk in chunks:
+            parser.feed(chunk)
+            for event, elem in parser.read_events():
+                if event == "start":
+                    if not stack and _local(elem.tag) not in _FEED_ROOTS:
+                        raise StreamParseError(f"unsupported root element <{_local(elem.tag)}>")
+                    stack.append(elem)
+                    continue
+                stack.pop()
+                if _local(elem.tag) in _ENTRY_TAGS:
+                    yield _entry(elem)
+                    if stack:
+                        stack[-1].remove(elem)
+        parser.close()
+    except ET.ParseError as e:
+        raise StreamParseError(str(e)) from e
+
+
+def parse_stream(chunks, stop_before=None):
+    """Parse a newest-first feed, stopping at the first entry published at or before stop_before.
+
+    Every entry must carry a pubDate or published date; a feed with an
+    undated entry raises StreamParseError so the caller uses feedparser.
+
+    Returns (feed, complete, consumed): a FeedParserDict with the entries read,
+    whether the whole body was parsed, and the raw bytes read so far (kept
+    for the feed cache and the feedparser fallback). Raises StreamParseError
+    like iter_entries, with the bytes already read attached as .consumed.
+    """
+    consumed = []
+
+    def tee():
+        for chunk in chunks:
+            consumed.append(chunk)
+            yield chunk
+
+    entries = []
+    try:
+        for entry in iter_entries(tee()):
+            published = entry.get("published_parsed")
+            if published is None:
+                # Dated only by dc:date/<updated>, or not at all: leave the
+                # whole feed to feedparser so both paths see the same entries.
+                raise StreamParseError("entry without a pubDate/published date")
+            if stop_before is not None and published and datetime(*published[:6]) <= stop_before:
+                return feedparser.FeedParserDict(entries=entries), False, b"".join(consumed)
+            entries.append(entry)
+    except StreamParseError as e:
+        e.consumed = b"".join(consumed)
+        raise
+    return feedparser.FeedParserDict(entries=entries), True, b"".join(consumed)
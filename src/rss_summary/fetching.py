@@ -0,0 +1,152 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from urllib.parse import urlsplit
+
+import feedparser
+import requests
+
+from rss_summary.feed_stream import StreamParseError, parse_stream
+
+FETCH_TIMEOUT = 20
+MAX_PER_HOST = 2
+MAX_WORKERS = 8
+USER_AGENT = "Mozilla/5.0 (compatible; rss-summary/0.1)"
+_CHUNK_SIZE = 64 * 1024
+
+
+class HostLimiter:
+    """Hand out one bounded semaphore per hostname to cap concurrent requests per server."""
+
+    def __init__(self, max_per_host=MAX_PER_HOST):
+        self.max_per_host = max_per_host
+        self._lock = threading.Lock()
+        self._semaphores = {}
+
+    def __call__(self, url):
+        host = urlsplit(url).hostname or ""
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._semaphores[host]
+
+
+def _iter_body(response, deadline):
+    """Yield a streamed response body, aborting once the wall-clock deadline has passed.
+
+    requests' own timeout only bounds each socket operation, so a server that
+    trickles bytes could otherwise hold a worker forever.
+    """
+    for chunk in response.iter_content(_CHUNK_SIZE):
+        yield chunk
+        if time.monotonic() > deadline:
+            raise requests.Timeout("feed download exceeded its deadline")
+
+
+def _read_body(response, deadline):
+    return b"".join(_iter_body(response, deadline))
+
+
+def _stream_body(url, chunks, stop_before):
+    """Pull-parse chunks until stop_before; returns (feed, body) or (None, full body) for odd feeds.
+
+    After an early stop the rest of the body is left unread and body is None:
+    a truncated copy must not go into the feed cache.
+    """
+    try:
+        feed, complete, body = parse_stream(chunks, stop_before)
+    except StreamParseError as e:
+        logging.info("Streaming parse failed for %s (%s); using feedparser.", url, e)
+        return None, e.consumed + b"".join(chunks)
+    if not complete:
+        logging.info("Stopped parsing %s after %d new entries.", url, len(feed.entries))
+        return feed, None
+    return feed, body
+
+
+def fetch_feed(url, timeout=FETCH_TIMEOUT, limiter=None, cache=None, since=None, streaming=False, stop_before=None):
+    """Download and parse one feed. Returns the feedparser result, or None on network error.
+
+    With a FeedCache, the request is conditional. A 304 for a body already
+    downloaded before `since` (the last run) means nothing new: the parse is
+    skipped and an empty feed returned. A 304 for a body fetched after `since`
+    (e.g. after --restore) re-parses the cached body instead.
+
+    With streaming=True, RSS 2.0 and Atom bodies go through the pull parser of
+    feed_stream instead of feedparser, and parsing stops at the first entry
+    published at or before `stop_before` (only pass it for feeds known to be
+    newest-first); the connection is then closed without reading the rest,
+    and the feed cache keeps its previous entry for that feed. Anything the
+    pull parser rejects falls back to feedparser.
+    """
+    feed = None
+
+    headers = {"User-Agent": USER_AGENT}
+    if cache is not None:
+        headers.update(cache.request_headers(url))
+    try:
+        with limiter(url) if limiter else nullcontext():
+            deadline = time.monotonic() + timeout
+            with requests.get(url, timeout=timeout, stream=True, headers=headers) as r:
+                r.raise_for_status()
+                if r.status_code == 304 and cache is not None:
+                    return _from_cache(url, cache, since, streaming, stop_before)
+                if streaming:
+                    feed, body = _stream_body(url, _iter_body(r, deadline), stop_before)
+                else:
+                    body = _read_body(r, deadline)
+    except requests.RequestException as e:
+        logging.warning("Could not fetch feed %s: %s", url, e)
+        return None
+    if cache is not None and body is not None:
+        cache.store(url, r.headers, body)
+    return feed if feed is not None else feedparser.parse(body)
+
+
+def _from_cache(url, cache, since, streaming=False, stop_before=None):
+    fetched_at = cache.fetched_at(url)
+    if since is not None and fetched_at is not None and fetched_at <= since:
+        logging.info("Feed unchanged since last run: %s", url)
+        return feedparser.FeedParserDict(entries=[])
+    body = cache.body(url)
+    if body is None:
+        logging.warning("Feed %s answered 304 but its cached body is missing.", url)
+        return None
+    if streaming:
+        feed, _ = _stream_body(url, iter([body]), stop_before)
+        if feed is not None:
+            return feed
+    return feedparser.parse(body)
+
+
+def iter_feeds(
+    urls, timeout=FETCH_TIMEOUT, max_per_host=MAX_PER_HOST, max_workers=MAX_WORKERS, cache=None, since=None,
+    streaming=False, stop_before=None,
+):
+    """Fetch all feeds concurrently, yielding each parsed feed (or None) in the order of urls.
+
+    A feed is yielded as soon as it and every feed before it are done, so a
+    consumer can start on the first feeds while later ones still download.
+    stop_before maps a feed URL to the date its streaming parse may stop at.
+    """
+    if not urls:
+        return
+    stop_before = stop_before or {}
+    limiter = HostLimiter(max_per_host)
+    t0 = time.monotonic()
+    fetched = 0
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as ex:
+        for feed in ex.map(lambda u: fetch_feed(u, timeout, limiter, cache, since, streaming, stop_before.get(u)), urls):
+            fetched += feed is not None
+            yield feed
+    logging.info("Fetched %d/%d feeds in %.1fs.", fetched, len(urls), time.monotonic() - t0)
+
+
+def fetch_feeds(
+    urls, timeout=FETCH_TIMEOUT, max_per_host=MAX_PER_HOST, max_workers=MAX_WORKERS, cache=None, since=None,
+    streaming=False, stop_before=None,
+):
+    """Fetch all feeds concurrently. Returns parsed feeds (or None) in the same order as urls."""
+    return list(iter_feeds(urls, timeout, max_per_host, max_workers, cache, since, streaming, stop_before))
@@ -0,0 +1,108 @@
+import json
+import logging
+import os
+import shutil
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+HISTORY_DIR = Path(".dedup-history")
+HISTORY_DAYS = 3
+_VECTORS_NAME = "vectors.f16"
+_INDEX_NAME = "index.json"
+
+
+class DedupHistory:
+    """Rolling N-day memory of kept articles (titles + normalized dedup embeddings) across runs.
+
+    Lives next to .last-run. Vectors are float16 rows in vectors.f16, read
+    through a memory map; index.json holds each row's title and kept date.
+    Rows older than `days` are ignored on load and dropped on save(), so the
+    files never grow past one window of articles.
+    """
+
+    def __init__(self, directory=None, days=HISTORY_DAYS, now=None):
+        self.directory = Path(directory) if directory else HISTORY_DIR
+        self.days = days
+        self.now = now or datetime.today()
+        self.titles = []
+        self.kept_at = []
+        self.embeddings = np.empty((0, 0), dtype=np.float16)
+        self._new_titles, self._new_embeddings = [], []
+        try:
+            index = json.loads((self.directory / _INDEX_NAME).read_text())
+            rows = index["rows"]
+            if not rows:
+                return
+            vectors = np.memmap(self.directory / _VECTORS_NAME, dtype=np.float16, mode="r", shape=(len(rows), index["dim"]))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning("Ignoring unreadable dedup history: %s", e)
+            return
+        cutoff = self.now - timedelta(days=days)
+        live = [i for i, row in enumerate(rows) if datetime.fromisoformat(row["kept_at"]) >= cutoff]
+        self.titles = [rows[i]["title"] for i in live]
+        self.kept_at = [rows[i]["kept_at"] for i in live]
+        self.embeddings = np.array(vectors[live]) if live else np.empty((0, index["dim"]), dtype=np.float16)
+
+    def __len__(self):
+        return len(self.titles)
+
+    def seed(self, embedding_index, title_index):
+        """Preload an EmbeddingIndex and a TitleIndex with the articles kept within the window."""
+        for title in self.titles:
+            title_index.add(title)
+        if len(self):
+            embedding_index.extend(self.embeddings.astype(np.float32))
+        logging.info("Dedup history: %d articles kept in the last %d days.", len(self), self.days)
+
+    def add(self, title, embedding):
+        """Record an article kept by this run."""
+        self._new_titles.append(title)
+        self._new_embeddings.append(np.asarray(embedding, dtype=np.float32).reshape(-1))
+
+    def save(self):
+        """Back up the history, then write the window's rows plus this run's additions; older rows are evicted."""
+        if self._new_embeddings:
+            new = np.stack(self._new_embeddings)
+            norms = np.linalg.norm(new, axis=1, keepdims=True)
+            new = (new / np.where(norms > 0, norms, 1)).astype(np.float16)
+            embeddings = np.concatenate([self.embeddings, new]) if len(self) else new
+        else:
+            embeddings = self.embeddings
+        now = self.now.isoformat()
+        rows = [{"title": t, "kept_at": k} for t, k in zip(self.titles, self.kept_at)]
+        rows += [{"title": t, "kept_at": now} for t in self._new_titles]
+
+        backup = _backup_dir(self.directory)
+        shutil.rmtree(backup, ignore_errors=True)
+        if self.directory.exists():
+            shutil.copytree(self.directory, backup)
+        else:
+            # An empty backup restores "no history" rather than leaving this run's rows.
+            backup.mkdir(parents=True)
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.directory / (_VECTORS_NAME + ".tmp")
+        np.ascontiguousarray(embeddings, dtype=np.float16).tofile(tmp)
+        os.replace(tmp, self.directory / _VECTORS_NAME)
+        dim = embeddings.shape[1] if embeddings.ndim == 2 else 0
+        (self.directory / _INDEX_NAME).write_text(json.dumps({"dim": dim, "rows": rows}, ensure_ascii=False))
+
+
+def _backup_dir(directory):
+    return directory.with_name(directory.name + ".bak")
+
+
+def restore_dedup_history(directory=None):
+    """Restore .dedup-history/ from .dedup-history.bak/."""
+    directory = Path(directory) if directory else HISTORY_DIR
+    backup = _backup_dir(directory)
+    if backup.exists():
+        shutil.rmtree(directory, ignore_errors=True)
+        shutil.copytree(backup, directory)
+        logging.info("Restored dedup history from %s", backup)
+    else:
+        logging.warning("No dedup history backup found (%s does not exist).", backup)
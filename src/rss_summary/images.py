@@ -0,0 +1,183 @@
+import codecs
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from rss_summary.fetching import MAX_PER_HOST, MAX_WORKERS, USER_AGENT, HostLimiter
+from rss_summary.urls import canonical_url
+
+IMAGE_CACHE = Path(".image-cache.json")
+IMAGE_TIMEOUT = 5
+MAX_SCAN_BYTES = 256 * 1024
+_SCAN_CHUNK_SIZE = 16 * 1024
+_META_IMAGES = ("og:image", "og:image:url", "og:image:secure_url", "twitter:image", "twitter:image:src")
+
+
+class ImageCache:
+    """Persistent article URL → preview image URL map ("" when the page has none).
+
+    Keyed by canonical_url, so tracking and AMP variants of a page share an
+    entry. Lives next to .last-run; updates stay in memory until save(), so
+    --dry-run leaves it untouched.
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else IMAGE_CACHE
+        self._images = {}
+        self._dirty = False
+        try:
+            self._images = json.loads(self.path.read_text())
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logging.warning("Ignoring unreadable image cache %s: %s", self.path, e)
+
+    def get(self, url):
+        """Return the cached image for url ("" if it has none), or None if url was never resolved."""
+        return self._images.get(canonical_url(url))
+
+    def set(self, url, image):
+        self._images[canonical_url(url)] = image
+        self._dirty = True
+
+    def save(self):
+        if not self._dirty:
+            return
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(self._images, ensure_ascii=False))
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+
+def make_session(pool_size=MAX_WORKERS):
+    """Return a requests.Session keeping up to pool_size connections alive per host."""
+    session = requests.Session()
+    session.headers["User-Agent"] = USER_AGENT
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class _ImageScanner(HTMLParser):
+    """Tokenizer that records the page's og:image / twitter:image meta or, failing those, its first <img src>."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.meta = {}
+        self.img = None
+        self.in_body = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "meta":
+            attrs = dict(attrs)
+            key = (attrs.get("property") or attrs.get("name") or "").lower()
+            if key in _META_IMAGES and attrs.get("content"):
+                self.meta.setdefault(key.split(":")[0], attrs["content"].strip())
+        elif tag == "body":
+            self.in_body = True
+        elif tag == "img" and self.img is None:
+            self.img = dict(attrs).get("src")
+            self.in_body = True
+
+    def handle_endtag(self, tag):
+        if tag == "head":
+            self.in_body = True
+
+    def image(self):
+        return self.meta.get("og") or self.meta.get("twitter") or self.img
+
+    def done(self):
+        # og:image ends the scan at once; twitter:image only once the head
+        # is over (an og:image may follow it); <img> is already a fallback.
+        return "og" in self.meta or (self.in_body and self.image() is not None)
+
+
+def scan_image(chunks, encoding=None, max_bytes=MAX_SCAN_BYTES):
+    """Tokenize HTML byte chunks until a preview image is found; return its src or None.
+
+    Stops at the first og:image, at twitter:image once </head> is reached,
+    or at the first <img src> in the body, and never reads past max_bytes.
+    """
+    scanner = _ImageScanner()
+    decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+    read = 0
+    for chunk in chunks:
+        chunk = chunk[:max_bytes - read]
+        read += len(chunk)
+        scanner.feed(decoder.decode(chunk))
+        if scanner.done() or read >= max_bytes:
+            break
+    return scanner.image()
+
+
+def _encoding(response):
+    # requests assumes ISO-8859-1 for text/* without a charset; these pages are UTF-8.
+    if "charset=" not in response.headers.get("Content-Type", "").lower():
+        return None
+    try:
+        return codecs.lookup(response.encoding).name
+    except (LookupError, TypeError):
+        return None
+
+
+def page_image(url, session=None, timeout=IMAGE_TIMEOUT, limiter=None, max_bytes=MAX_SCAN_BYTES):
+    """Return the page's preview image as an absolute URL, "" if it has none, or None if it could not be fetched.
+
+    Network errors and error statuses (429, 5xx, …) give None, so the page
+    is not cached and is tried again next run. The page is streamed and
+    scanned only up to its preview image (see scan_image); leaving the
+    with-block then closes the connection without downloading the rest.
+    Relative sources are resolved against the page actually served, after
+    redirects.
+    """
+    session = session or requests
+    try:
+        with limiter(url) if limiter else nullcontext():
+            with session.get(url, timeout=timeout, stream=True) as r:
+                if not r.ok:
+                    logging.info("Could not fetch %s for its preview image: HTTP %s", url, r.status_code)
+                    return None
+                src = scan_image(r.iter_content(_SCAN_CHUNK_SIZE), _encoding(r), max_bytes)
+                base = r.url
+    except requests.RequestException as e:
+        logging.info("Could not fetch %s for its preview image: %s", url, e)
+        return None
+    return urljoin(base, src) if src else ""
+
+
+def resolve_images(items, cache=None, timeout=IMAGE_TIMEOUT, max_per_host=MAX_PER_HOST, max_workers=MAX_WORKERS):
+    """Fill the media_content of items lacking one with their page's first image.
+
+    Cached pages are not fetched again; the others are fetched concurrently
+    through one pooled session, at most max_per_host at a time per server.
+    Pages that fail to download get an empty image and are retried next run.
+    """
+    missing = [item for item in items if not (item.get("media_content") or [{}])[0].get("url")]
+    pending = []
+    for item in missing:
+        cached = cache.get(item["link"]) if cache is not None else None
+        if cached is None:
+            pending.append(item)
+        else:
+            item["media_content"] = [{"url": cached}]
+    if pending:
+        t0 = time.monotonic()
+        limiter = HostLimiter(max_per_host)
+        with make_session(max_workers) as session, ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as ex:
+            images = list(ex.map(lambda item: page_image(item["link"], session, timeout, limiter), pending))
+        for item, image in zip(pending, images):
+            item["media_content"] = [{"url": image or ""}]
+            if image is not None and cache is not None:
+                cache.set(item["link"], image)
+        logging.info("Resolved %d preview images in %.1fs.", len(pending), time.monotonic() - t0)
+    logging.info("Preview images: %d from the feeds, %d cached, %d fetched.", len(items) - len(missing), len(missing) - len(pending), len(pending))
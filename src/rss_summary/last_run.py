@@ -9,11 +9,14 @@ DATE_FMT = "%d-%b-%Y (%H:%M:%S.%f)"
 
 
 def set_last_run_date():
+    """Back up .last-run, stamp it with the current time and return that time."""
     try:
         shutil.copy2(LAST_RUN_FILE, LAST_RUN_BACKUP)
     except FileNotFoundError:
         pass
-    LAST_RUN_FILE.write_text(datetime.today().strftime(DATE_FMT))
+    now = datetime.today()
+    LAST_RUN_FILE.write_text(now.strftime(DATE_FMT))
+    return now
 
 
 def restore_last_run_date():
@@ -1,14 +1,12 @@
 import re
 from datetime import datetime
 from pathlib import Path
-from urllib.parse import urlsplit
 
-import requests
-from bs4 import BeautifulSoup
+from rss_summary.text import html_to_text
 
 
 def strip_html(html_blob: str) -> str:
-    return BeautifulSoup(html_blob, features="html.parser").get_text()
+    return html_to_text(html_blob)
 
 
 def extract_first_paragraph(html_blob):
@@ -56,23 +54,3 @@ def parse_daily_feed_md(path):
 def format_article_text(article: dict) -> str:
     """Concatenate title and summary into a single string for model input."""
     return f"{article['title']}. {article.get('summary', '')}"
-
-
-def get_default_image_link(resource, origin_link):
-    img_link = resource.get("media_content", None)
-    if not img_link:
-        try:
-            r = requests.get(origin_link, timeout=5)
-            if not r.ok:
-                return [{"url": ""}]
-            soup = BeautifulSoup(r.text, features="html.parser")
-            if soup.img:
-                default_img = soup.img.get("src")
-                if default_img:
-                    o = urlsplit(origin_link)
-                    default_url = o._replace(path=default_img).geturl()
-                    return [{"url": default_url}]
-        except requests.RequestException:
-            pass
-        return [{"url": ""}]
-    return img_link
@@ -0,0 +1,69 @@
+import logging
+import queue
+import threading
+import time
+
+PIPELINE_QUEUE_SIZE = 4
+MICRO_BATCH_SIZE = 64
+_END = object()
+
+
+def micro_batches(items, size=MICRO_BATCH_SIZE):
+    """Group an iterable into lists of up to `size` items, preserving order."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Stage:
+    """Run a generator in a background thread, handing its output over through a bounded queue.
+
+    Chaining stages (each one iterating the previous) gives a pipeline in
+    which every step works concurrently with the others while the queues
+    bound how far a fast producer can run ahead. Items keep their order, an
+    exception raised by the generator is re-raised in the consumer, and the
+    stage's throughput is logged once it is drained. `count` maps an output
+    item to the number of records it carries (len for batches).
+    """
+
+    def __init__(self, name, source, maxsize=PIPELINE_QUEUE_SIZE, count=None):
+        self.name = name
+        self.items = 0
+        self.elapsed = 0.0
+        self.blocked = 0.0
+        self._source = source
+        self._count = count or (lambda item: 1)
+        self._queue = queue.Queue(maxsize)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name=f"pipeline-{name}", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        t0 = time.perf_counter()
+        try:
+            for item in self._source:
+                self.items += self._count(item)
+                t_put = time.perf_counter()
+                self._queue.put(item)
+                self.blocked += time.perf_counter() - t_put
+        except BaseException as e:
+            self._error = e
+        finally:
+            self.elapsed = time.perf_counter() - t0
+            self._queue.put(_END)
+
+    def __iter__(self):
+        while (item := self._queue.get()) is not _END:
+            yield item
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        logging.info(
+            "Stage %s: %d items in %.2fs (%.1f/s), %.2fs blocked on a full queue.",
+            self.name, self.items, self.elapsed, self.items / self.elapsed if self.elapsed else 0.0, self.blocked,
+        )
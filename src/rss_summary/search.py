@@ -0,0 +1,230 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+import unicodedata
+from pathlib import Path
+
+import click
+import numpy as np
+
+from rss_summary.archive import archive_path
+from rss_summary.classification import load_bge_model
+from rss_summary.parsing import format_article_text
+from rss_summary.similarity import encode_texts
+
+SEARCH_INDEX_NAME = ".search-index"
+SEMANTIC_MIN_SCORE = 0.5
+_RECORDS_NAME = "records.jsonl"
+_VECTORS_NAME = "vectors.f16"
+_POSTINGS_NAME = "postings.json"
+_META_NAME = "meta.json"
+_RECORD_FIELDS = ("day", "date", "title", "url", "theme")
+_FRENCH_STOPWORDS = frozenset("""
+    a ai au aux avec c ce ces cet cette d dans de des du elle en et il ils je l la le les leur leurs lui m ma mais
+    me meme mes moi mon n ne nos notre nous on ou par pas pour qu que qui s sa se ses son sur t ta te tes toi ton
+    tu un une vos votre vous y est sont ete etre avoir a plus apres avant entre sans sous chez lors depuis
+""".split())
+
+
+def search_index_path(data_dir):
+    """Return the search index directory for a data directory (data/ → data/.search-index)."""
+    return Path(data_dir) / SEARCH_INDEX_NAME
+
+
+def _fold(text):
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text):
+    """Accent-folded, lowercased French terms without stopwords; a final plural s/x is dropped."""
+    terms = []
+    for word in re.findall(r"\w+", _fold(text)):
+        if len(word) < 2 or word in _FRENCH_STOPWORDS:
+            continue
+        if len(word) > 3 and word[-1] in "sx":
+            word = word[:-1]
+        terms.append(word)
+    return terms
+
+
+class SearchIndex:
+    """Persistent full-text + semantic index over data/archive.jsonl.
+
+    The index remembers how many archive bytes it has consumed (and their
+    hash), so sync() only tokenizes and encodes records appended since the
+    last call; if the archive was rewritten (a re-run day), it is rebuilt,
+    with vectors coming back from the embedding cache. Queries read the
+    postings, the record list and a memory map of float16 bge-m3 vectors —
+    never the archive or the model (except to encode a semantic query).
+    """
+
+    def __init__(self, directory):
+        self.path = Path(directory)
+        self._load()
+
+    def _load(self):
+        try:
+            self.meta = json.loads((self.path / _META_NAME).read_text())
+            postings = json.loads((self.path / _POSTINGS_NAME).read_text())
+            lines = (self.path / _RECORDS_NAME).read_text().splitlines()
+            rows = self.meta.get("rows", 0)
+            vector_rows = (self.path / _VECTORS_NAME).stat().st_size // (2 * self.meta["dim"]) if rows else 0
+        except (FileNotFoundError, ValueError, KeyError):
+            self.meta, postings, lines, rows, vector_rows = {}, {"rows": 0, "terms": {}}, [], 0, 0
+        # Files are replaced one by one, meta last: an interrupted sync can
+        # leave records/vectors ahead of meta (read only up to meta's rows),
+        # but anything behind it, or postings from another sync, is corrupt.
+        if postings.get("rows") != rows or len(lines) < rows or vector_rows < rows:
+            logging.warning("Search index is inconsistent; it will be rebuilt.")
+            self.meta, postings, lines, rows = {}, {"rows": 0, "terms": {}}, [], 0
+        self.postings = postings["terms"]
+        self.records = json.loads("[" + ",".join(lines[:rows]) + "]")
+        self._days = np.array([r["day"] for r in self.records], dtype="datetime64[D]")
+
+    def __len__(self):
+        return len(self.records)
+
+    def _vectors(self):
+        if not self.records:
+            return np.empty((0, 0), dtype=np.float16)
+        return np.memmap(self.path / _VECTORS_NAME, dtype=np.float16, mode="r", shape=(len(self.records), self.meta["dim"]))
+
+    def _reset(self):
+        for name in (_META_NAME, _POSTINGS_NAME, _RECORDS_NAME, _VECTORS_NAME):
+            (self.path / name).unlink(missing_ok=True)
+        self._load()
+
+    def _replace(self, name, data):
+        tmp = self.path / (name + ".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, self.path / name)
+
+    def sync(self, archive, model):
+        """Index archive records added since the last sync. Returns how many were indexed.
+
+        An archive whose size and mtime match the last sync is not read at all.
+        """
+        try:
+            stat = Path(archive).stat()
+        except FileNotFoundError:
+            stat = None
+        if stat is not None and self.records and (stat.st_size, stat.st_mtime_ns) == (
+            self.meta.get("archive_offset"), self.meta.get("archive_mtime_ns"),
+        ):
+            return 0
+        data = Path(archive).read_bytes() if stat is not None else b""
+        offset = self.meta.get("archive_offset", 0)
+        if offset > len(data) or hashlib.sha1(data[:offset]).hexdigest() != self.meta.get("archive_digest", hashlib.sha1(b"").hexdigest()):
+            logging.info("Archive was rewritten; rebuilding the search index.")
+            self._reset()
+            offset = 0
+        new = [json.loads(line) for line in data[offset:].decode().splitlines() if line]
+        if not new:
+            return 0
+
+        embeddings = np.asarray(encode_texts(model, [format_article_text(r) for r in new]), dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings = (embeddings / np.where(norms > 0, norms, 1)).astype(np.float16)
+
+        first_row = len(self.records)
+        for row, record in enumerate(new, first_row):
+            for term in set(tokenize(f"{record['title']} {record.get('summary', '')}")):
+                self.postings.setdefault(term, []).append(row)
+        rows = first_row + len(new)
+
+        # Every file is rewritten through a temp file and os.replace, meta
+        # last, so a crash leaves an index _load() either accepts or rebuilds.
+        self.path.mkdir(parents=True, exist_ok=True)
+        records = [json.dumps(r, ensure_ascii=False) for r in self.records]
+        records += [json.dumps({k: r.get(k) for k in _RECORD_FIELDS}, ensure_ascii=False) for r in new]
+        self._replace(_RECORDS_NAME, "".join(line + "\n" for line in records).encode())
+        self._replace(_VECTORS_NAME, np.asarray(self._vectors()).tobytes() + embeddings.tobytes())
+        self._replace(_POSTINGS_NAME, json.dumps({"rows": rows, "terms": self.postings}, ensure_ascii=False).encode())
+        self.meta = {
+            "rows": rows,
+            "archive_offset": len(data),
+            "archive_mtime_ns": stat.st_mtime_ns if stat is not None else None,
+            "archive_digest": hashlib.sha1(data).hexdigest(),
+            "model_id": getattr(model, "model_id", None),
+            "dim": embeddings.shape[1],
+        }
+        self._replace(_META_NAME, json.dumps(self.meta).encode())
+        self._load()
+        logging.info("Search index: %d new articles, %d total.", len(new), len(self.records))
+        return len(new)
+
+    def _in_range(self, start, end):
+        mask = np.ones(len(self.records), dtype=bool)
+        if start is not None:
+            mask &= self._days >= np.datetime64(start, "D")
+        if end is not None:
+            mask &= self._days <= np.datetime64(end, "D")
+        return mask
+
+    def search_text(self, query, start=None, end=None, limit=20):
+        """Articles containing every query term within [start, end], newest first."""
+        terms = tokenize(query)
+        if not terms or not self.records:
+            return []
+        rows = None
+        for term in terms:
+            hits = np.asarray(self.postings.get(term, []), dtype=np.int64)
+            rows = hits if rows is None else np.intersect1d(rows, hits, assume_unique=True)
+        rows = rows[self._in_range(start, end)[rows]]
+        rows = rows[np.argsort(self._days[rows], kind="stable")[::-1]]
+        return [self.records[i] for i in rows[:limit]]
+
+    def search_semantic(self, query_embedding, start=None, end=None, limit=20, min_score=SEMANTIC_MIN_SCORE):
+        """Articles closest to query_embedding (cosine >= min_score) within [start, end], best first."""
+        if not self.records:
+            return []
+        q = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+        q = q / (np.linalg.norm(q) or 1)
+        rows = np.flatnonzero(self._in_range(start, end))
+        scores = self._vectors()[rows].astype(np.float32) @ q
+        order = np.argsort(-scores, kind="stable")[:limit]
+        return [
+            {**self.records[rows[i]], "score": float(scores[i])}
+            for i in order if scores[i] >= min_score
+        ]
+
+
+@click.command()
+@click.argument("query")
+@click.option("--since", default=None, type=click.DateTime(formats=["%Y-%m-%d"]), help="Earliest digest day (YYYY-MM-DD)")
+@click.option("--until", default=None, type=click.DateTime(formats=["%Y-%m-%d"]), help="Latest digest day (YYYY-MM-DD)")
+@click.option("--semantic", is_flag=True, help="Rank by bge-m3 similarity to the query instead of matching its words")
+@click.option("--limit", default=20, show_default=True, help="Max results")
+@click.option("--min-score", default=SEMANTIC_MIN_SCORE, show_default=True, help="With --semantic: minimum cosine similarity")
+@click.option("--data-dir", default="data", show_default=True, help="Directory containing archive.jsonl")
+def main(query, since, until, semantic, limit, min_score, data_dir):
+    """Search the article archive (full text by default, semantic with --semantic)."""
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    # Timed from the index load on, so the reported latency covers the sync
+    # check and, for --semantic, encoding the query.
+    t0 = time.perf_counter()
+    model = load_bge_model()
+    index = SearchIndex(search_index_path(data_dir))
+    index.sync(archive_path(data_dir), model)
+
+    start = since.date() if since else None
+    end = until.date() if until else None
+    if semantic:
+        # Ad-hoc queries are not worth keeping in the embedding cache.
+        results = index.search_semantic(model.encode(query, store=False), start, end, limit, min_score)
+    else:
+        results = index.search_text(query, start, end, limit)
+    elapsed = (time.perf_counter() - t0) * 1000
+
+    for r in results:
+        score = f" ({r['score']:.2f})" if "score" in r else ""
+        click.echo(f"{r['day']}  {r['title']}{score}\n            {r['url']}")
+    click.echo(f"{len(results)} result(s) in {elapsed:.1f} ms.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import logging
+from pathlib import Path
+
+import numpy as np
+
+from rss_summary.classification import E5_PROMPT
+from rss_summary.parsing import format_article_text, strip_html
+
+SIDECAR_SUFFIX = ".npz"
+
+
+def sidecar_path(feed_path):
+    """Return the sidecar path for a daily feed file: feed-YYYY-MM-DD.md → feed-YYYY-MM-DD.npz."""
+    return Path(feed_path).with_suffix(SIDECAR_SUFFIX)
+
+
+def write_sidecar(path, items, bge_embeddings, e5_embeddings):
+    """Write the day's articles with their vectors and classification scores to a compressed .npz.
+
+    items are the aggregate feed entries (title, summary, link, published_date
+    and, with --classify, a "classification" dict). bge rows are the clustering
+    vectors of format_article_text(item), e5 rows the normalized e5-instruct
+    vectors of the same text; both are stored as float16.
+    """
+    scores = [item.get("classification") or {} for item in items]
+    np.savez_compressed(
+        path,
+        url=np.array([item["link"] for item in items], dtype=str),
+        title=np.array([item["title"] for item in items], dtype=str),
+        summary=np.array([item["summary"] for item in items], dtype=str),
+        date=np.array([item["published_date"].isoformat() for item in items], dtype=str),
+        text=np.array([strip_html(format_article_text(item)) for item in items], dtype=str),
+        bge=np.asarray(bge_embeddings, dtype=np.float16),
+        e5=np.asarray(e5_embeddings, dtype=np.float16),
+        theme=np.array([s.get("theme") or "" for s in scores], dtype=str),
+        top_score=np.array([s.get("top_score", np.nan) for s in scores], dtype=np.float32),
+        runner_up=np.array([s.get("runner_up") or "" for s in scores], dtype=str),
+        runner_up_score=np.array([np.nan if s.get("runner_up_score") is None else s["runner_up_score"] for s in scores], dtype=np.float32),
+    )
+    logging.info("Sidecar with %d articles written to %s", len(items), path)
+
+
+def load_sidecar(path):
+    """Load a sidecar as a dict of arrays, or None when it is missing or unreadable."""
+    try:
+        with np.load(path) as data:
+            return {key: data[key] for key in data.files}
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError) as e:
+        logging.warning("Ignoring unreadable sidecar %s: %s", path, e)
+        return None
+
+
+def sidecar_vectors(sidecars):
+    """Index sidecar rows by model input text. Returns ({bge text: vector}, {e5 text: vector}).
+
+    Keys are the exact strings the weekly pipeline encodes — the stripped
+    article text for bge-m3, E5_PROMPT + that text for e5-instruct — so a
+    sidecar row is only reused for an article whose title and summary match.
+    """
+    bge, e5 = {}, {}
+    for data in sidecars:
+        for text, bge_row, e5_row in zip(data["text"], data["bge"], data["e5"]):
+            bge[str(text)] = bge_row
+            e5[E5_PROMPT + str(text)] = e5_row
+    return bge, e5
+
+
+class SidecarEncoder:
+    """Wrap an encoder so texts with a precomputed sidecar vector skip the model.
+
+    Misses go to the wrapped encoder in one call; with a lazily loaded
+    CachedEncoder, a week fully covered by sidecars never loads the model.
+    """
+
+    def __init__(self, encoder, vectors, name="model"):
+        self._encoder = encoder
+        self._vectors = vectors
+        self._name = name
+
+    def __getattr__(self, name):
+        return getattr(self._encoder, name)
+
+    def encode(self, sentences, normalize_embeddings=False, **kwargs):
+        """Encode like SentenceTransformer.encode, serving sidecar rows first."""
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return self._encoder.encode(sentences, normalize_embeddings=normalize_embeddings, **kwargs)
+
+        missing = [i for i, t in enumerate(texts) if t not in self._vectors]
+        fresh = None
+        if missing:
+            fresh = np.asarray(
+                self._encoder.encode([texts[i] for i in missing], normalize_embeddings=normalize_embeddings, **kwargs),
+                dtype=np.float32,
+            )
+        logging.info("%s: %d/%d texts served from sidecars, %d encoded.", self._name, len(texts) - len(missing), len(texts), len(missing))
+
+        dim = fresh.shape[1] if fresh is not None else len(self._vectors[texts[0]])
+        out = np.empty((len(texts), dim), dtype=np.float32)
+        hits = [i for i, t in enumerate(texts) if t in self._vectors]
+        if hits:
+            stored = np.stack([self._vectors[texts[i]] for i in hits]).astype(np.float32)
+            if normalize_embeddings:
+                norms = np.linalg.norm(stored, axis=1, keepdims=True)
+                stored = stored / np.where(norms > 0, norms, 1)
+            out[hits] = stored
+        if missing:
+            out[missing] = fresh
+        return out[0] if single else out
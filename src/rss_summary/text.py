@@ -0,0 +1,135 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from html import unescape
+from html.entities import html5
+
+from bs4 import BeautifulSoup
+
+STRIP_CACHE_SIZE = 4096
+# Character references both html.unescape and BeautifulSoup decode the same way.
+_CHARREF = re.compile(r"&(?:#(\d{1,7})|#[xX]([0-9a-fA-F]{1,6})|([A-Za-z][A-Za-z0-9]*));")
+# A complete start or end tag; quoted attribute values may contain '>'.
+_TAG = re.compile(r"""<(?:[A-Za-z][^\s/>]*(?:[^<>"']|"[^"<]*"|'[^'<]*')*|/[A-Za-z][^<>]*)>""")
+# Elements whose content BeautifulSoup does not return as plain text nodes.
+_RAW_TEXT_TAG = re.compile(r"<(?:script|style|template|textarea|pre|title|noscript|plaintext|xmp|iframe|noembed|noframes)\b", re.IGNORECASE)
+# End tags of void elements, e.g. </br>: BeautifulSoup turns them into
+# empty elements, which changes how the whitespace around them is kept.
+_VOID_END_TAG = re.compile(
+    r"</(?:area|base|basefont|bgsound|br|col|command|embed|frame|hr|image|img|input|isindex|keygen|link|menuitem"
+    r"|meta|nextid|param|source|spacer|track|wbr)(?=[\s/>])",
+    re.IGNORECASE,
+)
+_STRAY_LT = re.compile(r"<(?![A-Za-z/])|</(?![A-Za-z])")
+_ASCII_SPACES = " \n\t\f\r"
+
+
+def _charrefs_are_plain(text):
+    """True if every '&' starts a character reference decoded identically by both parsers."""
+    matches = list(_CHARREF.finditer(text))
+    if text.count("&") != len(matches):
+        return False
+    for m in matches:
+        if m.group(3):
+            if m.group(3) + ";" not in html5:
+                return False
+        else:
+            codepoint = int(m.group(1)) if m.group(1) else int(m.group(2), 16)
+            if not 0x20 <= codepoint <= 0x10FFFF or 0x7F <= codepoint <= 0x9F or 0xD800 <= codepoint <= 0xDFFF:
+                return False
+    return True
+
+
+def _fast_text(html):
+    """Regex-tokenized extraction, or None when the markup needs the BeautifulSoup path."""
+    if _STRAY_LT.search(html) or _RAW_TEXT_TAG.search(html) or _VOID_END_TAG.search(html):
+        return None
+    out = []
+    for part in _TAG.split(html):
+        if not part:
+            continue
+        if "<" in part:
+            return None
+        if "&" in part:
+            if not _charrefs_are_plain(part):
+                return None
+            part = unescape(part)
+        # BeautifulSoup collapses whitespace-only strings to one newline or space.
+        if not part.strip(_ASCII_SPACES):
+            part = "\n" if "\n" in part else " "
+        out.append(part)
+    return "".join(out)
+
+
+def _soup_text(html):
+    return BeautifulSoup(html, features="html.parser").get_text()
+
+
+class _LRUCache:
+    """Thread-safe bounded mapping that evicts the least recently used key."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+
+_memo = _LRUCache(STRIP_CACHE_SIZE)
+
+
+def html_to_text(html):
+    """Return the text of an HTML fragment, exactly as BeautifulSoup's get_text() would.
+
+    Plain text is returned as is. Typical RSS summary markup (tags, standard
+    character references) is handled by a regex tokenizer; comments, CDATA,
+    <script>/<style>-like elements, void end tags such as </br>, unusual
+    references or an unterminated tag go through BeautifulSoup. Results are
+    memoized in a bounded LRU keyed by a hash of the input, since the same
+    summary is stripped for dedup, the digest, classification and the sidecar.
+    """
+    if "<" not in html and "&" not in html:
+        return html
+    key = hashlib.blake2b(html.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    text = _memo.get(key)
+    if text is None:
+        text = _fast_text(html)
+        if text is None:
+            text = _soup_text(html)
+        _memo.put(key, text)
+    return text
+
+
+def cache_info():
+    """Return (hits, misses, size) of the html_to_text memo."""
+    return _memo.hits, _memo.misses, len(_memo)
+
+
+def clear_cache():
+    _memo.clear()
@@ -0,0 +1,64 @@
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+SOURCE_MAP = {
+    "karibinfo.com": "Karibinfo",
+    "la1ere.franceinfo.fr": "La 1ère",
+    "rci.fm": "RCI",
+    "guadeloupe.franceantilles.fr": "France-Antilles",
+}
+
+# Hosts serving the same articles as the bare domain.
+_HOST_PREFIXES = ("www.", "m.", "mobile.", "amp.")
+_TRACKING_PARAMS = frozenset({"fbclid", "gclid", "dclid", "msclkid", "igshid", "mc_cid", "mc_eid", "xtor", "ref", "amp", "outputtype"})
+_TRACKING_PREFIXES = ("utm_", "at_", "pk_", "mtm_")
+_AMP_PATH = re.compile(r"(/amp)+/?$|^/amp(?=/)|\.amp(?=\.html?$)")
+# Sources whose article URLs end with a numeric id: a slug edited after
+# publication (or the article filed under another section) keeps the id.
+_ARTICLE_ID = {
+    "la1ere.franceinfo.fr": re.compile(r"-(\d{5,})\.html$"),
+    "guadeloupe.franceantilles.fr": re.compile(r"-(\d{5,})\.php$"),
+}
+
+
+def _source_domain(host):
+    for domain in SOURCE_MAP:
+        if host == domain or host.endswith("." + domain):
+            return domain
+    return None
+
+
+def extract_source(url):
+    host = urlsplit(url).hostname or ""
+    for domain, name in SOURCE_MAP.items():
+        if domain in host:
+            return name
+    return host
+
+
+def canonical_url(url):
+    """Reduce an article URL to an identity key shared by its tracking, AMP and mobile variants.
+
+    Scheme and host case are normalized, www./m./mobile./amp. host prefixes,
+    tracking parameters, AMP path markers, the fragment and a trailing slash
+    are dropped. Articles of SOURCE_MAP sources with a numeric article id are
+    keyed by that id alone. The result is meant for comparison, not fetching.
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    for prefix in _HOST_PREFIXES:
+        if host.startswith(prefix) and host.count(".") > 1:
+            host = host[len(prefix):]
+            break
+    domain = _source_domain(host)
+    if domain is not None:
+        host = domain
+    path = _AMP_PATH.sub("", parts.path) or "/"
+    id_match = _ARTICLE_ID.get(domain) and _ARTICLE_ID[domain].search(path)
+    if id_match:
+        return f"https://{host}/{id_match.group(1)}"
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in _TRACKING_PARAMS and not k.lower().startswith(_TRACKING_PREFIXES)
+    ))
+    return urlunsplit(("https", host, path.rstrip("/") or "/", query, ""))
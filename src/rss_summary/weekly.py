@@ -12,11 +12,13 @@ import numpy as np
 import requests
 from bs4 import BeautifulSoup
 from mistralai.client import Mistral
-from sentence_transformers import SentenceTransformer
 
-from rss_summary.classification import BGE_MODEL_ID, CLASSIFICATION_THRESHOLD, mistral_chat_with_retry, MISTRAL_MODEL, UNCLASSIFIED, batch_encode_e5, build_cls_embedding, classify_article_scored, geo_theme, load_classifier_head, load_e5_model, load_taxonomy
+from rss_summary.archive import archive_path, load_archive
+from rss_summary.classification import CLASSIFICATION_THRESHOLD, mistral_chat_with_retry, MISTRAL_MODEL, UNCLASSIFIED, batch_encode_e5, build_cls_embeddings, classify_batch, geo_theme, load_bge_model, load_classifier_head, load_e5_model, load_geo_gate, load_taxonomy
 from rss_summary.parsing import format_article_text, parse_daily_feed_md
-from rss_summary.similarity import encode_text
+from rss_summary.sidecar import SidecarEncoder, load_sidecar, sidecar_path, sidecar_vectors
+from rss_summary.similarity import IVF_NPROBE, EmbeddingIndex, IVFIndex, encode_texts
+from rss_summary.urls import extract_source
 
 MOIS = {
     1: "janvier", 2: "février", 3: "mars", 4: "avril",
@@ -24,26 +26,19 @@ MOIS = {
     9: "septembre", 10: "octobre", 11: "novembre", 12: "décembre",
 }
 
-SOURCE_MAP = {
-    "karibinfo.com": "Karibinfo",
-    "la1ere.franceinfo.fr": "La 1ère",
-    "rci.fm": "RCI",
-    "guadeloupe.franceantilles.fr": "France-Antilles",
-}
-
 CLUSTER_THRESHOLD = 0.70
+CLUSTER_MODE_GREEDY = "greedy"
+CLUSTER_MODE_COMPONENTS = "components"
+SIMILARITY_BLOCK_SIZE = 1024
+SEARCH_AUTO = "auto"
+SEARCH_EXACT = "exact"
+SEARCH_IVF = "ivf"
+ANN_MIN_ARTICLES = 2000
+RECALL_SAMPLE_SIZE = 200
 _FAITS_DIVERS = "Faits divers"
 _CLUSTER_SORT_KEY = lambda c: (bool(c["most_read_tags"]), c["score"])
 
 
-def extract_source(url):
-    host = urlparse(url).hostname or ""
-    for domain, name in SOURCE_MAP.items():
-        if domain in host:
-            return name
-    return host
-
-
 def parse_feed_file(path):
     """Parse a daily feed markdown table into a list of article dicts."""
     articles = parse_daily_feed_md(path)
@@ -95,29 +90,140 @@ def get_most_read_urls():
         return f_rci.result() | f_fa.result()
 
 
-def cluster_articles(articles, model):
-    """Greedy semantic clustering across all articles. Returns list of clusters."""
-    embeddings = [encode_text(model, format_article_text(a)) for a in articles]
-    sim_matrix = model.similarity(embeddings, embeddings)
-    assigned = [False] * len(articles)
-    clusters = []
+def _similarity_neighbours(matrix, threshold, block_size=SIMILARITY_BLOCK_SIZE):
+    """For each row i of a normalized matrix, the indices j > i with cosine >= threshold.
+
+    Similarities are computed block_size rows at a time and only the
+    above-threshold pairs are kept, so peak memory is block_size × n floats
+    rather than the full n × n matrix.
+    """
+    n = len(matrix)
+    neighbours = []
+    edges = 0
+    for start in range(0, n, block_size):
+        block = matrix[start:start + block_size] @ matrix.T
+        rows, cols = np.nonzero(block >= threshold)
+        later = cols > rows + start
+        rows, cols = rows[later], cols[later]
+        counts = np.bincount(rows, minlength=len(block))
+        neighbours.extend(np.split(cols, np.cumsum(counts)[:-1]))
+        edges += len(cols)
+    block_bytes = min(block_size, n) * n * matrix.itemsize
+    logging.info(
+        "Similarity: %d articles in blocks of %d rows — peak block %.1f MB "
+        "(full matrix would be %.1f MB), %d neighbour pairs kept (%.1f MB).",
+        n, block_size, block_bytes / 1e6, n * n * matrix.itemsize / 1e6,
+        edges, edges * np.dtype(np.intp).itemsize / 1e6,
+    )
+    return neighbours
+
+
+def _ivf_neighbours(matrix, threshold, nprobe=IVF_NPROBE):
+    """Same output as _similarity_neighbours, found through an IVFIndex (approximate)."""
+    if not len(matrix):
+        return []
+    index = IVFIndex(matrix)
+    neighbours = index.neighbours(threshold, nprobe)
+    logging.info(
+        "IVF index: %d articles in %d lists, nprobe=%d, %d neighbour pairs.",
+        len(matrix), index.nlist, nprobe, sum(len(n) for n in neighbours),
+    )
+    return neighbours
 
-    for i in range(len(articles)):
+
+def neighbour_recall(matrix, neighbours, threshold, sample_size=RECALL_SAMPLE_SIZE, seed=0):
+    """Share of the exact above-threshold pairs (i, j > i) found in neighbours, over a random sample of rows i.
+
+    Returns (recall, exact_pairs); recall is 1.0 when the sample has no pairs.
+    """
+    n = len(matrix)
+    rows = np.random.default_rng(seed).choice(n, min(sample_size, n), replace=False)
+    sims = matrix[rows] @ matrix.T
+    exact = found = 0
+    for r, i in enumerate(rows):
+        truth = np.flatnonzero(sims[r, i + 1:] >= threshold) + i + 1
+        exact += len(truth)
+        found += int(np.isin(truth, neighbours[i]).sum())
+    return (found / exact if exact else 1.0), exact
+
+
+def _greedy_clusters(neighbours):
+    """Leader clustering: each unassigned article in order claims its unassigned neighbours."""
+    assigned = np.zeros(len(neighbours), dtype=bool)
+    clusters = []
+    for i, nbrs in enumerate(neighbours):
         if assigned[i]:
             continue
-        cluster = [{"article": articles[i], "embedding": embeddings[i]}]
+        members = nbrs[~assigned[nbrs]]
         assigned[i] = True
-        for j in range(i + 1, len(articles)):
-            if assigned[j]:
-                continue
-            if sim_matrix[i][j].item() >= CLUSTER_THRESHOLD:
-                cluster.append({"article": articles[j], "embedding": embeddings[j]})
-                assigned[j] = True
-        clusters.append(cluster)
-
+        assigned[members] = True
+        clusters.append([i, *members.tolist()])
     return clusters
 
 
+def _connected_components(neighbours):
+    """Union-find over the similarity graph; clusters ordered by their first article."""
+    parent = np.arange(len(neighbours))
+
+    def find(x):
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    for i, nbrs in enumerate(neighbours):
+        for j in nbrs:
+            ri, rj = find(i), find(j)
+            if ri != rj:
+                parent[max(ri, rj)] = min(ri, rj)
+
+    components = {}
+    for i in range(len(neighbours)):
+        components.setdefault(find(i), []).append(i)
+    return list(components.values())
+
+
+def cluster_articles(articles, model, mode=CLUSTER_MODE_GREEDY, block_size=SIMILARITY_BLOCK_SIZE,
+                     search=SEARCH_EXACT, nprobe=IVF_NPROBE, recall_sample=RECALL_SAMPLE_SIZE):
+    """Semantic clustering across all articles. Returns list of clusters.
+
+    mode "greedy" (default) reproduces leader clustering: articles are taken
+    in order and each unassigned one claims every later unassigned article
+    above CLUSTER_THRESHOLD. mode "components" instead returns the connected
+    components of the above-threshold similarity graph (transitive merging).
+    Similarity is computed in row blocks of block_size (see _similarity_neighbours).
+
+    search "ivf" finds neighbours through an approximate IVFIndex instead, and
+    logs its pair recall against exact search on recall_sample rows (0 to
+    skip); "auto" picks it from ANN_MIN_ARTICLES articles upward.
+    """
+    embeddings = encode_texts(model, [format_article_text(a) for a in articles])
+    index = EmbeddingIndex(capacity=len(articles))
+    index.extend(embeddings)
+    if search == SEARCH_AUTO:
+        search = SEARCH_IVF if len(articles) >= ANN_MIN_ARTICLES else SEARCH_EXACT
+    if search == SEARCH_IVF:
+        neighbours = _ivf_neighbours(index.matrix, CLUSTER_THRESHOLD, nprobe)
+        if recall_sample and neighbours:
+            recall, pairs = neighbour_recall(index.matrix, neighbours, CLUSTER_THRESHOLD, recall_sample)
+            logging.info(
+                "IVF recall vs exact search: %.1f%% of %d pairs over %d sampled articles.",
+                100 * recall, pairs, min(recall_sample, len(articles)),
+            )
+    else:
+        neighbours = _similarity_neighbours(index.matrix, CLUSTER_THRESHOLD, block_size)
+    if mode == CLUSTER_MODE_COMPONENTS:
+        groups = _connected_components(neighbours)
+    else:
+        groups = _greedy_clusters(neighbours)
+    return [
+        [{"article": articles[j], "embedding": embeddings[j]} for j in group]
+        for group in groups
+    ]
+
+
 def score_cluster(cluster, most_read_paths):
     days = len({item["article"]["date"].date() for item in cluster})
     sources = len({item["article"]["source"] for item in cluster})
@@ -160,6 +266,68 @@ def _format_week_range(week_start, week_end):
     return start_str, end_str
 
 
+def _period_heading(week_num, start, end):
+    """'Semaine W05 — 26 janvier au 1 février 2026', or 'Du … au …' for a --from/--to range (week_num None)."""
+    start_str, end_str = _format_week_range(start, end)
+    if week_num is None:
+        return f"Du {start_str} au {end_str}"
+    return f"Semaine W{week_num:02d} — {start_str} au {end_str}"
+
+
+def _period_context(week_num, start, end):
+    """Inline form of _period_heading, for the prompt and the footer."""
+    start_str, end_str = _format_week_range(start, end)
+    if week_num is None:
+        return f"du {start_str} au {end_str}"
+    return f"semaine W{week_num:02d}, {start_str} au {end_str}"
+
+
+def _output_stem(week_num, start, end):
+    if week_num is None:
+        return f"digest-{start.strftime('%Y-%m-%d')}_{end.strftime('%Y-%m-%d')}"
+    return f"weekly-w{week_num:02d}"
+
+
+def load_period_articles(data_dir, start, end):
+    """Load every daily digest from start to end inclusive. Returns (articles, days_found).
+
+    Days present in data_dir/archive.jsonl come from one archive load; other
+    days fall back to parsing their feed-YYYY-MM-DD.md file.
+    """
+    data_path = Path(data_dir)
+    archived = {}
+    for a in load_archive(archive_path(data_path), start.date(), end.date()):
+        a["source"] = extract_source(a["url"])
+        archived.setdefault(a["day"], []).append(a)
+    articles = []
+    days_found = 0
+    for day_offset in range((end - start).days + 1):
+        day = start + timedelta(days=day_offset)
+        day_key = day.strftime('%Y-%m-%d')
+        feed_file = data_path / f"feed-{day_key}.md"
+        if day_key in archived:
+            days_found += 1
+            logging.info("Loaded %d articles for %s from the archive", len(archived[day_key]), day_key)
+            articles.extend(archived[day_key])
+        elif feed_file.exists():
+            days_found += 1
+            day_articles = parse_feed_file(feed_file)
+            logging.info("Loaded %d articles from %s", len(day_articles), feed_file.name)
+            articles.extend(day_articles)
+    return articles, days_found
+
+
+def load_period_sidecars(data_dir, start, end):
+    """Load the aggregate-rss sidecars next to the daily feed files from start to end inclusive."""
+    sidecars = []
+    for day_offset in range((end - start).days + 1):
+        day = start + timedelta(days=day_offset)
+        data = load_sidecar(sidecar_path(Path(data_dir) / f"feed-{day.strftime('%Y-%m-%d')}.md"))
+        if data is not None:
+            sidecars.append(data)
+    return sidecars
+
+
 def _cluster_sections(clusters):
     """Build numbered article sections for the Mistral prompt."""
     sections = []
@@ -204,11 +372,10 @@ def split_mixed_clusters(raw_clusters, model_e5, head):
 
     e5_embs = batch_encode_e5(flat_texts, model_e5)
 
+    cls_embs = build_cls_embeddings(np.stack([item["embedding"] for _, item in flat_items]), e5_embs)
     article_themes = {}  # cluster_idx → [(item, theme), …] in cluster order
-    for (cluster_idx, item), e5_emb in zip(flat_items, e5_embs):
-        cls_emb = build_cls_embedding(item["embedding"], e5_emb)
-        theme = classify_article_scored(cls_emb, head)["theme"]
-        article_themes.setdefault(cluster_idx, []).append((item, theme))
+    for (cluster_idx, item), scored in zip(flat_items, classify_batch(cls_embs, head)):
+        article_themes.setdefault(cluster_idx, []).append((item, scored["theme"]))
 
     result = []
     for cluster_idx, cluster in enumerate(raw_clusters):
@@ -240,13 +407,16 @@ def split_mixed_clusters(raw_clusters, model_e5, head):
 
 
 def generate_stitched_narrative(clusters, week_num, week_start, week_end, client):
-    """Single Mistral call producing one flowing editorial text covering all clusters."""
-    start_str, end_str = _format_week_range(week_start, week_end)
+    """Single Mistral call producing one flowing editorial text covering all clusters.
+
+    week_num None means a --from/--to range rather than an ISO week.
+    """
+    weekly = week_num is not None
     sections = _cluster_sections(clusters)
     prompt = (
-        f"Tu es journaliste et rédiges le résumé de l'actualité hebdomadaire en Guadeloupe "
-        f"pour un digest en ligne (semaine W{week_num:02d}, {start_str} au {end_str}).\n\n"
-        "Voici les principaux sujets de la semaine, classés par importance :\n\n"
+        f"Tu es journaliste et rédiges le résumé de l'actualité {'hebdomadaire ' if weekly else ''}en Guadeloupe "
+        f"pour un digest en ligne ({_period_context(week_num, week_start, week_end)}).\n\n"
+        f"Voici les principaux sujets de la {'semaine' if weekly else 'période'}, classés par importance :\n\n"
         + "\n\n".join(sections)
         + "\n\nRédige un texte fluide et cohérent de 400 à 600 mots qui passe naturellement "
         "d'un sujet à l'autre. Règles strictes à respecter :\n"
@@ -262,9 +432,8 @@ def generate_stitched_narrative(clusters, week_num, week_start, week_end, client
 
 def render_prose_digest(week_num, week_start, week_end, clusters, stitched):
     """Flat MD prose digest ordered by importance score with programmatic sources list."""
-    start_str, end_str = _format_week_range(week_start, week_end)
     ordered = sorted(clusters, key=_CLUSTER_SORT_KEY, reverse=True)
-    lines = [f"# Semaine W{week_num:02d} — {start_str} au {end_str}", ""]
+    lines = [f"# {_period_heading(week_num, week_start, week_end)}", ""]
     lines.append(stitched)
     lines.append("")
     lines.append("**Sources**")
@@ -277,7 +446,7 @@ def render_prose_digest(week_num, week_start, week_end, clusters, stitched):
         "---",
         f"*Ce digest a été généré automatiquement à partir des sujets les plus couverts "
         f"dans les flux RSS et des articles les plus lus sur RCI et France-Antilles "
-        f"(semaine W{week_num:02d}, {start_str} au {end_str}).*",
+        f"({_period_context(week_num, week_start, week_end)}).*",
     ]
     return "\n".join(lines)
 
@@ -405,8 +574,8 @@ def apply_suggestions_to_themes(suggestions, themes_path, head=None, model_bge=N
     Skips unknown themes and duplicates. Collects 'Nouveau thème' suggestions
     separately for human review.
 
-    When head, model_bge, and model_e5 are provided, each suggested example is
-    encoded and classified before being applied. If the classifier predicts a
+    When head, model_bge, and model_e5 are provided, the suggested examples are
+    encoded and classified in one batch before being applied. If the classifier predicts a
     *different* theme with score >= _CLASSIFIER_CONFLICT_THRESHOLD the suggestion
     is rejected — this prevents Mistral's geographic or thematic mistakes from
     polluting the training data (e.g. Haiti articles labelled Outre-mer when the
@@ -421,7 +590,7 @@ def apply_suggestions_to_themes(suggestions, themes_path, head=None, model_bge=N
     classifier_active = head is not None and model_bge is not None and model_e5 is not None
 
     theme_map = {t["theme"]: t for t in themes}
-    added = 0
+    candidates = []
     new_themes = []
     for i, s in enumerate(suggestions):
         theme_name = s.get("theme") or ""
@@ -436,11 +605,17 @@ def apply_suggestions_to_themes(suggestions, themes_path, head=None, model_bge=N
         if theme_name not in theme_map:
             logging.warning("Unknown theme '%s' — skipping.", theme_name)
             continue
-        if classifier_active:
-            bge_emb = encode_text(model_bge, example)
-            e5_emb = batch_encode_e5([example], model_e5)[0]
-            cls_emb = build_cls_embedding(bge_emb, e5_emb)
-            prediction = classify_article_scored(cls_emb, head)
+        candidates.append((theme_name, example))
+
+    predictions = [None] * len(candidates)
+    if classifier_active and candidates:
+        examples = [example for _, example in candidates]
+        cls_embs = build_cls_embeddings(encode_texts(model_bge, examples), batch_encode_e5(examples, model_e5))
+        predictions = classify_batch(cls_embs, head)
+
+    added = 0
+    for (theme_name, example), prediction in zip(candidates, predictions):
+        if prediction is not None:
             predicted = prediction["theme"]
             predicted_score = prediction["top_score"]
             if predicted != theme_name and predicted_score >= _CLASSIFIER_CONFLICT_THRESHOLD:
@@ -462,8 +637,8 @@ def apply_suggestions_to_themes(suggestions, themes_path, head=None, model_bge=N
     return added, new_themes
 
 
-def render_suggestions(week_num, scored, threshold=CLASSIFICATION_THRESHOLD, low_confidence_margin=0.10, ambiguity_margin=0.05):
-    """Build a taxonomy review report from scored clusters."""
+def render_suggestions(week_num, scored, threshold=CLASSIFICATION_THRESHOLD, low_confidence_margin=0.10, ambiguity_margin=0.05, period=None):
+    """Build a taxonomy review report from scored clusters. period overrides the 'Semaine WXX' heading."""
     unclassified, low_confidence, ambiguous = [], [], []
 
     for cluster in scored:
@@ -483,7 +658,7 @@ def render_suggestions(week_num, scored, threshold=CLASSIFICATION_THRESHOLD, low
             ambiguous.append((title, cluster["theme"], top, runner, runner_score))
 
     lines = [
-        f"# Revue taxonomique — Semaine W{week_num:02d}",
+        f"# Revue taxonomique — {period or f'Semaine W{week_num:02d}'}",
         "",
         "> Ce fichier est généré automatiquement par `weekly-digest --suggest`.",
         "> Il liste les classements problématiques pour aider à affiner `data/taxonomy.toml`.",
@@ -538,10 +713,10 @@ def render_suggestions(week_num, scored, threshold=CLASSIFICATION_THRESHOLD, low
     return "\n".join(lines)
 
 
-def _signal_new_themes(new_themes, week_num, body_path="/tmp/new-themes-issue.md"):
+def _signal_new_themes(new_themes, period_label, body_path="/tmp/new-themes-issue.md"):
     """Write issue body to a temp file and flag GITHUB_OUTPUT for the workflow."""
     lines = [
-        f"Mistral a suggéré {len(new_themes)} nouveau(x) thème(s) lors du digest W{week_num:02d}.\n",
+        f"Mistral a suggéré {len(new_themes)} nouveau(x) thème(s) lors du digest {period_label}.\n",
     ]
     for s in new_themes:
         lines.append(f"**{s['theme']}**")
@@ -568,54 +743,62 @@ def _signal_new_themes(new_themes, week_num, body_path="/tmp/new-themes-issue.md
 @click.option("--output-dir", default="data", show_default=True, help="Directory to write the weekly digest")
 @click.option("--week", default=None, type=int, help="ISO week number (default: current week)")
 @click.option("--year", default=None, type=int, help="Year for --week (default: current year)")
+@click.option("--from", "date_from", default=None, type=click.DateTime(formats=["%Y-%m-%d"]), help="First day of a date-range digest (with --to, instead of --week)")
+@click.option("--to", "date_to", default=None, type=click.DateTime(formats=["%Y-%m-%d"]), help="Last day of a date-range digest (inclusive)")
 @click.option("--taxonomy", default="data/taxonomy.toml", show_default=True, help="Path to taxonomy TOML config")
 @click.option("--top-per-theme", default=2, show_default=True, help="Max clusters per theme used for prose")
 @click.option("--suggest", is_flag=True, help="Write a taxonomy review report alongside the digest")
 @click.option("--enrich-review", is_flag=True, help="With --suggest: append Mistral theme suggestions for problematic clusters")
 @click.option("--apply-suggestions", is_flag=True, help="With --enrich-review: write Mistral suggestions into themes.json")
 @click.option("--min-days", default=7, show_default=True, help="Minimum number of daily feed files required before generating")
-def main(data_dir, output_dir, week, year, taxonomy, top_per_theme, suggest, enrich_review, apply_suggestions, min_days):
+@click.option("--cluster-mode", type=click.Choice([CLUSTER_MODE_GREEDY, CLUSTER_MODE_COMPONENTS]), default=CLUSTER_MODE_GREEDY, show_default=True, help="Greedy leader clustering or connected components of the similarity graph")
+@click.option("--block-size", default=SIMILARITY_BLOCK_SIZE, show_default=True, type=click.IntRange(min=1), help="Rows per similarity block when clustering (bounds peak memory)")
+@click.option("--search", type=click.Choice([SEARCH_AUTO, SEARCH_EXACT, SEARCH_IVF]), default=SEARCH_AUTO, show_default=True, help=f"Neighbour search for clustering; auto uses the IVF index from {ANN_MIN_ARTICLES} articles")
+@click.option("--nprobe", default=IVF_NPROBE, show_default=True, type=click.IntRange(min=1), help="IVF lists probed per article (higher: better recall, slower)")
+@click.option("--recall-sample", default=RECALL_SAMPLE_SIZE, show_default=True, type=click.IntRange(min=0), help="Articles sampled to report IVF recall against exact search (0 to skip)")
+def main(data_dir, output_dir, week, year, date_from, date_to, taxonomy, top_per_theme, suggest, enrich_review, apply_suggestions, min_days, cluster_mode, block_size, search, nprobe, recall_sample):
     logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 
     if enrich_review and not suggest:
         raise click.ClickException("--enrich-review requires --suggest.")
     if apply_suggestions and not enrich_review:
         raise click.ClickException("--apply-suggestions requires --enrich-review.")
+    if (date_from is None) != (date_to is None):
+        raise click.ClickException("--from and --to must be given together.")
+    if date_from is not None and (week is not None or year is not None):
+        raise click.ClickException("--from/--to cannot be combined with --week/--year.")
+    if date_from is not None and date_from > date_to:
+        raise click.ClickException("--from must not be after --to.")
 
     api_key = os.environ.get("MISTRAL_API_KEY")
     if not api_key:
         raise click.ClickException("MISTRAL_API_KEY is required.")
     mistral_client = Mistral(api_key=api_key)
 
-    today = datetime.now()
-    iso = today.isocalendar()
-    week_num = week if week is not None else iso.week
-    year_num = year if year is not None else iso.year
+    if date_from is not None:
+        # Date-range mode: week_num None switches headings, prompt and file names.
+        week_num = None
+        period_start, period_end = date_from, date_to
+        period_label = _period_context(None, period_start, period_end)
+    else:
+        iso = datetime.now().isocalendar()
+        week_num = week if week is not None else iso.week
+        year_num = year if year is not None else iso.year
+        period_start = datetime.fromisocalendar(year_num, week_num, 1)
+        period_end = datetime.fromisocalendar(year_num, week_num, 7)
+        period_label = f"W{week_num:02d}"
 
-    week_start = datetime.fromisocalendar(year_num, week_num, 1)
-    week_end = datetime.fromisocalendar(year_num, week_num, 7)
-
-    data_path = Path(data_dir)
-    articles = []
-    days_found = 0
-    for day_offset in range(7):
-        day = week_start + timedelta(days=day_offset)
-        feed_file = data_path / f"feed-{day.strftime('%Y-%m-%d')}.md"
-        if feed_file.exists():
-            days_found += 1
-            day_articles = parse_feed_file(feed_file)
-            logging.info("Loaded %d articles from %s", len(day_articles), feed_file.name)
-            articles.extend(day_articles)
+    articles, days_found = load_period_articles(data_dir, period_start, period_end)
 
     if days_found < min_days:
         logging.info(
-            "Only %d/%d daily files found for W%02d — need %d before generating. Skipping.",
-            days_found, 7, week_num, min_days,
+            "Only %d/%d daily files found for %s — need %d before generating. Skipping.",
+            days_found, (period_end - period_start).days + 1, period_label, min_days,
         )
         return
 
     if not articles:
-        logging.info("No articles found for week W%02d.", week_num)
+        logging.info("No articles found for %s.", period_label)
         return
 
     logging.info("Total articles to cluster: %d", len(articles))
@@ -624,16 +807,27 @@ def main(data_dir, output_dir, week, year, taxonomy, top_per_theme, suggest, enr
     most_read_paths = get_most_read_urls()
     logging.info("Found %d most-read paths.", len(most_read_paths))
 
-    model = SentenceTransformer(BGE_MODEL_ID)
+    model = load_bge_model()
+    sidecars = load_period_sidecars(data_dir, period_start, period_end)
+    if sidecars:
+        logging.info("Loaded %d daily sidecars; only articles they miss will be encoded.", len(sidecars))
+        bge_vectors, e5_vectors = sidecar_vectors(sidecars)
+        model = SidecarEncoder(model, bge_vectors, "bge-m3")
     try:
         theme_names = load_taxonomy(taxonomy)
+        geo_gate = load_geo_gate(taxonomy)
         head = load_classifier_head()
     except FileNotFoundError as e:
         raise click.ClickException(str(e))
     model_e5 = load_e5_model()
+    if sidecars:
+        model_e5 = SidecarEncoder(model_e5, e5_vectors, "e5-instruct")
 
     logging.info("Clustering articles…")
-    raw_clusters = cluster_articles(articles, model)
+    raw_clusters = cluster_articles(
+        articles, model, mode=cluster_mode, block_size=block_size,
+        search=search, nprobe=nprobe, recall_sample=recall_sample,
+    )
     logging.info("Found %d clusters.", len(raw_clusters))
 
     raw_clusters = split_mixed_clusters(raw_clusters, model_e5, head)
@@ -658,16 +852,24 @@ def main(data_dir, output_dir, week, year, taxonomy, top_per_theme, suggest, enr
     rep_texts = [format_article_text(rep) for _, rep, _, _, _ in cluster_meta]
     rep_e5_embs = batch_encode_e5(rep_texts, model_e5)
 
+    geo_themes = [geo_theme(rep["title"], geo_gate) for _, rep, _, _, _ in cluster_meta]
+    to_classify = [i for i, geo in enumerate(geo_themes) if not geo]
+    classifications = {}
+    if to_classify:
+        cls_embeddings = build_cls_embeddings(
+            np.stack([cluster_meta[i][2] for i in to_classify]), rep_e5_embs[to_classify]
+        )
+        classifications = dict(zip(to_classify, classify_batch(cls_embeddings, head)))
+
     scored = []
-    for (raw_cluster, rep, rep_bge, score, most_read_tags), e5_emb in zip(cluster_meta, rep_e5_embs):
-        geo = geo_theme(rep["title"])
+    for i, (raw_cluster, rep, rep_bge, score, most_read_tags) in enumerate(cluster_meta):
+        geo = geo_themes[i]
         if geo:
             # Deterministic geography routing — full confidence keeps the
             # cluster out of the --suggest problematic report.
             classification = {"theme": geo, "top_score": 1.0, "runner_up": None, "runner_up_score": None}
         else:
-            cls_embedding = build_cls_embedding(rep_bge, e5_emb)
-            classification = classify_article_scored(cls_embedding, head)
+            classification = classifications[i]
 
         scored.append({
             "raw": raw_cluster,
@@ -696,10 +898,11 @@ def main(data_dir, output_dir, week, year, taxonomy, top_per_theme, suggest, enr
         clusters_to_render.extend(top)
 
     logging.info("Generating stitched narrative for %d clusters via Mistral…", len(clusters_to_render))
-    stitched_text = generate_stitched_narrative(clusters_to_render, week_num, week_start, week_end, mistral_client)
+    stitched_text = generate_stitched_narrative(clusters_to_render, week_num, period_start, period_end, mistral_client)
 
-    prose_text = render_prose_digest(week_num, week_start, week_end, clusters_to_render, stitched_text)
-    prose_file = Path(output_dir) / f"weekly-w{week_num:02d}-prose.md"
+    prose_text = render_prose_digest(week_num, period_start, period_end, clusters_to_render, stitched_text)
+    output_stem = _output_stem(week_num, period_start, period_end)
+    prose_file = Path(output_dir) / f"{output_stem}-prose.md"
     try:
         prose_file.write_text(prose_text)
     except OSError as e:
@@ -707,7 +910,8 @@ def main(data_dir, output_dir, week, year, taxonomy, top_per_theme, suggest, enr
     logging.info("Prose digest written to %s", prose_file)
 
     if suggest:
-        review = render_suggestions(week_num, scored)
+        review_period = _period_heading(None, period_start, period_end) if week_num is None else None
+        review = render_suggestions(week_num, scored, period=review_period)
         if enrich_review:
             problematic = _problematic_clusters(scored)
             if problematic:
@@ -721,10 +925,10 @@ def main(data_dir, output_dir, week, year, taxonomy, top_per_theme, suggest, enr
                         head=head, model_bge=model, model_e5=model_e5,
                     )
                     if new_themes:
-                        _signal_new_themes(new_themes, week_num)
+                        _signal_new_themes(new_themes, period_label)
             else:
                 logging.info("No problematic clusters — skipping Mistral enrichment.")
-        review_file = Path(output_dir) / f"weekly-w{week_num:02d}-review.md"
+        review_file = Path(output_dir) / f"{output_stem}-review.md"
         try:
             review_file.write_text(review)
         except OSError as e:
@@ -1,5 +1,4 @@
 from datetime import datetime
-from unittest.mock import MagicMock
 
 import pytest
 
@@ -15,15 +14,3 @@ def sample_feed_entry():
         "media_content": [{"url": "https://example.com/img.jpg"}],
     }
 
-
-@pytest.fixture
-def make_model():
-    """Factory fixture: returns a mock SentenceTransformer with a given max similarity."""
-    def _make(max_similarity):
-        model = MagicMock()
-        model.encode.side_effect = lambda x: x
-        tensor = MagicMock()
-        tensor.max.return_value.item.return_value = max_similarity
-        model.similarity.return_value = [tensor]
-        return model
-    return _make
@@ -1,24 +1,33 @@
+from contextlib import ExitStack
 from datetime import datetime
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from types import SimpleNamespace
+from unittest.mock import DEFAULT, MagicMock, patch
 
 import numpy as np
 import pytest
 from click.testing import CliRunner
 
 from rss_summary.aggregate import main
+from rss_summary.feed_state import FeedState
+from rss_summary.history import DedupHistory, restore_dedup_history
+from rss_summary.similarity import EmbeddingIndex, TitleIndex
 
 
 def _mock_entry(title="Article", published=(2025, 1, 2, 10, 0, 0, 0, 0, 0)):
     entry = MagicMock()
     entry.title = title
     entry.published_parsed = published
-    entry.link = "https://example.com/article"
+    entry.link = f"https://example.com/{title.lower()}"
     entry.get.return_value = published
     entry.summary_detail.value = "<p>Summary</p>"
     return entry
 
 
+def _fake_encode_texts(model, texts):
+    return np.tile([0.1, 0.2], (len(texts), 1))
+
+
 @pytest.fixture
 def rss_file(tmp_path):
     f = tmp_path / "rss_list.txt"
@@ -31,22 +40,59 @@ def output_file(tmp_path):
     return str(tmp_path / "feed.md")
 
 
-def _run(rss_file, output_file, entries=None, extra_args=None):
-    runner = CliRunner()
-    fake_model = MagicMock()
-    fake_feed = MagicMock()
-    fake_feed.entries = entries if entries is not None else [_mock_entry()]
+def _run(
+    rss_file, output_file, entries=None, extra_args=None, feeds=None, feed_state=None, history=None,
+    last_run=datetime(2025, 1, 1), now=None, encode=_fake_encode_texts, duplicates=False, title_duplicates=False,
+):
+    """Invoke aggregate-rss with the models, network and state files patched out.
+
+    feed_state and history replace the FeedState / DedupHistory classes (e.g.
+    to point them at tmp_path). duplicates and title_duplicates stub the
+    EmbeddingIndex / TitleIndex checks (a bool, or a list of answers); None
+    keeps the real check.
+    Returns the click result and a namespace of the patch mocks.
+    """
+    if feeds is None:
+        fake_feed = MagicMock()
+        fake_feed.entries = entries if entries is not None else [_mock_entry()]
+        feeds = [fake_feed]
+    encode_patch = {"side_effect": encode} if callable(encode) else {"return_value": encode}
 
-    with patch("rss_summary.aggregate.SentenceTransformer", return_value=fake_model), \
-         patch("rss_summary.aggregate.feedparser.parse", return_value=fake_feed), \
-         patch("rss_summary.aggregate.get_last_run_date", return_value=datetime(2025, 1, 1)), \
-         patch("rss_summary.aggregate.set_last_run_date") as mock_set, \
-         patch("rss_summary.aggregate.encode_text", return_value=np.array([0.1, 0.2])), \
-         patch("rss_summary.aggregate.is_duplicate", return_value=False), \
-         patch("rss_summary.aggregate.title_is_duplicate", return_value=False):
+    with ExitStack() as stack:
+        enter = stack.enter_context
+        enter(patch("rss_summary.aggregate.load_bge_model"))
+        enter(patch("rss_summary.aggregate.FeedCache"))
+        enter(patch("rss_summary.aggregate.FeedState", feed_state or DEFAULT))
+        enter(patch("rss_summary.aggregate.DedupHistory", history or DEFAULT))
+        enter(patch("rss_summary.aggregate.get_last_run_date", return_value=last_run))
+        if duplicates is not None:
+            enter(patch.object(EmbeddingIndex, "is_duplicate", **_answers(duplicates)))
+        mocks = SimpleNamespace(
+            fetch=enter(patch("rss_summary.aggregate.iter_feeds", side_effect=lambda *a, **kw: iter(feeds))),
+            set_last_run=enter(patch("rss_summary.aggregate.set_last_run_date", return_value=now)),
+            encode=enter(patch("rss_summary.aggregate.encode_texts", **encode_patch)),
+            title_duplicate=None if title_duplicates is None else enter(
+                patch.object(TitleIndex, "is_duplicate", **_answers(title_duplicates))
+            ),
+        )
         args = [rss_file, output_file] + (extra_args or [])
-        result = runner.invoke(main, args)
-        return result, mock_set
+        return CliRunner().invoke(main, args), mocks
+
+
+def _answers(answers):
+    return {"side_effect": answers} if isinstance(answers, list) else {"return_value": answers}
+
+
+def _guid_entry(title, guid, published):
+    entry = _mock_entry(title, published)
+    entry.get.side_effect = {"published_parsed": published, "id": guid}.get
+    return entry
+
+
+def _feed(*entries):
+    feed = MagicMock()
+    feed.entries = list(entries)
+    return feed
 
 
 class TestAggregateCLI:
@@ -61,12 +107,12 @@ class TestAggregateCLI:
         assert not Path(output_file).exists()
 
     def test_normal_run_updates_last_run(self, rss_file, output_file):
-        _, mock_set = _run(rss_file, output_file)
-        mock_set.assert_called_once()
+        _, mocks = _run(rss_file, output_file)
+        mocks.set_last_run.assert_called_once()
 
     def test_dry_run_does_not_update_last_run(self, rss_file, output_file):
-        _, mock_set = _run(rss_file, output_file, extra_args=["--dry-run"])
-        mock_set.assert_not_called()
+        _, mocks = _run(rss_file, output_file, extra_args=["--dry-run"])
+        mocks.set_last_run.assert_not_called()
 
     def test_until_excludes_entries_after_bound(self, rss_file, output_file):
         # Entry published 2025-01-02, until bound is 2025-01-01 — should be excluded
@@ -88,28 +134,187 @@ class TestAggregateCLI:
         assert result.exit_code != 0
 
     def test_duplicate_entries_deduplicated(self, rss_file, output_file):
-        runner = CliRunner()
-        fake_model = MagicMock()
-        fake_feed = MagicMock()
-        fake_feed.entries = [_mock_entry("A"), _mock_entry("B")]
-
-        with patch("rss_summary.aggregate.SentenceTransformer", return_value=fake_model), \
-             patch("rss_summary.aggregate.feedparser.parse", return_value=fake_feed), \
-             patch("rss_summary.aggregate.get_last_run_date", return_value=datetime(2025, 1, 1)), \
-             patch("rss_summary.aggregate.set_last_run_date"), \
-             patch("rss_summary.aggregate.encode_text", return_value=np.array([0.1, 0.2])), \
-             patch("rss_summary.aggregate.is_duplicate", side_effect=[False, True]), \
-             patch("rss_summary.aggregate.title_is_duplicate", return_value=False):
-            result = runner.invoke(main, [rss_file, output_file])
+        entries = [_mock_entry("A"), _mock_entry("B")]
+        result, _ = _run(rss_file, output_file, entries=entries, duplicates=[False, True])
 
         assert result.exit_code == 0
         content = Path(output_file).read_text()
         assert "[A]" in content
         assert "[B]" not in content
 
+    def test_same_canonical_url_dropped_before_encoding(self, rss_file, output_file):
+        tracked = _mock_entry("A bis")
+        tracked.link = "https://www.example.com/a/?utm_source=rss"
+        result, mocks = _run(rss_file, output_file, entries=[_mock_entry("A"), tracked, _mock_entry("B")])
+
+        assert result.exit_code == 0
+        assert len(mocks.encode.call_args.args[1]) == 2
+        assert mocks.title_duplicate.call_count == 2
+        assert "[A bis]" not in Path(output_file).read_text()
+
+    def test_images_resolved_only_with_images_flag(self, rss_file, output_file):
+        def fill(items, cache, **kwargs):
+            for item in items:
+                item["media_content"] = [{"url": "https://example.com/a.jpg"}]
+
+        with patch("rss_summary.aggregate.ImageCache"), \
+             patch("rss_summary.aggregate.resolve_images", side_effect=fill) as mock_resolve:
+            _run(rss_file, output_file)
+            mock_resolve.assert_not_called()
+            result, _ = _run(rss_file, output_file, extra_args=["--with-images"])
+        assert result.exit_code == 0
+        mock_resolve.assert_called_once()
+        assert "![media](https://example.com/a.jpg)" in Path(output_file).read_text()
+
+    def test_dedup_keeps_first_feed_in_list_order(self, tmp_path, output_file):
+        rss_file = tmp_path / "two_feeds.txt"
+        rss_file.write_text("https://example.com/one\nhttps://example.com/two\n")
+        later = _mock_entry("Grève au port de Jarry !", (2025, 1, 2, 11, 0, 0, 0, 0, 0))
+        later.link = "https://example.com/other"
+        feeds = [_feed(_mock_entry("Grève au port de Jarry")), _feed(later)]
+
+        result, _ = _run(str(rss_file), output_file, feeds=feeds, title_duplicates=None)
+
+        assert result.exit_code == 0
+        content = Path(output_file).read_text()
+        assert "[Grève au port de Jarry]" in content
+        assert "https://example.com/other" not in content
+
+    def test_candidates_encoded_in_one_batch(self, rss_file, output_file):
+        entries = [_mock_entry("A"), _mock_entry("B"), _mock_entry("C")]
+        result, mocks = _run(rss_file, output_file, entries=entries)
+
+        assert result.exit_code == 0
+        mocks.encode.assert_called_once()
+        assert len(mocks.encode.call_args.args[1]) == 3
+
+    def test_classify_encodes_non_geo_articles_in_one_batch(self, rss_file, output_file):
+        entries = [_mock_entry("Martinique. Grève au port"), _mock_entry("Budget voté")]
+        with patch("rss_summary.aggregate.load_taxonomy", return_value=["Politique"]), \
+             patch("rss_summary.aggregate.load_geo_gate", return_value=None), \
+             patch("rss_summary.aggregate.load_classifier_head", return_value={}), \
+             patch("rss_summary.aggregate.load_e5_model"), \
+             patch("rss_summary.aggregate.encode_batch_for_classification", return_value=np.zeros((1, 4))) as mock_encode, \
+             patch("rss_summary.aggregate.classify_batch", return_value=[{"theme": "Politique"}]):
+            result, _ = _run(rss_file, output_file, entries=entries, extra_args=["--classify"])
+        assert result.exit_code == 0
+        mock_encode.assert_called_once()
+        assert mock_encode.call_args.args[0] == ["Budget voté. Summary"]
+        content = Path(output_file).read_text()
+        assert "## Politique" in content
+
+    def test_sidecar_written_next_to_feed(self, rss_file, output_file):
+        with patch("rss_summary.aggregate.load_e5_model"), \
+             patch("rss_summary.aggregate.batch_encode_e5", return_value=np.ones((1, 3))):
+            result, _ = _run(rss_file, output_file, extra_args=["--sidecar"])
+        assert result.exit_code == 0
+        with np.load(Path(output_file).with_suffix(".npz")) as data:
+            assert list(data["title"]) == ["Article"]
+            assert data["bge"].dtype == np.float16
+            assert data["e5"].shape == (1, 3)
+            assert data["theme"][0] == ""
+
+    def test_normal_run_archives_articles(self, rss_file, output_file):
+        _run(rss_file, output_file)
+        [line] = (Path(output_file).parent / "archive.jsonl").read_text().splitlines()
+        assert '"title": "Article"' in line
+
+    def test_existing_search_index_is_synced(self, rss_file, output_file):
+        (Path(output_file).parent / ".search-index").mkdir()
+        with patch("rss_summary.aggregate.SearchIndex") as mock_index:
+            _run(rss_file, output_file)
+        mock_index.return_value.sync.assert_called_once()
+
+    def test_dry_run_does_not_archive(self, rss_file, output_file):
+        _run(rss_file, output_file, extra_args=["--dry-run"])
+        assert not (Path(output_file).parent / "archive.jsonl").exists()
+
+    def test_no_sidecar_by_default(self, rss_file, output_file):
+        _run(rss_file, output_file)
+        assert not Path(output_file).with_suffix(".npz").exists()
+
+    def test_history_drops_article_kept_on_a_previous_day(self, rss_file, output_file, tmp_path):
+        history_dir = tmp_path / "history"
+        previous = DedupHistory(history_dir)
+        previous.add("Article", np.array([0.1, 0.2]))
+        previous.save()
+
+        result, _ = _run(
+            rss_file, output_file, entries=[_mock_entry("Article"), _mock_entry("Autre sujet sans rapport")],
+            history=lambda days: DedupHistory(history_dir, days),
+            encode=np.array([[0.1, 0.2], [0.2, -0.1]]), duplicates=None, title_duplicates=None,
+        )
+
+        assert result.exit_code == 0
+        content = Path(output_file).read_text()
+        assert "Autre sujet" in content
+        assert "[Article]" not in content
+        assert len(DedupHistory(history_dir)) == 2
+
     def test_restore_flag_calls_restore(self):
         runner = CliRunner()
-        with patch("rss_summary.aggregate.restore_last_run_date") as mock_restore:
+        with patch("rss_summary.aggregate.restore_last_run_date") as mock_restore, \
+             patch("rss_summary.aggregate.restore_feed_state") as mock_restore_state, \
+             patch("rss_summary.aggregate.restore_dedup_history") as mock_restore_history:
             result = runner.invoke(main, ["data/rss_list.txt", "data/feed.md", "--restore"])
         mock_restore.assert_called_once()
+        mock_restore_state.assert_called_once()
+        mock_restore_history.assert_called_once()
         assert result.exit_code == 0
+
+    def test_restored_day_keeps_the_same_articles_when_rerun(self, rss_file, output_file, tmp_path):
+        history_dir = tmp_path / "history"
+        entries = [_mock_entry("Grève au port"), _mock_entry("Budget voté")]
+
+        def run():
+            result, _ = _run(
+                rss_file, output_file, entries=entries, history=lambda days: DedupHistory(history_dir, days),
+                encode=np.eye(2), duplicates=None, title_duplicates=None,
+            )
+            assert result.exit_code == 0
+            return Path(output_file).read_text()
+
+        first = run()
+        with patch("rss_summary.aggregate.restore_last_run_date"), \
+             patch("rss_summary.aggregate.restore_feed_state"), \
+             patch("rss_summary.aggregate.restore_dedup_history", lambda: restore_dedup_history(history_dir)):
+            assert CliRunner().invoke(main, [rss_file, output_file, "--restore"]).exit_code == 0
+        Path(output_file).unlink()
+
+        assert run() == first
+        assert "[Grève au port]" in first and "[Budget voté]" in first
+        assert len(DedupHistory(history_dir)) == 2
+
+    def test_second_run_same_day_skips_seen_entries(self, rss_file, output_file, tmp_path):
+        first_run, second_run = datetime(2025, 1, 2, 12, 0), datetime(2025, 1, 2, 18, 0)
+        early = _guid_entry("Matin", "guid-1", (2025, 1, 2, 9, 0, 0, 0, 0, 0))
+        late = _guid_entry("Retardataire", "guid-2", (2025, 1, 2, 8, 0, 0, 0, 0, 0))
+        state = lambda last_run: FeedState(tmp_path / "state.db", last_run)
+
+        result, _ = _run(rss_file, output_file, entries=[early], feed_state=state, now=first_run)
+        assert result.exit_code == 0
+        # Second run: the late item was published before the first run but
+        # only appeared in the feed afterwards; the first one is already seen.
+        result, _ = _run(rss_file, output_file, entries=[late, early], feed_state=state, last_run=first_run, now=second_run)
+        assert result.exit_code == 0
+        content = Path(output_file).read_text()
+        assert "Retardataire" in content
+        assert "Matin" not in content
+
+    def test_stream_parse_stops_newest_first_feeds_at_their_watermark(self, rss_file, output_file, tmp_path):
+        newer = _guid_entry("Nouveau", "guid-2", (2025, 1, 2, 9, 0, 0, 0, 0, 0))
+        older = _guid_entry("Ancien", "guid-1", (2025, 1, 1, 9, 0, 0, 0, 0, 0))
+
+        def run(last_run):
+            result, mocks = _run(
+                rss_file, output_file, entries=[newer, older], extra_args=["--stream-parse"],
+                feed_state=lambda last_run: FeedState(tmp_path / "state.db", last_run),
+                last_run=last_run, now=datetime(2025, 1, 2, 12),
+            )
+            assert result.exit_code == 0
+            return mocks.fetch.call_args.kwargs
+
+        first = run(datetime(2024, 12, 31))
+        assert first["streaming"] and first["stop_before"] == {"https://example.com/feed": None}
+        second = run(datetime(2025, 1, 2, 12))
+        assert second["stop_before"] == {"https://example.com/feed": datetime(2024, 12, 31, 9)}
@@ -0,0 +1,87 @@
+import json
+from datetime import date, datetime
+
+from rss_summary.archive import archive_path, archive_records, load_archive, migrate_feed_files, parse_feed_md_records, write_archive_day
+
+
+def _item(title="Titre", theme=None, image="https://img/1.jpg"):
+    item = {
+        "published_date": datetime(2025, 1, 2, 10, 0),
+        "title": title,
+        "summary": "Résumé | avec barre",
+        "link": f"https://rci.fm/{title}",
+        "media_content": [{"url": image}],
+    }
+    if theme:
+        item["theme"] = theme
+    return item
+
+
+class TestArchiveRecords:
+    def test_keeps_image_and_theme(self):
+        [record] = archive_records([_item(theme="Politique")], date(2025, 1, 2))
+        assert record == {
+            "day": "2025-01-02",
+            "date": "2025-01-02T10:00:00",
+            "title": "Titre",
+            "url": "https://rci.fm/Titre",
+            "summary": "Résumé | avec barre",
+            "image": "https://img/1.jpg",
+            "theme": "Politique",
+        }
+
+
+class TestWriteLoadArchive:
+    def test_round_trip_keeps_pipes(self, tmp_path):
+        path = archive_path(tmp_path)
+        write_archive_day(path, date(2025, 1, 2), archive_records([_item("A|B")], date(2025, 1, 2)))
+        [article] = load_archive(path)
+        assert article["title"] == "A|B"
+        assert article["summary"] == "Résumé | avec barre"
+        assert article["date"] == datetime(2025, 1, 2, 10, 0)
+
+    def test_rewriting_a_day_replaces_its_records(self, tmp_path):
+        path = archive_path(tmp_path)
+        for day, title in [(date(2025, 1, 1), "old"), (date(2025, 1, 2), "first"), (date(2025, 1, 2), "second")]:
+            write_archive_day(path, day, archive_records([_item(title)], day))
+        assert [a["title"] for a in load_archive(path)] == ["old", "second"]
+
+    def test_day_range_filter(self, tmp_path):
+        path = archive_path(tmp_path)
+        for d in (1, 2, 3):
+            day = date(2025, 1, d)
+            write_archive_day(path, day, archive_records([_item(str(d))], day))
+        loaded = load_archive(path, date(2025, 1, 2), date(2025, 1, 3))
+        assert [a["title"] for a in loaded] == ["2", "3"]
+
+    def test_missing_archive_is_empty(self, tmp_path):
+        assert load_archive(tmp_path / "absent.jsonl") == []
+
+
+class TestMigration:
+    def _write_md(self, path, with_theme=False):
+        lines = []
+        if with_theme:
+            lines += ["## Politique", ""]
+        lines += [
+            "|Titre|Résumé|Date de publication|Aperçu|",
+            "|---|---|---|---|",
+            "|[Article](https://rci.fm/a)|Summary|2025-01-01 10:00:00|![media](https://img/a.jpg)|",
+        ]
+        path.write_text("\n".join(lines))
+
+    def test_parse_keeps_theme_and_image(self, tmp_path):
+        f = tmp_path / "feed-2025-01-01.md"
+        self._write_md(f, with_theme=True)
+        [record] = parse_feed_md_records(f)
+        assert record["day"] == "2025-01-01"
+        assert record["theme"] == "Politique"
+        assert record["image"] == "https://img/a.jpg"
+
+    def test_migration_is_incremental(self, tmp_path):
+        self._write_md(tmp_path / "feed-2025-01-01.md")
+        assert migrate_feed_files(tmp_path) == (1, 1)
+        self._write_md(tmp_path / "feed-2025-01-02.md")
+        assert migrate_feed_files(tmp_path) == (1, 1)
+        lines = archive_path(tmp_path).read_text().splitlines()
+        assert [json.loads(line)["day"] for line in lines] == ["2025-01-01", "2025-01-02"]
@@ -5,14 +5,23 @@ from unittest.mock import MagicMock, call, patch
 from mistralai.client.errors.sdkerror import SDKError
 
 from rss_summary.classification import (
+    DEFAULT_HEAD_PATH,
+    DEFAULT_NUMPY_HEAD_PATH,
     THEME_INTERNATIONAL,
     THEME_OUTREMER,
     UNCLASSIFIED,
     classify_article,
+    build_cls_embedding,
+    build_cls_embeddings,
     classify_article_scored,
+    classify_batch,
+    compile_geo_gate,
+    encode_batch_for_classification,
     encode_for_classification,
     geo_theme,
     load_classifier_head,
+    load_geo_gate,
+    load_numpy_head,
     load_taxonomy,
     mistral_chat_with_retry,
 )
@@ -43,6 +52,33 @@ class TestLoadClassifierHead:
         assert result["clf"] == "stub"
 
 
+class TestNumpyHead:
+    def test_missing_file_raises_with_hint(self, tmp_path):
+        with pytest.raises(FileNotFoundError, match="classifier/train.py"):
+            load_numpy_head(tmp_path / "missing.npz")
+
+    def test_npz_suffix_selects_numpy_loader(self):
+        head = load_classifier_head(DEFAULT_NUMPY_HEAD_PATH)
+        assert "themes" in head
+        assert "label_encoder" not in head
+
+    def test_reproduces_calibrated_svc_probabilities(self):
+        sk_head = load_classifier_head(DEFAULT_HEAD_PATH)
+        np_head = load_numpy_head()
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(50, 2048))
+        X /= np.linalg.norm(X, axis=1, keepdims=True)
+        np.testing.assert_allclose(np_head["clf"].predict_proba(X), sk_head["clf"].predict_proba(X), atol=1e-5)
+
+    def test_same_themes_as_joblib_head(self):
+        sk_head = load_classifier_head(DEFAULT_HEAD_PATH)
+        np_head = load_numpy_head()
+        X = np.random.default_rng(1).normal(size=(20, 2048))
+        assert classify_batch(X, np_head) == [
+            pytest.approx(r, abs=1e-5) for r in classify_batch(X, sk_head)
+        ]
+
+
 class TestEncodeForClassification:
     def test_output_shape_and_normalized(self):
         model_bge = MagicMock()
@@ -62,6 +98,47 @@ class TestEncodeForClassification:
         assert np.all(result == 0)
 
 
+class TestEncodeBatchForClassification:
+    def _models(self):
+        model_bge = MagicMock()
+        model_bge.encode.side_effect = lambda texts, normalize_embeddings: np.array([[1.0, 0.0]] * len(texts))
+        model_e5 = MagicMock()
+        model_e5.encode.side_effect = lambda texts, normalize_embeddings: np.array([[0.0, 1.0]] * len(texts))
+        return model_bge, model_e5
+
+    def test_one_call_per_model(self):
+        model_bge, model_e5 = self._models()
+        result = encode_batch_for_classification(["<p>a</p>", "b", "c"], model_bge, model_e5)
+        assert result.shape == (3, 4)
+        model_bge.encode.assert_called_once()
+        model_e5.encode.assert_called_once()
+        assert model_bge.encode.call_args.args[0] == ["a", "b", "c"]
+
+    def test_matches_single_article_encoding(self):
+        model_bge, model_e5 = self._models()
+        batch = encode_batch_for_classification(["text"], model_bge, model_e5)
+        single_bge = MagicMock()
+        single_bge.encode.return_value = np.array([1.0, 0.0])
+        single_e5 = MagicMock()
+        single_e5.encode.return_value = np.array([0.0, 1.0])
+        np.testing.assert_allclose(batch[0], encode_for_classification("text", single_bge, single_e5))
+
+    def test_empty_input_skips_models(self):
+        model_bge, model_e5 = self._models()
+        assert len(encode_batch_for_classification([], model_bge, model_e5)) == 0
+        model_bge.encode.assert_not_called()
+
+
+class TestBuildClsEmbeddings:
+    def test_matches_row_wise_builder(self):
+        rng = np.random.default_rng(0)
+        bge = rng.normal(size=(3, 4))
+        e5 = rng.normal(size=(3, 4))
+        e5 /= np.linalg.norm(e5, axis=1, keepdims=True)
+        expected = np.stack([build_cls_embedding(b, e) for b, e in zip(bge, e5)])
+        np.testing.assert_allclose(build_cls_embeddings(bge, e5), expected, rtol=1e-5)
+
+
 class TestClassifyArticleScored:
     def _make_head(self, proba, classes, label_to_theme):
         clf = MagicMock()
@@ -110,6 +187,64 @@ class TestClassifyArticleScored:
         assert result["theme"] == "B"
 
 
+class TestClassifyBatch:
+    _CLASSES = ["eco", "pol", "spo"]
+    _THEMES = {"eco": "Économie", "pol": "Politique", "spo": "Sport"}
+
+    def _make_head(self, proba):
+        clf = MagicMock()
+        clf.predict_proba.return_value = np.array(proba)
+        le = MagicMock()
+        le.classes_ = self._CLASSES
+        return {"clf": clf, "label_encoder": le, "label_to_theme": self._THEMES}
+
+    def test_single_predict_proba_call(self):
+        head = self._make_head([[0.1, 0.8, 0.1], [0.6, 0.3, 0.1]])
+        results = classify_batch(np.ones((2, 4)), head, threshold=0.15)
+        head["clf"].predict_proba.assert_called_once()
+        assert [r["theme"] for r in results] == ["Politique", "Économie"]
+        assert [r["runner_up"] for r in results] == ["Économie", "Politique"]
+        assert results[1]["runner_up_score"] == pytest.approx(0.3)
+
+    def test_threshold_applies_per_row(self):
+        head = self._make_head([[0.1, 0.8, 0.1], [0.34, 0.33, 0.33]])
+        results = classify_batch(np.ones((2, 4)), head, threshold=0.5)
+        assert [r["theme"] for r in results] == ["Politique", UNCLASSIFIED]
+        assert results[1]["runner_up"] is not None
+
+    def test_ties_keep_column_order(self):
+        head = self._make_head([[0.4, 0.4, 0.2], [0.2, 0.4, 0.4], [0.3, 0.3, 0.3]])
+        results = classify_batch(np.ones((3, 4)), head, threshold=0.1)
+        assert [(r["theme"], r["runner_up"]) for r in results] == [
+            ("Économie", "Politique"),
+            ("Politique", "Sport"),
+            ("Économie", "Politique"),
+        ]
+
+    def test_rows_are_normalized(self):
+        head = self._make_head([[0.1, 0.8, 0.1]])
+        classify_batch(np.array([[3.0, 4.0]]), head)
+        X = head["clf"].predict_proba.call_args.args[0]
+        np.testing.assert_allclose(X, [[0.6, 0.8]])
+
+    def test_empty_batch(self):
+        head = self._make_head([])
+        assert classify_batch(np.empty((0, 4)), head) == []
+        head["clf"].predict_proba.assert_not_called()
+
+    def test_matches_scored_on_real_head(self):
+        head = load_classifier_head(DEFAULT_HEAD_PATH)
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(20, 2048))
+        batch = classify_batch(X, head)
+        for row, result in zip(X, batch):
+            proba = head["clf"].predict_proba([row / np.linalg.norm(row)])[0]
+            top, runner = np.argsort(proba)[::-1][:2]
+            label_to_theme = head["label_to_theme"]
+            assert result["top_score"] == pytest.approx(proba[top])
+            assert result["runner_up"] == label_to_theme[head["label_encoder"].inverse_transform([runner])[0]]
+
+
 class TestMistralChatWithRetry:
     def _make_client(self, side_effects):
         client = MagicMock()
@@ -183,6 +318,31 @@ class TestGeoTheme:
     def test_routing(self, title, expected):
         assert geo_theme(title) == expected
 
+    def test_taxonomy_gate_matches_builtin_lists(self):
+        gate = load_geo_gate("data/taxonomy.toml")
+        assert gate[1] == compile_geo_gate()[1]
+
+    def test_taxonomy_can_add_places(self, tmp_path):
+        toml = tmp_path / "taxonomy.toml"
+        toml.write_text(
+            'themes = ["International"]\n'
+            '[geography]\n'
+            'sovereign = ["Venezuela"]\n'
+            'territories = ["Aruba"]\n'
+        )
+        gate = load_geo_gate(toml)
+        assert geo_theme("Venezuela : tensions à la frontière", gate) == THEME_INTERNATIONAL
+        assert geo_theme("À Aruba, le tourisme repart", gate) == THEME_OUTREMER
+        assert geo_theme("Haïti. Manifestation", gate) is None
+
+    def test_taxonomy_without_geography_uses_defaults(self, tmp_path):
+        toml = tmp_path / "taxonomy.toml"
+        toml.write_text('themes = ["International"]')
+        assert geo_theme("Haïti. Manifestation", load_geo_gate(toml)) == THEME_INTERNATIONAL
+
+    def test_empty_gate_never_matches(self):
+        assert geo_theme(". Haïti", compile_geo_gate((), ())) is None
+
 
 class TestClassifyArticle:
     def test_returns_theme_string(self):
@@ -0,0 +1,114 @@
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from rss_summary.embedding_cache import CachedEncoder, EmbeddingStore
+
+
+def _fake_model():
+    model = MagicMock()
+    model.encode.side_effect = lambda texts, **kwargs: np.array([[len(t), 1.0] for t in texts], dtype=np.float32)
+    return model
+
+
+def _encoder(tmp_path, model):
+    return CachedEncoder("org/model", lambda: model, tmp_path)
+
+
+class TestCachedEncoder:
+    def test_encodes_only_missing_texts(self, tmp_path):
+        model = _fake_model()
+        encoder = _encoder(tmp_path, model)
+        encoder.encode(["aa", "bbb"])
+        result = encoder.encode(["bbb", "cccc", "aa"])
+        assert model.encode.call_count == 2
+        assert model.encode.call_args.args[0] == ["cccc"]
+        np.testing.assert_array_equal(result[:, 0], [3, 4, 2])
+
+    def test_persists_across_instances_without_loading_model(self, tmp_path):
+        _encoder(tmp_path, _fake_model()).encode(["hello"])
+        loader = MagicMock()
+        encoder = CachedEncoder("org/model", loader, tmp_path)
+        np.testing.assert_array_equal(encoder.encode(["hello"]), [[5, 1]])
+        loader.assert_not_called()
+
+    def test_models_do_not_share_entries(self, tmp_path):
+        _encoder(tmp_path, _fake_model()).encode(["hello"])
+        other = _fake_model()
+        CachedEncoder("org/other", lambda: other, tmp_path).encode(["hello"])
+        other.encode.assert_called_once()
+
+    def test_single_string_returns_vector(self, tmp_path):
+        assert _encoder(tmp_path, _fake_model()).encode("abc").shape == (2,)
+
+    def test_normalize_embeddings(self, tmp_path):
+        result = _encoder(tmp_path, _fake_model()).encode(["abc"], normalize_embeddings=True)
+        assert np.linalg.norm(result[0]) == pytest.approx(1.0)
+
+    def test_duplicate_texts_encoded_once(self, tmp_path):
+        model = _fake_model()
+        result = _encoder(tmp_path, model).encode(["x", "x"])
+        assert model.encode.call_args.args[0] == ["x"]
+        assert result.shape == (2, 2)
+
+    def test_store_false_does_not_cache(self, tmp_path):
+        model = _fake_model()
+        encoder = _encoder(tmp_path, model)
+        np.testing.assert_array_equal(encoder.encode("query", store=False), [5, 1])
+        encoder.encode("query")
+        assert model.encode.call_count == 2
+        assert len(EmbeddingStore(tmp_path, "org/model")) == 1
+
+
+class TestEmbeddingStore:
+    def test_ignores_trailing_keys_without_vectors(self, tmp_path):
+        store = EmbeddingStore(tmp_path, "m")
+        store.append(["k1"], np.ones((1, 3)))
+        with open(store.path / "keys.txt", "a") as f:
+            f.write("k2\n")
+        reloaded = EmbeddingStore(tmp_path, "m")
+        assert len(reloaded) == 1
+        assert set(reloaded.lookup(["k1", "k2"])) == {"k1"}
+
+    def test_append_after_interrupted_append_keeps_rows_aligned(self, tmp_path):
+        store = EmbeddingStore(tmp_path, "m")
+        store.append(["k1"], np.full((1, 3), 1.0))
+        # Interrupted append: the vector row was written, its key was not.
+        with open(store.path / "vectors.f32", "ab") as f:
+            f.write(np.full((1, 3), 9.0, dtype=np.float32).tobytes())
+        EmbeddingStore(tmp_path, "m").append(["k2"], np.full((1, 3), 2.0))
+        reloaded = EmbeddingStore(tmp_path, "m")
+        found = reloaded.lookup(["k1", "k2"])
+        np.testing.assert_array_equal(found["k1"], [1, 1, 1])
+        np.testing.assert_array_equal(found["k2"], [2, 2, 2])
+        assert (store.path / "vectors.f32").stat().st_size == 2 * 3 * 4
+
+    def test_partial_key_line_is_dropped(self, tmp_path):
+        store = EmbeddingStore(tmp_path, "m")
+        store.append(["k1"], np.ones((1, 3)))
+        with open(store.path / "keys.txt", "a") as f:
+            f.write("k2")
+        reloaded = EmbeddingStore(tmp_path, "m")
+        reloaded.append(["k3"], np.full((1, 3), 3.0))
+        assert (store.path / "keys.txt").read_text() == "k1\nk3\n"
+        np.testing.assert_array_equal(EmbeddingStore(tmp_path, "m").lookup(["k3"])["k3"], [3, 3, 3])
+
+    def test_keys_already_stored_are_not_appended_again(self, tmp_path):
+        store = EmbeddingStore(tmp_path, "m")
+        store.append(["k1"], np.full((1, 3), 1.0))
+        store.append(["k1", "k2", "k2"], np.array([[7.0] * 3, [2.0] * 3, [8.0] * 3]))
+        assert len(store) == 2
+        found = EmbeddingStore(tmp_path, "m").lookup(["k1", "k2"])
+        np.testing.assert_array_equal(found["k1"], [1, 1, 1])
+        np.testing.assert_array_equal(found["k2"], [2, 2, 2])
+
+    def test_stores_opened_together_keep_each_others_rows(self, tmp_path):
+        first, second = EmbeddingStore(tmp_path, "m"), EmbeddingStore(tmp_path, "m")
+        first.append(["k1"], np.full((1, 3), 1.0))
+        second.append(["k2"], np.full((1, 3), 2.0))
+        first.append(["k3"], np.full((1, 3), 3.0))
+        assert set(first.lookup(["k1", "k2", "k3"])) == {"k1", "k2", "k3"}
+        found = EmbeddingStore(tmp_path, "m").lookup(["k1", "k2", "k3"])
+        for i, key in enumerate(["k1", "k2", "k3"], 1):
+            np.testing.assert_array_equal(found[key], [i, i, i])
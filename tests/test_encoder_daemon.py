@@ -0,0 +1,89 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from rss_summary.classification import load_bge_model
+from rss_summary.encoder_daemon import EncoderServer, RemoteEncoder, connect_encoder, served_models
+
+
+def _fake_model():
+    model = MagicMock()
+    model.encode.side_effect = lambda texts, **kwargs: np.array([[len(t), 1.0] for t in texts], dtype=np.float32)
+    return model
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    model = _fake_model()
+    path = tmp_path / "enc.sock"
+    server = EncoderServer(path, {"org/bge": model}, max_wait=0.1)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield path, model
+    server.shutdown()
+    server.server_close()
+
+
+class TestEncoderDaemon:
+    def test_remote_encode_matches_model(self, daemon):
+        path, _ = daemon
+        encoder = RemoteEncoder("org/bge", path)
+        np.testing.assert_array_equal(encoder.encode(["aa", "bbb"]), [[2, 1], [3, 1]])
+        np.testing.assert_array_equal(encoder.encode("aa"), [2, 1])
+
+    def test_normalizes_on_request(self, daemon):
+        path, _ = daemon
+        out = RemoteEncoder("org/bge", path).encode(["aaa"], normalize_embeddings=True)
+        assert np.linalg.norm(out[0]) == pytest.approx(1.0)
+
+    def test_concurrent_requests_are_micro_batched(self, daemon):
+        path, model = daemon
+        results = {}
+
+        def call(i):
+            results[i] = RemoteEncoder("org/bge", path).encode(["x" * (i + 1)])
+
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert model.encode.call_count < 6
+        for i in range(6):
+            np.testing.assert_array_equal(results[i], [[i + 1, 1]])
+
+    def test_unknown_model_is_not_connected(self, daemon):
+        path, _ = daemon
+        assert served_models(path) == ["org/bge"]
+        assert connect_encoder("org/e5", path) is None
+        assert connect_encoder("org/bge", path) is not None
+
+    def test_no_daemon(self, tmp_path):
+        assert served_models(tmp_path / "missing.sock") is None
+        assert connect_encoder("org/bge", tmp_path / "missing.sock") is None
+
+    def test_falls_back_when_daemon_goes_away(self, tmp_path):
+        local = _fake_model()
+        encoder = RemoteEncoder("org/bge", tmp_path / "gone.sock", fallback=lambda: local)
+        np.testing.assert_array_equal(encoder.encode(["aa"]), [[2, 1]])
+        local.encode.assert_called_once()
+
+
+class TestLoadEncoder:
+    def test_uses_daemon_when_running(self, daemon, tmp_path):
+        path, model = daemon
+        with patch("rss_summary.encoder_daemon.ENCODER_SOCKET", path), \
+             patch("rss_summary.classification.BGE_MODEL_ID", "org/bge"), \
+             patch("rss_summary.classification._load_local_model") as local:
+            encoder = load_bge_model(tmp_path / "cache")
+            np.testing.assert_array_equal(encoder.encode(["abcd"]), [[4, 1]])
+        local.assert_not_called()
+        model.encode.assert_called_once()
+
+    def test_loads_in_process_without_daemon(self, tmp_path):
+        with patch("rss_summary.encoder_daemon.ENCODER_SOCKET", tmp_path / "missing.sock"), \
+             patch("rss_summary.classification._load_local_model", return_value=_fake_model()) as local:
+            load_bge_model(tmp_path / "cache").encode(["abcd"])
+        local.assert_called_once()
@@ -0,0 +1,30 @@
+from rss_summary.feed_cache import FeedCache
+
+_URL = "https://example.com/rss"
+
+
+class TestFeedCache:
+    def test_empty_cache_has_no_headers(self, tmp_path):
+        cache = FeedCache(tmp_path / "cache")
+        assert cache.request_headers(_URL) == {}
+        assert cache.body(_URL) is None
+        assert cache.fetched_at(_URL) is None
+
+    def test_unsaved_store_is_not_persisted(self, tmp_path):
+        cache = FeedCache(tmp_path)
+        cache.store(_URL, {"ETag": '"x"'}, b"<rss/>")
+        assert cache.body(_URL) == b"<rss/>"
+        assert FeedCache(tmp_path).request_headers(_URL) == {}
+
+    def test_roundtrip(self, tmp_path):
+        cache = FeedCache(tmp_path)
+        cache.store(_URL, {"Last-Modified": "Mon, 01 Jan 2026 00:00:00 GMT"}, b"<rss/>")
+        cache.save()
+        reloaded = FeedCache(tmp_path)
+        assert reloaded.request_headers(_URL) == {"If-Modified-Since": "Mon, 01 Jan 2026 00:00:00 GMT"}
+        assert reloaded.body(_URL) == b"<rss/>"
+        assert reloaded.fetched_at(_URL) is not None
+
+    def test_corrupted_index_is_ignored(self, tmp_path):
+        (tmp_path / "index.json").write_text("{not json")
+        assert FeedCache(tmp_path).request_headers(_URL) == {}
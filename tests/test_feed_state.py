@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+
+from rss_summary.feed_state import FeedState, restore_feed_state
+
+FEED = "https://rci.fm/rss"
+RUN_1 = datetime(2025, 1, 2, 19, 30)
+RUN_2 = datetime(2025, 1, 3, 19, 30)
+
+
+def _state_after_first_run(path, entries):
+    state = FeedState(path, last_run=datetime(2025, 1, 1))
+    for guid, published in entries:
+        state.mark(FEED, guid, published)
+    state.save(RUN_1)
+    return FeedState(path, last_run=RUN_1)
+
+
+class TestFeedState:
+    def test_unknown_feed_uses_fallback(self, tmp_path):
+        state = FeedState(tmp_path / "state.db", last_run=RUN_1)
+        assert state.is_new(FEED, "a", RUN_1 + timedelta(hours=1), RUN_1)
+        assert not state.is_new(FEED, "a", RUN_1 - timedelta(hours=1), RUN_1)
+
+    def test_seen_guid_is_skipped(self, tmp_path):
+        state = _state_after_first_run(tmp_path / "state.db", [("a", datetime(2025, 1, 2, 10))])
+        assert not state.is_new(FEED, "a", datetime(2025, 1, 2, 10), RUN_1)
+
+    def test_late_published_entry_is_new(self, tmp_path):
+        state = _state_after_first_run(tmp_path / "state.db", [("a", datetime(2025, 1, 2, 10))])
+        assert state.is_new(FEED, "b", datetime(2025, 1, 2, 8), RUN_1)
+        assert not state.is_new(FEED, "c", datetime(2024, 12, 20), RUN_1)
+
+    def test_state_saved_with_another_last_run_is_ignored(self, tmp_path):
+        path = tmp_path / "state.db"
+        _state_after_first_run(path, [("a", datetime(2025, 1, 2, 10))])
+        stale = FeedState(path, last_run=RUN_2)
+        assert stale.is_new(FEED, "a", RUN_2 + timedelta(hours=1), RUN_2)
+        assert not stale.is_new(FEED, "a", datetime(2025, 1, 2, 10), RUN_2)
+
+    def test_unsaved_marks_leave_no_file(self, tmp_path):
+        path = tmp_path / "state.db"
+        FeedState(path, last_run=RUN_1).mark(FEED, "a", RUN_1)
+        assert not path.exists()
+
+    def test_seen_set_is_bounded(self, tmp_path):
+        path = tmp_path / "state.db"
+        state = FeedState(path, max_seen=2)
+        for i in range(5):
+            state.mark(FEED, f"g{i}", datetime(2025, 1, 2, i))
+        state.save(RUN_1)
+        reloaded = FeedState(path, last_run=RUN_1)
+        assert reloaded._seen[FEED] == {"g3", "g4"}
+
+    def test_stop_before_only_for_newest_first_feeds(self, tmp_path):
+        path = tmp_path / "state.db"
+        state = FeedState(path, last_run=datetime(2025, 1, 1))
+        state.mark(FEED, "a", datetime(2025, 1, 2, 10))
+        state.record_order(FEED, [datetime(2025, 1, 2, 10), datetime(2025, 1, 2, 10), datetime(2025, 1, 1)])
+        state.record_order("https://other.example/rss", [datetime(2025, 1, 1), datetime(2025, 1, 2)])
+        assert state.stop_before(FEED, RUN_1) is None
+        state.save(RUN_1)
+        reloaded = FeedState(path, last_run=RUN_1)
+        assert reloaded.stop_before(FEED, RUN_1) == datetime(2025, 1, 2, 10) - reloaded.grace
+        assert reloaded.stop_before("https://other.example/rss", RUN_1) is None
+
+    def test_order_survives_stale_state(self, tmp_path):
+        path = tmp_path / "state.db"
+        state = FeedState(path)
+        state.record_order(FEED, [datetime(2025, 1, 2), datetime(2025, 1, 1)])
+        state.save(RUN_1)
+        stale = FeedState(path, last_run=RUN_2)
+        assert stale.stop_before(FEED, RUN_2) == RUN_2
+
+    def test_restore_brings_back_previous_state(self, tmp_path):
+        path = tmp_path / "state.db"
+        state = _state_after_first_run(path, [("a", datetime(2025, 1, 2, 10))])
+        state.mark(FEED, "b", datetime(2025, 1, 3, 10))
+        state.save(RUN_2)
+        restore_feed_state(path)
+        restored = FeedState(path, last_run=RUN_1)
+        assert restored.is_new(FEED, "b", datetime(2025, 1, 3, 10), RUN_1)
+        assert not restored.is_new(FEED, "a", datetime(2025, 1, 2, 10), RUN_1)
@@ -0,0 +1,84 @@
+from datetime import datetime
+
+import feedparser
+import pytest
+
+from rss_summary.feed_stream import StreamParseError, iter_entries, parse_stream
+
+_RSS = (
+    b'<?xml version="1.0" encoding="UTF-8"?>'
+    b'<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/"><channel><title>T</title>'
+    b"<item><title>Newest</title><link>https://example.com/3</link><guid>g3</guid>"
+    b"<pubDate>Fri, 03 Jan 2025 10:00:00 +0100</pubDate>"
+    b"<description><![CDATA[<p>Trois</p>]]></description>"
+    b'<media:content url="https://example.com/3.jpg" medium="image"/></item>'
+    b"<item><title>Middle</title><link>https://example.com/2</link>"
+    b"<pubDate>Thu, 02 Jan 2025 10:00:00 GMT</pubDate><description>Deux</description></item>"
+    b"<item><title>Oldest</title><link>https://example.com/1</link>"
+    b"<pubDate>Wed, 01 Jan 2025 10:00:00 GMT</pubDate><description>Un</description></item>"
+    b"</channel></rss>"
+)
+
+_ATOM = (
+    b'<?xml version="1.0" encoding="utf-8"?><feed xmlns="http://www.w3.org/2005/Atom"><title>T</title>'
+    b"<entry><title>Atom entry</title><id>urn:1</id>"
+    b'<link rel="enclosure" href="https://example.com/a.mp3"/><link href="https://example.com/a"/>'
+    b"<published>2025-01-02T10:00:00Z</published><summary>R\xc3\xa9sum\xc3\xa9</summary></entry>"
+    b"</feed>"
+)
+
+
+def _chunks(body, size=37):
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+class TestIterEntries:
+    def test_matches_feedparser_fields(self):
+        ours = list(iter_entries(_chunks(_RSS)))
+        theirs = feedparser.parse(_RSS).entries
+        assert len(ours) == len(theirs) == 3
+        for a, b in zip(ours, theirs):
+            assert a.title == b.title
+            assert a.link == b.link
+            assert a.published_parsed == b.published_parsed
+        assert ours[0].id == "g3"
+        assert ours[0].summary_detail.value == "<p>Trois</p>"
+        assert ours[0].media_content[0]["url"] == "https://example.com/3.jpg"
+
+    def test_atom_uses_alternate_link(self):
+        (entry,) = iter_entries([_ATOM])
+        assert entry.link == "https://example.com/a"
+        assert entry.id == "urn:1"
+        assert entry.summary_detail.value == "Résumé"
+        assert entry.published_parsed == feedparser.parse(_ATOM).entries[0].published_parsed
+
+    def test_rejects_other_documents(self):
+        with pytest.raises(StreamParseError):
+            list(iter_entries([b"<html><body>Maintenance</body></html>"]))
+
+    def test_rejects_malformed_xml(self):
+        with pytest.raises(StreamParseError):
+            list(iter_entries([_RSS.replace(b"Deux", b"Deux &nbsp;")]))
+
+
+class TestParseStream:
+    def test_stops_at_first_old_entry(self):
+        feed, complete, _ = parse_stream(_chunks(_RSS), stop_before=datetime(2025, 1, 2, 10))
+        assert [e.title for e in feed.entries] == ["Newest"]
+        assert not complete
+
+    def test_reads_everything_without_stop_date(self):
+        feed, complete, body = parse_stream(_chunks(_RSS))
+        assert len(feed.entries) == 3
+        assert complete
+        assert body == _RSS
+
+    def test_undated_entry_is_left_to_feedparser(self):
+        atom = _ATOM.replace(b"published>", b"updated>")
+        with pytest.raises(StreamParseError):
+            parse_stream([atom])
+
+    def test_error_keeps_consumed_bytes(self):
+        with pytest.raises(StreamParseError) as info:
+            parse_stream(_chunks(b"<html><body>x</body></html>", size=4))
+        assert info.value.consumed.startswith(b"<htm")
@@ -0,0 +1,152 @@
+import time
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import feedparser
+import requests
+
+from rss_summary.feed_cache import FeedCache
+from rss_summary.fetching import HostLimiter, fetch_feed, fetch_feeds, iter_feeds
+
+_RSS = (
+    b'<?xml version="1.0"?><rss version="2.0"><channel><title>T</title>'
+    b"<item><title>Article</title><link>https://example.com/a</link></item>"
+    b"</channel></rss>"
+)
+
+
+def _mock_response(body=_RSS, status_code=200, headers=None):
+    r = MagicMock()
+    r.status_code = status_code
+    r.headers = headers or {}
+    r.__enter__.return_value = r
+    r.iter_content.return_value = [body]
+    return r
+
+
+class TestHostLimiter:
+    def test_same_host_shares_semaphore(self):
+        limiter = HostLimiter(2)
+        assert limiter("https://rci.fm/a") is limiter("https://rci.fm/b")
+
+    def test_different_hosts_get_distinct_semaphores(self):
+        limiter = HostLimiter(2)
+        assert limiter("https://rci.fm/a") is not limiter("https://karibinfo.com/rss")
+
+
+class TestFetchFeed:
+    def test_parses_downloaded_body(self):
+        with patch("rss_summary.fetching.requests.get", return_value=_mock_response()):
+            feed = fetch_feed("https://example.com/rss")
+        assert feed.entries[0].title == "Article"
+
+    def test_returns_none_on_request_error(self):
+        with patch("rss_summary.fetching.requests.get", side_effect=requests.RequestException("down")):
+            assert fetch_feed("https://example.com/rss") is None
+
+    def test_returns_none_when_deadline_exceeded(self):
+        with patch("rss_summary.fetching.requests.get", return_value=_mock_response()), \
+             patch("rss_summary.fetching.time.monotonic", side_effect=[0.0, 100.0]):
+            assert fetch_feed("https://example.com/rss", timeout=5) is None
+
+
+class TestStreamingFetch:
+    _NEWEST_FIRST = (
+        b'<?xml version="1.0"?><rss version="2.0"><channel><title>T</title>'
+        b"<item><title>New</title><link>https://example.com/b</link><pubDate>Thu, 02 Jan 2025 10:00:00 GMT</pubDate></item>"
+        b"<item><title>Old</title><link>https://example.com/a</link><pubDate>Wed, 01 Jan 2025 10:00:00 GMT</pubDate></item>"
+        b"</channel></rss>"
+    )
+
+    def test_stops_early_without_reading_or_caching_the_rest(self, tmp_path):
+        cache = FeedCache(tmp_path / "cache")
+        older = b"<item><title>Older</title><pubDate>Tue, 31 Dec 2024 10:00:00 GMT</pubDate></item>" * 20
+        body = self._NEWEST_FIRST.replace(b"</channel>", older + b"</channel>")
+        response = _mock_response()
+        chunks = iter([body[i:i + 64] for i in range(0, len(body), 64)])
+        response.iter_content.return_value = chunks
+        with patch("rss_summary.fetching.requests.get", return_value=response):
+            feed = fetch_feed("https://example.com/rss", cache=cache, streaming=True, stop_before=datetime(2025, 1, 2))
+        assert [e.title for e in feed.entries] == ["New"]
+        assert next(chunks, None) is not None
+        assert cache.body("https://example.com/rss") is None
+
+    def test_undated_entry_falls_back_to_feedparser(self):
+        dc = self._NEWEST_FIRST.replace(b'<rss version="2.0">', b'<rss version="2.0" xmlns:dc="http://purl.org/dc/elements/1.1/">')
+        dc = dc.replace(b"<pubDate>Thu, 02 Jan 2025 10:00:00 GMT</pubDate>", b"<dc:date>2025-01-02T10:00:00Z</dc:date>")
+        with patch("rss_summary.fetching.requests.get", return_value=_mock_response(dc)):
+            feed = fetch_feed("https://example.com/rss", streaming=True, stop_before=datetime(2025, 1, 2))
+        assert feed.entries == feedparser.parse(dc).entries
+
+    def test_falls_back_to_feedparser(self):
+        rdf = (
+            b'<?xml version="1.0"?><rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" '
+            b'xmlns="http://purl.org/rss/1.0/"><channel rdf:about="x"><title>T</title></channel>'
+            b'<item rdf:about="https://example.com/a"><title>RDF item</title><link>https://example.com/a</link></item>'
+            b"</rdf:RDF>"
+        )
+        with patch("rss_summary.fetching.requests.get", return_value=_mock_response(rdf)):
+            feed = fetch_feed("https://example.com/rss", streaming=True)
+        assert feed.entries[0].title == "RDF item"
+
+
+class TestFetchFeeds:
+    def test_preserves_input_order(self):
+        def fake_fetch(url, timeout, limiter, cache, since, streaming, stop_before):
+            return url
+        urls = [f"https://host{i}.example/rss" for i in range(6)]
+        with patch("rss_summary.fetching.fetch_feed", side_effect=fake_fetch):
+            assert fetch_feeds(urls) == urls
+
+    def test_iter_feeds_yields_in_input_order(self):
+        def fake_fetch(url, timeout, limiter, cache, since, streaming, stop_before):
+            time.sleep(0.05 if url.endswith("0") else 0)
+            return url
+        urls = [f"https://host.example/{i}" for i in range(3)]
+        with patch("rss_summary.fetching.fetch_feed", side_effect=fake_fetch):
+            assert list(iter_feeds(urls)) == urls
+
+    def test_empty_list(self):
+        assert fetch_feeds([]) == []
+
+
+class TestConditionalGet:
+    _URL = "https://example.com/rss"
+
+    def _cached(self, tmp_path):
+        cache = FeedCache(tmp_path)
+        cache.store(self._URL, {"ETag": '"abc"', "Last-Modified": "Mon, 01 Jan 2026 00:00:00 GMT"}, _RSS)
+        cache.save()
+        return FeedCache(tmp_path)
+
+    def test_sends_validators(self, tmp_path):
+        cache = self._cached(tmp_path)
+        with patch("rss_summary.fetching.requests.get", return_value=_mock_response(status_code=304)) as mock_get:
+            fetch_feed(self._URL, cache=cache)
+        headers = mock_get.call_args.kwargs["headers"]
+        assert headers["If-None-Match"] == '"abc"'
+        assert headers["If-Modified-Since"] == "Mon, 01 Jan 2026 00:00:00 GMT"
+
+    def test_not_modified_since_last_run_skips_parse(self, tmp_path):
+        cache = self._cached(tmp_path)
+        with patch("rss_summary.fetching.requests.get", return_value=_mock_response(status_code=304)), \
+             patch("rss_summary.fetching.feedparser.parse") as mock_parse:
+            feed = fetch_feed(self._URL, cache=cache, since=datetime.today())
+        assert feed.entries == []
+        mock_parse.assert_not_called()
+
+    def test_not_modified_after_last_run_reparses_cached_body(self, tmp_path):
+        cache = self._cached(tmp_path)
+        with patch("rss_summary.fetching.requests.get", return_value=_mock_response(status_code=304)):
+            feed = fetch_feed(self._URL, cache=cache, since=datetime(2000, 1, 1))
+        assert feed.entries[0].title == "Article"
+
+    def test_fresh_response_is_stored(self, tmp_path):
+        cache = FeedCache(tmp_path)
+        response = _mock_response(headers={"ETag": '"new"'})
+        with patch("rss_summary.fetching.requests.get", return_value=response):
+            fetch_feed(self._URL, cache=cache)
+        cache.save()
+        reloaded = FeedCache(tmp_path)
+        assert reloaded.request_headers(self._URL) == {"If-None-Match": '"new"'}
+        assert reloaded.body(self._URL) == _RSS
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from rss_summary.history import DedupHistory, restore_dedup_history
+from rss_summary.similarity import EmbeddingIndex, TitleIndex
+
+NOW = datetime(2025, 1, 10, 19, 30)
+
+
+def _save(directory, titles, when, days=3):
+    history = DedupHistory(directory, days=days, now=when)
+    for i, title in enumerate(titles):
+        history.add(title, np.eye(4)[i % 4] * 3)
+    history.save()
+
+
+class TestDedupHistory:
+    def test_missing_directory_is_empty(self, tmp_path):
+        assert len(DedupHistory(tmp_path / "absent")) == 0
+
+    def test_round_trip_normalizes_to_float16(self, tmp_path):
+        _save(tmp_path, ["A", "B"], NOW)
+        history = DedupHistory(tmp_path, now=NOW)
+        assert history.titles == ["A", "B"]
+        assert history.embeddings.dtype == np.float16
+        np.testing.assert_allclose(history.embeddings[0], [1, 0, 0, 0])
+
+    def test_rows_outside_window_are_ignored_then_evicted(self, tmp_path):
+        _save(tmp_path, ["old"], NOW - timedelta(days=5))
+        _save(tmp_path, ["recent"], NOW - timedelta(days=1))
+        history = DedupHistory(tmp_path, days=3, now=NOW)
+        assert history.titles == ["recent"]
+        history.save()
+        assert DedupHistory(tmp_path, days=30, now=NOW).titles == ["recent"]
+
+    def test_seed_fills_both_indexes(self, tmp_path):
+        _save(tmp_path, ["Grève au port de Jarry"], NOW)
+        embeddings, titles = EmbeddingIndex(), TitleIndex()
+        DedupHistory(tmp_path, now=NOW).seed(embeddings, titles)
+        assert embeddings.is_duplicate(np.array([1.0, 0.01, 0, 0]))
+        assert titles.is_duplicate("Grève au port de Jarry !")
+
+    def test_unreadable_history_is_ignored(self, tmp_path):
+        (tmp_path / "index.json").write_text("{not json")
+        assert len(DedupHistory(tmp_path)) == 0
+
+    def test_restore_puts_back_the_history_before_the_last_save(self, tmp_path):
+        directory = tmp_path / "history"
+        _save(directory, ["A"], NOW - timedelta(days=1))
+        _save(directory, ["B"], NOW)
+        restore_dedup_history(directory)
+        assert DedupHistory(directory, now=NOW).titles == ["A"]
+
+    def test_restore_after_first_save_empties_the_history(self, tmp_path):
+        directory = tmp_path / "history"
+        _save(directory, ["A"], NOW)
+        restore_dedup_history(directory)
+        assert len(DedupHistory(directory, now=NOW)) == 0
+
+    def test_restore_without_backup_keeps_the_history(self, tmp_path):
+        directory = tmp_path / "history"
+        directory.mkdir()
+        restore_dedup_history(directory)
+        assert directory.exists()
@@ -0,0 +1,133 @@
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from rss_summary.images import ImageCache, page_image, resolve_images, scan_image
+
+
+def _page(html, status=200, url="https://example.com/a"):
+    r = MagicMock()
+    r.url = url
+    r.ok = status < 400
+    r.status_code = status
+    r.headers = {"Content-Type": "text/html; charset=utf-8"}
+    r.encoding = "utf-8"
+    r.__enter__.return_value = r
+    body = html.encode()
+    r.iter_content.side_effect = lambda size: (body[i:i + size] for i in range(0, len(body), size))
+    return r
+
+
+class TestPageImage:
+    def test_relative_src_is_made_absolute(self):
+        session = MagicMock()
+        session.get.return_value = _page('<html><body><img src="/images/logo.png"></body></html>')
+        assert page_image("https://example.com/news/a", session) == "https://example.com/images/logo.png"
+
+    def test_absolute_src_is_kept(self):
+        session = MagicMock()
+        session.get.return_value = _page('<img src="https://cdn.example.com/a.jpg">')
+        assert page_image("https://example.com/news/a", session) == "https://cdn.example.com/a.jpg"
+
+    def test_relative_src_follows_redirects(self):
+        session = MagicMock()
+        session.get.return_value = _page('<img src="img/a.jpg">', url="https://www.example.org/news/b")
+        assert page_image("https://example.com/a", session) == "https://www.example.org/news/img/a.jpg"
+
+    def test_no_image_on_page(self):
+        session = MagicMock()
+        session.get.return_value = _page("<html><body>No images here</body></html>")
+        assert page_image("https://example.com/a", session) == ""
+
+    def test_page_is_streamed(self):
+        session = MagicMock()
+        session.get.return_value = _page('<meta property="og:image" content="//cdn.example.com/og.jpg">')
+        assert page_image("https://example.com/a", session) == "https://cdn.example.com/og.jpg"
+        assert session.get.call_args.kwargs["stream"] is True
+
+    def test_network_error_is_none(self):
+        session = MagicMock()
+        session.get.side_effect = requests.RequestException("timeout")
+        assert page_image("https://example.com/a", session) is None
+
+    def test_error_status_is_none(self):
+        session = MagicMock()
+        for status in (429, 503):
+            session.get.return_value = _page('<img src="/error.png">', status)
+            assert page_image("https://example.com/a", session) is None
+
+
+class TestScanImage:
+    def _chunks(self, html, size=7):
+        body = html.encode()
+        return [body[i:i + size] for i in range(0, len(body), size)]
+
+    def test_og_image_wins_over_twitter_and_img(self):
+        html = (
+            '<html><head><meta name="twitter:image" content="/t.jpg">'
+            '<meta property="og:image" content="/og.jpg"></head><body><img src="/logo.png"></body></html>'
+        )
+        assert scan_image(self._chunks(html)) == "/og.jpg"
+
+    def test_twitter_image_when_head_has_no_og_image(self):
+        html = '<head><meta name="twitter:image" content="/t.jpg"></head><body><img src="/logo.png">'
+        assert scan_image(self._chunks(html)) == "/t.jpg"
+
+    def test_first_img_as_fallback(self):
+        assert scan_image(self._chunks('<head><title>x</title></head><body><p><img src="/a.jpg"><img src="/b.jpg">')) == "/a.jpg"
+
+    def test_stops_reading_once_found(self):
+        chunks = iter(self._chunks('<head><meta property="og:image" content="/og.jpg">') + [b"<body>"] * 1000)
+        assert scan_image(chunks) == "/og.jpg"
+        assert len(list(chunks)) > 900
+
+    def test_byte_cap(self):
+        html = "<head></head><body>" + "x" * 1000 + '<img src="/late.jpg">'
+        assert scan_image(self._chunks(html), max_bytes=500) is None
+
+    def test_chunk_split_inside_multibyte_character(self):
+        html = '<head><meta property="og:image" content="/é.jpg"></head>'
+        assert scan_image(self._chunks(html, size=1)) == "/é.jpg"
+
+
+class TestResolveImages:
+    def test_feed_images_are_kept(self):
+        items = [{"link": "https://example.com/a", "media_content": [{"url": "https://img.com/photo.jpg"}]}]
+        with patch("rss_summary.images.page_image") as mock_page:
+            resolve_images(items)
+        mock_page.assert_not_called()
+        assert items[0]["media_content"] == [{"url": "https://img.com/photo.jpg"}]
+
+    def test_pages_are_fetched_once_across_runs(self, tmp_path):
+        path = tmp_path / "images.json"
+        cache = ImageCache(path)
+        with patch("rss_summary.images.page_image", return_value="https://example.com/a.jpg") as mock_page:
+            resolve_images([{"link": "https://example.com/a", "media_content": [{"url": ""}]}], cache)
+        cache.save()
+        assert mock_page.call_count == 1
+
+        items = [{"link": "https://www.example.com/a?utm_source=rss", "media_content": [{"url": ""}]}]
+        with patch("rss_summary.images.page_image") as mock_page:
+            resolve_images(items, ImageCache(path))
+        mock_page.assert_not_called()
+        assert items[0]["media_content"] == [{"url": "https://example.com/a.jpg"}]
+
+    def test_failed_pages_are_not_cached(self, tmp_path):
+        cache = ImageCache(tmp_path / "images.json")
+        items = [{"link": "https://example.com/a", "media_content": [{"url": ""}]}]
+        with patch("rss_summary.images.page_image", return_value=None):
+            resolve_images(items, cache)
+        assert items[0]["media_content"] == [{"url": ""}]
+        assert cache.get("https://example.com/a") is None
+
+
+class TestImageCache:
+    def test_unsaved_updates_are_not_persisted(self, tmp_path):
+        cache = ImageCache(tmp_path / "images.json")
+        cache.set("https://example.com/a", "")
+        assert cache.get("https://example.com/a") == ""
+        assert ImageCache(tmp_path / "images.json").get("https://example.com/a") is None
+
+    def test_corrupted_file_is_ignored(self, tmp_path):
+        (tmp_path / "images.json").write_text("{not json")
+        assert ImageCache(tmp_path / "images.json").get("https://example.com/a") is None
@@ -20,6 +20,13 @@ class TestLastRunDate:
         assert isinstance(result, datetime)
         assert result.date() == datetime.today().date()
 
+    def test_set_returns_the_stored_time(self, tmp_path):
+        last_run_file = tmp_path / ".last-run"
+        with patch("rss_summary.last_run.LAST_RUN_FILE", last_run_file), \
+             patch("rss_summary.last_run.LAST_RUN_BACKUP", tmp_path / ".last-run.bak"):
+            written = set_last_run_date()
+            assert get_last_run_date() == written
+
     def test_get_returns_midnight_when_file_missing(self, tmp_path):
         last_run_file = tmp_path / ".last-run"
         with patch("rss_summary.last_run.LAST_RUN_FILE", last_run_file):
@@ -0,0 +1,58 @@
+import threading
+import time
+
+import pytest
+
+from rss_summary.pipeline import Stage, micro_batches
+
+
+class TestMicroBatches:
+    def test_groups_in_order(self):
+        assert list(micro_batches(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+    def test_empty(self):
+        assert list(micro_batches([], 3)) == []
+
+
+class TestStage:
+    def test_chained_stages_keep_order(self):
+        doubled = Stage("double", (x * 2 for x in Stage("source", iter(range(100)))))
+        assert list(doubled) == [x * 2 for x in range(100)]
+
+    def test_counts_records_in_batches(self):
+        stage = Stage("batches", micro_batches(range(7), 3), count=len)
+        assert sum(len(b) for b in stage) == 7
+        assert stage.items == 7
+
+    def test_error_is_raised_in_consumer(self):
+        def failing():
+            yield 1
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError, match="boom"):
+            list(Stage("failing", failing()))
+
+    def test_producer_runs_ahead_of_consumer(self):
+        produced = threading.Event()
+
+        def source():
+            yield "first"
+            yield "second"
+            produced.set()
+
+        stage = Stage("ahead", source())
+        assert produced.wait(5)
+        assert list(stage) == ["first", "second"]
+
+    def test_queue_bounds_how_far_producer_runs_ahead(self):
+        produced = []
+
+        def source():
+            for i in range(20):
+                produced.append(i)
+                yield i
+
+        stage = Stage("bounded", source(), maxsize=2)
+        time.sleep(0.1)
+        assert len(produced) <= 4
+        assert list(stage) == list(range(20))
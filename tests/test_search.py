@@ -0,0 +1,104 @@
+import json
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from rss_summary.search import SearchIndex, tokenize
+
+
+def _record(day, title, summary="", url=None):
+    return {
+        "day": day, "date": f"{day}T08:00:00", "title": title, "url": url or f"https://rci.fm/{title}",
+        "summary": summary, "image": "", "theme": None,
+    }
+
+
+def _write_archive(path, records, mode="w"):
+    with open(path, mode) as f:
+        f.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+
+
+def _model():
+    """Fake encoder: a fixed unit vector per distinct text."""
+    model = MagicMock(model_id="fake")
+    model.encode.side_effect = lambda texts, **kw: np.stack([
+        np.random.default_rng(abs(hash(t)) % 2**32).normal(size=8) for t in texts
+    ])
+    return model
+
+
+class TestTokenize:
+    def test_folds_accents_stopwords_and_plurals(self):
+        assert tokenize("Les Sargasses échouées à Sainte-Anne") == ["sargasse", "echouee", "sainte", "anne"]
+
+
+class TestSearchIndex:
+    def _index(self, tmp_path, records):
+        archive = tmp_path / "archive.jsonl"
+        _write_archive(archive, records)
+        index = SearchIndex(tmp_path / ".search-index")
+        model = _model()
+        index.sync(archive, model)
+        return index, archive, model
+
+    def test_text_search_matches_all_terms_newest_first(self, tmp_path):
+        index, _, _ = self._index(tmp_path, [
+            _record("2025-12-30", "Sargasses au Moule"),
+            _record("2026-01-05", "Nouvel échouement de sargasse", "plage du Moule"),
+            _record("2026-01-06", "Budget régional"),
+        ])
+        assert [r["day"] for r in index.search_text("sargasses")] == ["2026-01-05", "2025-12-30"]
+        assert [r["day"] for r in index.search_text("sargasses Moule", start=date(2026, 1, 1))] == ["2026-01-05"]
+        assert index.search_text("inconnu") == []
+
+    def test_semantic_search_ranks_by_cosine(self, tmp_path):
+        index, _, model = self._index(tmp_path, [_record("2026-01-05", "A", "x"), _record("2026-01-06", "B", "y")])
+        query = model.encode.side_effect(["B. y"])[0]
+        results = index.search_semantic(query, min_score=0.0)
+        assert results[0]["title"] == "B"
+        assert results[0]["score"] > 0.99
+
+    def test_sync_is_incremental(self, tmp_path):
+        index, archive, model = self._index(tmp_path, [_record("2026-01-05", "A")])
+        _write_archive(archive, [_record("2026-01-06", "B")], mode="a")
+        assert index.sync(archive, model) == 1
+        assert model.encode.call_args.args[0] == ["B. "]
+        assert index.sync(archive, model) == 0
+        assert len(SearchIndex(tmp_path / ".search-index")) == 2
+
+    def test_rewritten_archive_rebuilds(self, tmp_path):
+        index, archive, model = self._index(tmp_path, [_record("2026-01-05", "Carnaval"), _record("2026-01-06", "Cyclone")])
+        _write_archive(archive, [_record("2026-01-05", "Carnaval")])
+        index.sync(archive, model)
+        assert [r["title"] for r in index.records] == ["Carnaval"]
+        assert index.search_text("cyclone") == []
+
+    def test_unchanged_archive_is_not_rehashed(self, tmp_path):
+        index, archive, model = self._index(tmp_path, [_record("2026-01-05", "A")])
+        with patch("rss_summary.search.hashlib.sha1") as mock_sha1:
+            assert SearchIndex(tmp_path / ".search-index").sync(archive, model) == 0
+        mock_sha1.assert_not_called()
+
+    def test_interrupted_sync_keeps_the_previous_index(self, tmp_path):
+        index, archive, model = self._index(tmp_path, [_record("2026-01-05", "Carnaval")])
+        directory = tmp_path / ".search-index"
+        before = {name: (directory / name).read_text() for name in ("postings.json", "meta.json")}
+        _write_archive(archive, [_record("2026-01-06", "Cyclone")], mode="a")
+        index.sync(archive, model)
+        # Crash after records and vectors were replaced, before postings and meta.
+        for name, text in before.items():
+            (directory / name).write_text(text)
+        reloaded = SearchIndex(directory)
+        assert [r["title"] for r in reloaded.records] == ["Carnaval"]
+        assert reloaded.sync(archive, model) == 1
+        assert [r["title"] for r in reloaded.search_text("cyclone")] == ["Cyclone"]
+
+    def test_postings_out_of_step_with_meta_trigger_a_rebuild(self, tmp_path):
+        index, archive, model = self._index(tmp_path, [_record("2026-01-05", "Carnaval")])
+        directory = tmp_path / ".search-index"
+        (directory / "postings.json").write_text(json.dumps({"rows": 2, "terms": {}}))
+        reloaded = SearchIndex(directory)
+        assert len(reloaded) == 0
+        assert reloaded.sync(archive, model) == 1
+        assert [r["title"] for r in reloaded.search_text("carnaval")] == ["Carnaval"]
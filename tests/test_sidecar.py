@@ -0,0 +1,76 @@
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from rss_summary.classification import E5_PROMPT
+from rss_summary.sidecar import SidecarEncoder, load_sidecar, sidecar_path, sidecar_vectors, write_sidecar
+
+
+def _item(title="Titre", summary="Résumé", theme=None):
+    item = {
+        "title": title,
+        "summary": summary,
+        "link": f"https://rci.fm/{title}",
+        "published_date": datetime(2025, 1, 2, 10, 0),
+    }
+    if theme:
+        item["classification"] = {"theme": theme, "top_score": 0.8, "runner_up": "Société", "runner_up_score": 0.1}
+    return item
+
+
+class TestSidecarPath:
+    def test_replaces_md_suffix(self, tmp_path):
+        assert sidecar_path(tmp_path / "feed-2025-01-02.md") == tmp_path / "feed-2025-01-02.npz"
+
+
+class TestWriteLoadSidecar:
+    def test_round_trip(self, tmp_path):
+        path = tmp_path / "feed.npz"
+        write_sidecar(path, [_item("A", theme="Politique"), _item("B")], np.eye(2, 4), np.ones((2, 4)))
+        data = load_sidecar(path)
+        assert list(data["url"]) == ["https://rci.fm/A", "https://rci.fm/B"]
+        assert list(data["text"]) == ["A. Résumé", "B. Résumé"]
+        assert data["date"][0] == "2025-01-02T10:00:00"
+        assert data["bge"].dtype == np.float16
+        assert list(data["theme"]) == ["Politique", ""]
+        assert data["top_score"][0] == np.float32(0.8)
+        assert np.isnan(data["top_score"][1])
+
+    def test_missing_returns_none(self, tmp_path):
+        assert load_sidecar(tmp_path / "absent.npz") is None
+
+    def test_corrupt_returns_none(self, tmp_path):
+        path = tmp_path / "bad.npz"
+        path.write_bytes(b"not a zip")
+        assert load_sidecar(path) is None
+
+
+class TestSidecarVectors:
+    def test_keys_are_model_inputs(self, tmp_path):
+        path = tmp_path / "feed.npz"
+        write_sidecar(path, [_item("A")], np.array([[1.0, 0.0]]), np.array([[0.0, 1.0]]))
+        bge, e5 = sidecar_vectors([load_sidecar(path)])
+        np.testing.assert_array_equal(bge["A. Résumé"], [1.0, 0.0])
+        np.testing.assert_array_equal(e5[E5_PROMPT + "A. Résumé"], [0.0, 1.0])
+
+
+class TestSidecarEncoder:
+    def test_only_misses_reach_the_model(self):
+        model = MagicMock()
+        model.encode.return_value = np.array([[0.0, 2.0]])
+        encoder = SidecarEncoder(model, {"known": np.array([3.0, 4.0], dtype=np.float16)})
+        out = encoder.encode(["known", "new"])
+        model.encode.assert_called_once_with(["new"], normalize_embeddings=False)
+        np.testing.assert_array_equal(out, [[3.0, 4.0], [0.0, 2.0]])
+
+    def test_full_hit_never_calls_model(self):
+        model = MagicMock()
+        encoder = SidecarEncoder(model, {"known": np.array([3.0, 4.0])})
+        out = encoder.encode(["known"], normalize_embeddings=True)
+        model.encode.assert_not_called()
+        np.testing.assert_allclose(out, [[0.6, 0.8]])
+
+    def test_single_string_returns_vector(self):
+        encoder = SidecarEncoder(MagicMock(), {"known": np.array([1.0, 0.0])})
+        assert encoder.encode("known").shape == (2,)
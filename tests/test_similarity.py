@@ -1,65 +1,26 @@
+import difflib
 from unittest.mock import MagicMock
 
-from rss_summary.similarity import encode_text, is_duplicate, title_is_duplicate
+import numpy as np
+import pytest
 
+from rss_summary.similarity import (
+    TITLE_SIMILARITY_THRESHOLD,
+    EmbeddingIndex,
+    IVFIndex,
+    TitleIndex,
+    encode_text,
+    encode_texts,
+)
 
-class TestIsDuplicate:
-    def test_empty_list_returns_false(self):
-        model = MagicMock()
-        mock_embedding = MagicMock()
-        assert is_duplicate(model, mock_embedding, []) is False
-        model.similarity.assert_not_called()
-
-    def test_high_similarity_returns_true(self, make_model):
-        mock_emb = MagicMock()
-        assert is_duplicate(make_model(0.85), mock_emb, [mock_emb]) is True
-
-    def test_low_similarity_returns_false(self, make_model):
-        mock_emb = MagicMock()
-        assert is_duplicate(make_model(0.3), mock_emb, [mock_emb]) is False
-
-    def test_exact_threshold_returns_false(self, make_model):
-        mock_emb = MagicMock()
-        assert is_duplicate(make_model(0.82), mock_emb, [mock_emb], threshold=0.82) is False
 
-    def test_custom_threshold(self, make_model):
-        mock_emb = MagicMock()
-        assert is_duplicate(make_model(0.5), mock_emb, [mock_emb], threshold=0.4) is True
-
-
-class TestTitleIsDuplicate:
-    def test_empty_list_returns_false(self):
-        assert title_is_duplicate("Some Title", []) is False
-
-    def test_near_identical_title_returns_true(self):
-        # "en hausse" vs "à la hausse" — real-world near-duplicate
-        t1 = "Carburants : les prix en hausse au 1er mars 2026 en Guadeloupe"
-        t2 = "Carburants : les prix à la hausse au 1er mars 2026 en Guadeloupe"
-        assert title_is_duplicate(t1, [t2]) is True
-
-    def test_different_title_returns_false(self):
-        assert title_is_duplicate("Séisme en Guadeloupe", ["Élections municipales à Pointe-à-Pitre"]) is False
-
-    def test_case_insensitive(self):
-        assert title_is_duplicate("GUADELOUPE. Hausse des hydrocarbures", ["guadeloupe. hausse des hydrocarbures"]) is True
-
-    def test_custom_threshold(self):
-        # At threshold=1.0 nothing matches except identical strings
-        assert title_is_duplicate("Foo bar", ["Foo baz"], threshold=1.0) is False
-
-    def test_exact_match_returns_true(self):
-        title = "Guadeloupe. Hausse des hydrocarbures le 1er mars"
-        assert title_is_duplicate(title, [title]) is True
-
-    def test_checks_all_existing_titles(self):
-        # Match is in the middle of the list, not just first or last
-        candidate = "Carburants : les prix en hausse au 1er mars 2026 en Guadeloupe"
-        existing = [
-            "Séisme en Guadeloupe",
-            "Carburants : les prix à la hausse au 1er mars 2026 en Guadeloupe",
-            "Élections municipales 2026",
-        ]
-        assert title_is_duplicate(candidate, existing) is True
+def _pairwise_title_is_duplicate(title, existing_titles, threshold=TITLE_SIMILARITY_THRESHOLD):
+    """Reference check: SequenceMatcher against every stored title."""
+    normalized = title.strip().lower()
+    return any(
+        difflib.SequenceMatcher(None, normalized, existing.strip().lower()).ratio() > threshold
+        for existing in existing_titles
+    )
 
 
 class TestEncodeText:
@@ -75,3 +36,140 @@ class TestEncodeText:
         model.encode.return_value = [sentinel]
         result = encode_text(model, "some text")
         assert result is sentinel
+
+
+class TestEncodeTexts:
+    def test_single_batched_call_with_stripped_html(self):
+        model = MagicMock()
+        model.encode.return_value = np.zeros((2, 3))
+        result = encode_texts(model, ["<p>One</p>", "<b>Two</b>"])
+        model.encode.assert_called_once_with(["One", "Two"], batch_size=32)
+        assert result.shape == (2, 3)
+
+    def test_empty_input_skips_model(self):
+        model = MagicMock()
+        assert len(encode_texts(model, [])) == 0
+        model.encode.assert_not_called()
+
+
+class TestEmbeddingIndex:
+    def test_empty_index_is_never_duplicate(self):
+        index = EmbeddingIndex()
+        assert index.max_similarity(np.array([1.0, 0.0])) is None
+        assert index.is_duplicate(np.array([1.0, 0.0])) is False
+
+    def test_max_similarity_is_cosine(self):
+        index = EmbeddingIndex()
+        index.add(np.array([3.0, 0.0]))
+        index.add(np.array([0.0, 2.0]))
+        assert index.max_similarity(np.array([1.0, 1.0])) == pytest.approx(np.sqrt(0.5))
+
+    def test_is_duplicate_strictly_above_threshold(self):
+        index = EmbeddingIndex()
+        index.add(np.array([1.0, 0.0]))
+        assert index.is_duplicate(np.array([2.0, 0.0])) is True
+        assert index.is_duplicate(np.array([0.0, 1.0])) is False
+        assert index.is_duplicate(np.array([1.0, 0.0]), threshold=1.0) is False
+
+    def test_grows_past_initial_capacity(self):
+        index = EmbeddingIndex(capacity=2)
+        vectors = np.eye(5)
+        for v in vectors:
+            index.add(v)
+        assert len(index) == 5
+        np.testing.assert_allclose(index.matrix, vectors)
+
+    def test_extend_normalizes_rows(self):
+        index = EmbeddingIndex(capacity=1)
+        index.extend(np.array([[2.0, 0.0], [0.0, 0.0], [0.0, 5.0]]))
+        np.testing.assert_allclose(index.matrix, [[1.0, 0.0], [0.0, 0.0], [0.0, 1.0]])
+
+
+class TestTitleIndex:
+    _TITLES = [
+        "Carburants : les prix à la hausse au 1er mars 2026 en Guadeloupe",
+        "Séisme en Guadeloupe",
+        "Élections municipales à Pointe-à-Pitre",
+        "GUADELOUPE. Hausse des hydrocarbures",
+        "Sargasses : alerte sur le littoral du Gosier",
+        "",
+    ]
+
+    def _index(self, titles):
+        index = TitleIndex(capacity=2)
+        for t in titles:
+            index.add(t)
+        return index
+
+    def test_empty_index_returns_false(self):
+        assert TitleIndex().is_duplicate("Some Title") is False
+
+    def test_near_identical_title_returns_true(self):
+        index = self._index(self._TITLES)
+        assert index.is_duplicate("Carburants : les prix en hausse au 1er mars 2026 en Guadeloupe") is True
+
+    def test_case_and_whitespace_insensitive(self):
+        index = self._index(self._TITLES)
+        assert index.is_duplicate("  guadeloupe. hausse des hydrocarbures ") is True
+
+    def test_different_title_returns_false(self):
+        index = self._index(self._TITLES)
+        assert index.is_duplicate("Le CHU recrute des infirmiers") is False
+
+    def test_exact_match_returns_true(self):
+        title = "Guadeloupe. Hausse des hydrocarbures le 1er mars"
+        assert self._index([title]).is_duplicate(title) is True
+
+    def test_threshold_one_matches_nothing(self):
+        index = self._index(["Foo baz", "Foo bar"])
+        assert index.is_duplicate("Foo bar", threshold=1.0) is False
+
+    def test_match_in_the_middle_of_the_index(self):
+        index = self._index(self._TITLES[1:3] + self._TITLES[:1] + self._TITLES[3:])
+        assert index.is_duplicate("Carburants : les prix en hausse au 1er mars 2026 en Guadeloupe") is True
+
+    @pytest.mark.parametrize("threshold", [0.5, 0.7, 0.85, 1.0])
+    def test_matches_pairwise_reference(self, threshold):
+        stored = self._TITLES + [f"{t} (mis à jour)" for t in self._TITLES[:3]]
+        queries = [t.upper() for t in stored] + [t[: len(t) // 2] for t in stored] + ["", "x"]
+        index = self._index(stored)
+        for q in queries:
+            assert index.is_duplicate(q, threshold) == _pairwise_title_is_duplicate(q, stored, threshold), q
+
+
+class TestIVFIndex:
+    def _clustered(self, n=600, d=16, seed=0):
+        rng = np.random.default_rng(seed)
+        centers = rng.normal(size=(60, d))
+        m = centers[rng.integers(0, 60, n)] + 0.3 * rng.normal(size=(n, d))
+        return (m / np.linalg.norm(m, axis=1, keepdims=True)).astype(np.float32)
+
+    def _exact_pairs(self, m, threshold):
+        i, j = np.nonzero(np.triu(m @ m.T >= threshold, 1))
+        return set(zip(i.tolist(), j.tolist()))
+
+    def test_probing_every_list_is_exact(self):
+        m = self._clustered()
+        index = IVFIndex(m, nlist=10)
+        i, j = index.threshold_pairs(0.8, nprobe=10)
+        assert set(zip(i.tolist(), j.tolist())) == self._exact_pairs(m, 0.8)
+
+    def test_pairs_are_sorted_and_ordered(self):
+        i, j = IVFIndex(self._clustered()).threshold_pairs(0.8, nprobe=2)
+        assert (i < j).all()
+        codes = i * 600 + j
+        assert (np.diff(codes) > 0).all()
+
+    def test_partial_probe_finds_subset_with_high_recall(self):
+        m = self._clustered()
+        exact = self._exact_pairs(m, 0.8)
+        i, j = IVFIndex(m).threshold_pairs(0.8, nprobe=4)
+        found = set(zip(i.tolist(), j.tolist()))
+        assert found <= exact
+        assert len(found) / len(exact) > 0.9
+
+    def test_neighbours_lists_later_rows(self):
+        m = self._clustered(n=50)
+        neighbours = IVFIndex(m, nlist=3).neighbours(0.8, nprobe=3)
+        assert len(neighbours) == 50
+        assert all((nbrs > row).all() for row, nbrs in enumerate(neighbours))
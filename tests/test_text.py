@@ -0,0 +1,69 @@
+from unittest.mock import patch
+
+import pytest
+from bs4 import BeautifulSoup
+
+from rss_summary import text
+from rss_summary.text import _LRUCache, _fast_text, cache_info, clear_cache, html_to_text
+
+_SAMPLES = [
+    "Texte brut sans balise",
+    "<p>Premier paragraphe.</p>\n<p>Second paragraphe.</p>",
+    '<p><img src="https://example.com/a.jpg" alt="" /></p><p>Le préfet a annoncé&nbsp;: fin de l&#8217;alerte &amp; reprise.</p>',
+    '<p>Texte</p>\n<p>The post <a href="https://www.karibinfo.com/news/x/?a=1&b=2">Titre</a> appeared first on Karibinfo.</p>',
+    "<div><b>Gras</b> et   plus</div>\n  \n<P>Autre</P>",
+    '<a title="a > b">lien</a>',
+    "a <!-- commentaire --> b",
+    "a<script>var x = 1;</script>b",
+    "<pre>  code  </pre>",
+    "&foo; &amp &#150; &#0;",
+    "a < b et c > d",
+    "<p>tronqué <a href=",
+    "<![CDATA[brut]]>",
+    "a<br><br/>\t</br>\r\n",
+    "<p>x</p></IMG >\n\n",
+]
+
+
+@pytest.fixture(autouse=True)
+def _empty_memo():
+    clear_cache()
+    yield
+    clear_cache()
+
+
+class TestHtmlToText:
+    @pytest.mark.parametrize("html", _SAMPLES)
+    def test_matches_beautifulsoup(self, html):
+        assert html_to_text(html) == BeautifulSoup(html, features="html.parser").get_text()
+
+    @pytest.mark.parametrize("html", _SAMPLES[1:6])
+    def test_rss_markup_takes_fast_path(self, html):
+        assert _fast_text(html) is not None
+
+    @pytest.mark.parametrize("html", _SAMPLES[6:])
+    def test_unusual_markup_falls_back(self, html):
+        assert _fast_text(html) is None
+
+    def test_repeated_input_is_memoized(self):
+        with patch("rss_summary.text._fast_text", wraps=text._fast_text) as fast:
+            html_to_text("<p>Résumé</p>")
+            html_to_text("<p>Résumé</p>")
+        assert fast.call_count == 1
+        assert cache_info() == (1, 1, 1)
+
+    def test_plain_text_bypasses_memo(self):
+        assert html_to_text("pas de balise") == "pas de balise"
+        assert cache_info() == (0, 0, 0)
+
+
+class TestLRUCache:
+    def test_evicts_least_recently_used(self):
+        cache = _LRUCache(2)
+        cache.put("a", "1")
+        cache.put("b", "2")
+        cache.get("a")
+        cache.put("c", "3")
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        assert len(cache) == 2
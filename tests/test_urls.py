@@ -0,0 +1,31 @@
+import pytest
+
+from rss_summary.urls import canonical_url
+
+
+class TestCanonicalUrl:
+    @pytest.mark.parametrize("variant", [
+        "https://www.karibinfo.com/news/canne-en-feu/",
+        "http://karibinfo.com/news/canne-en-feu?utm_source=facebook&utm_medium=social",
+        "https://m.karibinfo.com/news/canne-en-feu/amp/#comments",
+        "https://karibinfo.com/news/canne-en-feu/?fbclid=abc",
+    ])
+    def test_variants_share_a_key(self, variant):
+        assert canonical_url(variant) == "https://karibinfo.com/news/canne-en-feu"
+
+    def test_article_id_sources_ignore_slug_and_section(self):
+        a = canonical_url("https://la1ere.franceinfo.fr/guadeloupe/canne-la-campagne-demarre-1675053.html")
+        b = canonical_url("https://la1ere.franceinfo.fr/martinique/amp/canne-campagne-sucriere-1675053.html")
+        assert a == b == "https://la1ere.franceinfo.fr/1675053"
+
+    def test_mobile_host_of_source(self):
+        assert canonical_url("https://m.guadeloupe.franceantilles.fr/actualite/economie/a-1074854.php") == \
+            canonical_url("https://www.guadeloupe.franceantilles.fr/actualite/economie/a-1074854.php")
+
+    def test_meaningful_query_is_kept(self):
+        assert canonical_url("https://rci.fm/infos?id=3&xtor=RSS-1") == "https://rci.fm/infos?id=3"
+        assert canonical_url("https://rci.fm/infos?id=3") != canonical_url("https://rci.fm/infos?id=4")
+
+    def test_distinct_articles_stay_distinct(self):
+        assert canonical_url("https://rci.fm/guadeloupe/infos/Politique/A") != \
+            canonical_url("https://rci.fm/guadeloupe/infos/Politique/B")
@@ -1,3 +1,4 @@
+import json
 from datetime import datetime
 from unittest.mock import MagicMock, patch
 
@@ -11,8 +12,12 @@ from rss_summary.weekly import (
     cluster_articles,
     extract_source,
     get_most_read_urls,
+    load_period_articles,
+    load_period_sidecars,
+    neighbour_recall,
     parse_feed_file,
     pick_representative_article,
+    render_prose_digest,
     render_suggestions,
     split_mixed_clusters,
     representative_embedding,
@@ -112,29 +117,112 @@ class TestParseFeedFile:
 
 
 class TestClusterArticles:
-    def _make_model(self, sim_value):
-        model = MagicMock()
-        tensor = MagicMock()
-        tensor.item.return_value = sim_value
-        model.similarity.side_effect = lambda a, b: [[tensor] * len(b)] * len(a)
-        return model
+    def _embeddings(self, sim_value, n):
+        """n unit vectors whose pairwise cosine similarity is sim_value (n <= 2)."""
+        second = np.array([sim_value, np.sqrt(1 - sim_value ** 2)])
+        return np.array([[1.0, 0.0], second])[:n]
+
+    def _cluster(self, articles, sim_value):
+        embeddings = self._embeddings(sim_value, len(articles))
+        with patch("rss_summary.weekly.encode_texts", return_value=embeddings):
+            return cluster_articles(articles, MagicMock())
 
     def test_single_article_forms_one_cluster(self):
-        model = self._make_model(0.9)
-        articles = [_make_article()]
-        with patch("rss_summary.weekly.encode_text", return_value=np.array([1.0, 0.0])):
-            clusters = cluster_articles(articles, model)
+        clusters = self._cluster([_make_article()], 0.9)
         assert len(clusters) == 1
         assert len(clusters[0]) == 1
 
     @pytest.mark.parametrize("sim_value,expected_clusters", [(0.9, 1), (0.3, 2)])
     def test_cluster_count_by_similarity(self, sim_value, expected_clusters):
-        model = self._make_model(sim_value)
-        articles = [_make_article("A"), _make_article("B")]
-        with patch("rss_summary.weekly.encode_text", return_value=np.array([1.0, 0.0])):
-            clusters = cluster_articles(articles, model)
+        clusters = self._cluster([_make_article("A"), _make_article("B")], sim_value)
         assert len(clusters) == expected_clusters
 
+    def _chain(self):
+        """A~B and B~C above threshold, A and C below it."""
+        angles = np.radians([0.0, 40.0, 80.0])
+        return np.stack([np.cos(angles), np.sin(angles)], axis=1)
+
+    def test_greedy_mode_does_not_chain(self):
+        articles = [_make_article(t) for t in "ABC"]
+        with patch("rss_summary.weekly.encode_texts", return_value=self._chain()):
+            clusters = cluster_articles(articles, MagicMock())
+        assert [[i["article"]["title"] for i in c] for c in clusters] == [["A", "B"], ["C"]]
+
+    def test_components_mode_merges_transitively(self):
+        articles = [_make_article(t) for t in "ABC"]
+        with patch("rss_summary.weekly.encode_texts", return_value=self._chain()):
+            clusters = cluster_articles(articles, MagicMock(), mode="components")
+        assert [[i["article"]["title"] for i in c] for c in clusters] == [["A", "B", "C"]]
+
+    def test_greedy_matches_nested_loop_reference(self):
+        rng = np.random.default_rng(0)
+        centers = rng.normal(size=(8, 16))
+        embeddings = centers[rng.integers(0, 8, 60)] + 0.6 * rng.normal(size=(60, 16))
+        articles = [_make_article(str(i)) for i in range(60)]
+        with patch("rss_summary.weekly.encode_texts", return_value=embeddings):
+            clusters = cluster_articles(articles, MagicMock())
+
+        normed = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+        sim = normed @ normed.T
+        assigned = [False] * 60
+        expected = []
+        for i in range(60):
+            if assigned[i]:
+                continue
+            group = [i]
+            assigned[i] = True
+            for j in range(i + 1, 60):
+                if not assigned[j] and sim[i][j] >= 0.70:
+                    group.append(j)
+                    assigned[j] = True
+            expected.append(group)
+        assert [[int(i["article"]["title"]) for i in c] for c in clusters] == expected
+        assert len(expected) < 60  # the fixture actually forms clusters
+
+    @pytest.mark.parametrize("block_size", [1, 7, 1000])
+    def test_block_size_does_not_change_clusters(self, block_size):
+        rng = np.random.default_rng(1)
+        embeddings = rng.normal(size=(30, 4))
+        articles = [_make_article(str(i)) for i in range(30)]
+        with patch("rss_summary.weekly.encode_texts", return_value=embeddings):
+            reference = cluster_articles(articles, MagicMock(), block_size=30)
+            blocked = cluster_articles(articles, MagicMock(), block_size=block_size)
+        assert [[i["article"]["title"] for i in c] for c in blocked] == \
+               [[i["article"]["title"] for i in c] for c in reference]
+
+    def test_ivf_search_with_full_probe_matches_exact(self):
+        rng = np.random.default_rng(2)
+        embeddings = rng.normal(size=(40, 4))
+        articles = [_make_article(str(i)) for i in range(40)]
+        with patch("rss_summary.weekly.encode_texts", return_value=embeddings):
+            exact = cluster_articles(articles, MagicMock(), search="exact")
+            ivf = cluster_articles(articles, MagicMock(), search="ivf", nprobe=40)
+        assert [[i["article"]["title"] for i in c] for c in ivf] == \
+               [[i["article"]["title"] for i in c] for c in exact]
+
+    def test_auto_search_stays_exact_for_small_windows(self):
+        with patch("rss_summary.weekly.encode_texts", return_value=self._embeddings(0.9, 2)), \
+             patch("rss_summary.weekly._ivf_neighbours") as ivf:
+            clusters = cluster_articles([_make_article("A"), _make_article("B")], MagicMock(), search="auto")
+        ivf.assert_not_called()
+        assert len(clusters) == 1
+
+    def test_keeps_raw_embeddings_on_items(self):
+        embeddings = np.array([[2.0, 0.0], [0.0, 3.0]])
+        with patch("rss_summary.weekly.encode_texts", return_value=embeddings):
+            clusters = cluster_articles([_make_article("A"), _make_article("B")], MagicMock())
+        np.testing.assert_array_equal(clusters[1][0]["embedding"], [0.0, 3.0])
+
+
+class TestNeighbourRecall:
+    def test_full_and_partial_recall(self):
+        m = np.array([[1.0, 0.0], [1.0, 0.0], [1.0, 0.0]])
+        exact = [np.array([1, 2]), np.array([2]), np.array([], dtype=int)]
+        assert neighbour_recall(m, exact, 0.9, sample_size=3) == (1.0, 3)
+        missing = [np.array([1]), np.array([2]), np.array([], dtype=int)]
+        recall, pairs = neighbour_recall(m, missing, 0.9, sample_size=3)
+        assert pairs == 3 and recall == pytest.approx(2 / 3)
+
 
 class TestScoreCluster:
     def test_base_score_days_times_sources(self):
@@ -185,6 +273,55 @@ class TestPickRepresentativeArticle:
 
 
 
+class TestLoadPeriodArticles:
+    def test_reads_every_day_in_range(self, tmp_path):
+        md = (
+            "| Titre | Résumé | Date de publication |\n"
+            "|---|---|---|\n"
+            "| [Article](https://rci.fm/a) | Summary | 2025-01-01T10:00:00 |\n"
+        )
+        for day in ("2025-01-30", "2025-02-01", "2025-02-03"):
+            (tmp_path / f"feed-{day}.md").write_text(md)
+        articles, days = load_period_articles(tmp_path, datetime(2025, 1, 30), datetime(2025, 2, 2))
+        assert days == 2
+        assert len(articles) == 2
+
+    def test_archive_days_preferred_over_markdown(self, tmp_path):
+        (tmp_path / "feed-2025-01-30.md").write_text("")
+        (tmp_path / "archive.jsonl").write_text(json.dumps({
+            "day": "2025-01-30", "date": "2025-01-30T08:00:00", "title": "Archivé",
+            "url": "https://rci.fm/x", "summary": "s", "image": "", "theme": None,
+        }) + "\n")
+        articles, days = load_period_articles(tmp_path, datetime(2025, 1, 30), datetime(2025, 1, 31))
+        assert days == 1
+        assert [a["title"] for a in articles] == ["Archivé"]
+        assert articles[0]["source"] == "RCI"
+
+
+class TestLoadPeriodSidecars:
+    def test_loads_existing_sidecars_only(self, tmp_path):
+        np.savez_compressed(tmp_path / "feed-2025-01-30.npz", text=np.array(["a"]))
+        np.savez_compressed(tmp_path / "feed-2025-02-05.npz", text=np.array(["b"]))
+        sidecars = load_period_sidecars(tmp_path, datetime(2025, 1, 30), datetime(2025, 2, 2))
+        assert [list(s["text"]) for s in sidecars] == [["a"]]
+
+
+class TestRenderProseDigest:
+    def _cluster(self):
+        article = _make_article("Titre")
+        return {"rep": article, "score": 1, "most_read_tags": set()}
+
+    def test_week_heading(self):
+        out = render_prose_digest(5, datetime(2026, 1, 26), datetime(2026, 2, 1), [self._cluster()], "Texte")
+        assert out.startswith("# Semaine W05 — 26 janvier au 1 février 2026")
+
+    def test_range_heading(self):
+        out = render_prose_digest(None, datetime(2026, 1, 1), datetime(2026, 3, 31), [self._cluster()], "Texte")
+        assert out.startswith("# Du 1 janvier au 31 mars 2026")
+        assert "(du 1 janvier au 31 mars 2026)" in out
+        assert "Semaine" not in out
+
+
 class TestRenderSuggestions:
     def _make_scored(self, theme, top_score, runner_up="Autre thème", runner_up_score=0.05, title="T"):
         article = _make_article(title=title)
@@ -214,6 +351,10 @@ class TestRenderSuggestions:
         assert "Ambig" in output
         assert "ambigus" in output
 
+    def test_period_overrides_week_heading(self):
+        output = render_suggestions(None, [], period="Du 1 janvier au 31 mars 2026")
+        assert output.startswith("# Revue taxonomique — Du 1 janvier au 31 mars 2026")
+
     def test_clean_cluster_not_listed(self):
         scored = [self._make_scored("Politique", top_score=0.90, runner_up_score=0.05, title="Clear")]
         output = render_suggestions(1, scored, threshold=0.15, low_confidence_margin=0.10, ambiguity_margin=0.05)
@@ -228,13 +369,12 @@ class TestSplitMixedClusters:
         }
 
     def _patch(self, themes_by_order):
-        """Return context managers that mock batch_encode_e5 and classify_article_scored."""
+        """Return context managers that mock batch_encode_e5 and classify_batch."""
         n = len(themes_by_order)
         e5_mock = patch("rss_summary.weekly.batch_encode_e5", return_value=np.zeros((n, 1024)))
-        call_iter = iter(themes_by_order)
         cls_mock = patch(
-            "rss_summary.weekly.classify_article_scored",
-            side_effect=lambda emb, head: {"theme": next(call_iter)},
+            "rss_summary.weekly.classify_batch",
+            side_effect=lambda embs, head: [{"theme": t} for t in themes_by_order],
         )
         return e5_mock, cls_mock
 
@@ -337,12 +477,12 @@ class TestApplySuggestionsToThemes:
         model_bge = MagicMock()
         model_e5 = MagicMock()
         with (
-            patch("rss_summary.weekly.encode_text", return_value=np.zeros(1024)),
+            patch("rss_summary.weekly.encode_texts", return_value=np.zeros((1, 1024))),
             patch("rss_summary.weekly.batch_encode_e5", return_value=np.zeros((1, 1024))),
-            patch("rss_summary.weekly.build_cls_embedding", return_value=np.zeros(2048)),
-            patch("rss_summary.weekly.classify_article_scored",
-                  return_value={"theme": "International", "top_score": 0.45,
-                                "runner_up": "Politique", "runner_up_score": 0.20}),
+            patch("rss_summary.weekly.build_cls_embeddings", return_value=np.zeros((1, 2048))),
+            patch("rss_summary.weekly.classify_batch",
+                  return_value=[{"theme": "International", "top_score": 0.45,
+                                 "runner_up": "Politique", "runner_up_score": 0.20}]),
         ):
             added, _ = apply_suggestions_to_themes(
                 [self._suggestion("Politique", "Haiti article")], path,
@@ -356,12 +496,12 @@ class TestApplySuggestionsToThemes:
         model_bge = MagicMock()
         model_e5 = MagicMock()
         with (
-            patch("rss_summary.weekly.encode_text", return_value=np.zeros(1024)),
+            patch("rss_summary.weekly.encode_texts", return_value=np.zeros((1, 1024))),
             patch("rss_summary.weekly.batch_encode_e5", return_value=np.zeros((1, 1024))),
-            patch("rss_summary.weekly.build_cls_embedding", return_value=np.zeros(2048)),
-            patch("rss_summary.weekly.classify_article_scored",
-                  return_value={"theme": "Politique", "top_score": 0.50,
-                                "runner_up": "International", "runner_up_score": 0.20}),
+            patch("rss_summary.weekly.build_cls_embeddings", return_value=np.zeros((1, 2048))),
+            patch("rss_summary.weekly.classify_batch",
+                  return_value=[{"theme": "Politique", "top_score": 0.50,
+                                 "runner_up": "International", "runner_up_score": 0.20}]),
         ):
             added, _ = apply_suggestions_to_themes(
                 [self._suggestion("Politique", "political article")], path,
@@ -375,12 +515,12 @@ class TestApplySuggestionsToThemes:
         model_bge = MagicMock()
         model_e5 = MagicMock()
         with (
-            patch("rss_summary.weekly.encode_text", return_value=np.zeros(1024)),
+            patch("rss_summary.weekly.encode_texts", return_value=np.zeros((1, 1024))),
             patch("rss_summary.weekly.batch_encode_e5", return_value=np.zeros((1, 1024))),
-            patch("rss_summary.weekly.build_cls_embedding", return_value=np.zeros(2048)),
-            patch("rss_summary.weekly.classify_article_scored",
-                  return_value={"theme": "International", "top_score": 0.28,
-                                "runner_up": "Politique", "runner_up_score": 0.25}),
+            patch("rss_summary.weekly.build_cls_embeddings", return_value=np.zeros((1, 2048))),
+            patch("rss_summary.weekly.classify_batch",
+                  return_value=[{"theme": "International", "top_score": 0.28,
+                                 "runner_up": "Politique", "runner_up_score": 0.25}]),
         ):
             added, _ = apply_suggestions_to_themes(
                 [self._suggestion("Politique", "ambiguous article")], path,
@@ -388,6 +528,28 @@ class TestApplySuggestionsToThemes:
             )
         assert added == 1  # score 0.28 < threshold 0.35 → allowed
 
+    def test_gate_classifies_all_examples_in_one_batch(self, tmp_path):
+        path = _minimal_themes_json(tmp_path)
+        suggestions = [
+            self._suggestion("Politique", "Haiti article"),
+            self._suggestion("Inexistant", "some text"),
+            self._suggestion("International", "Haiti article"),
+        ]
+        predictions = [{"theme": "International", "top_score": 0.45, "runner_up": "Politique", "runner_up_score": 0.20}] * 2
+        with (
+            patch("rss_summary.weekly.encode_texts", return_value=np.zeros((2, 1024))) as mock_bge,
+            patch("rss_summary.weekly.batch_encode_e5", return_value=np.zeros((2, 1024))) as mock_e5,
+            patch("rss_summary.weekly.build_cls_embeddings", return_value=np.zeros((2, 2048))),
+            patch("rss_summary.weekly.classify_batch", return_value=predictions) as mock_classify,
+        ):
+            added, _ = apply_suggestions_to_themes(
+                suggestions, path, head=MagicMock(), model_bge=MagicMock(), model_e5=MagicMock(),
+            )
+        assert mock_bge.call_args.args[1] == ["Haiti article", "Haiti article"]
+        mock_e5.assert_called_once()
+        mock_classify.assert_called_once()
+        assert added == 1  # only the International suggestion agrees with the classifier
+
     def test_gate_inactive_without_models(self, tmp_path):
         path = _minimal_themes_json(tmp_path)
         # no head/model_bge/model_e5 passed — old behaviour, no classifier check